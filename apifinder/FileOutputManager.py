@@ -3,6 +3,8 @@ import json
 from datetime import datetime
 from urllib.parse import urlparse
 from .i18n import i18n
+from .result_sink import STREAMING_SINKS, CSV_HEADER
+from .scan_result import ResultColumns
 
 class FileOutputManager:
     """
@@ -19,6 +21,31 @@ class FileOutputManager:
         """
         self.output_manager = output_manager
         self.console = output_manager.console
+        self.sink = None
+
+    def open_sink(self):
+        """
+        输出格式支持流式写入时（.jsonl/.ndjson/.csv/.html）创建结果流并交给输出管理器，
+        之后每个确认的端点直接写入文件，不再累积在内存中
+
+        Returns:
+            ResultSink: 创建的结果流，不支持时为None
+        """
+        if not self.output_manager.output_file or self.sink is not None:
+            return self.sink
+
+        file_ext = os.path.splitext(self.output_manager.output_file)[1].lower()
+        sink_class = STREAMING_SINKS.get(file_ext)
+        if sink_class is None:
+            return None
+
+        output_dir = os.path.dirname(self.output_manager.output_file)
+        if output_dir and not os.path.exists(output_dir):
+            os.makedirs(output_dir)
+
+        self.sink = sink_class(self.output_manager.output_file, self)
+        self.output_manager.sink = self.sink
+        return self.sink
 
     def save_results(self, target_url, config_args):
         """
@@ -31,6 +58,10 @@ class FileOutputManager:
         if not self.output_manager.output_file:
             return
 
+        if self.sink is not None:
+            self._close_sink(target_url)
+            return
+
         try:
             # 创建输出目录（如果不存在）
             output_dir = os.path.dirname(self.output_manager.output_file)
@@ -39,9 +70,11 @@ class FileOutputManager:
 
             file_ext = os.path.splitext(self.output_manager.output_file)[1].lower()
 
-            # 数据去重和排序
-            unique_results = self._deduplicate_results()
-            sorted_results = self._sort_results(unique_results)
+            # 数据去重和排序：按列导出，只对下标去重排序，写文件时逐条生成结果字典
+            columns = ResultColumns(self.output_manager.results)
+            unique_indices = columns.unique_indices()
+            unique_results = columns.view(unique_indices)
+            sorted_results = columns.view(columns.sorted_indices(unique_indices))
 
             # 根据文件扩展名选择输出格式
             if file_ext == '.json':
@@ -77,18 +110,23 @@ class FileOutputManager:
         except Exception as e:
             self.output_manager.print_error(f"Save failed: {str(e)}")
 
+    def _close_sink(self, target_url):
+        """结束流式写入并输出文件信息"""
+        try:
+            self.sink.close(target_url)
+            file_size_str = self._format_file_size(os.path.getsize(self.output_manager.output_file))
+            if not self.output_manager.silent_mode:
+                self.console.print(
+                    f"\n[green bold]💾All Results saved to:[/green bold] [blue]{self.output_manager.output_file}[/blue]")
+                self.console.print(
+                    f"[dim]📁 File size: {file_size_str} | Unique: {self.sink.written} | Duplicates dropped: {self.sink.duplicates}[/dim]")
+        except Exception as e:
+            self.output_manager.print_error(f"Save failed: {str(e)}")
+
     def _deduplicate_results(self):
         """去重结果"""
-        seen_urls = set()
-        unique_results = []
-
-        for result in self.output_manager.results:
-            url = result['url']
-            if url not in seen_urls:
-                seen_urls.add(url)
-                unique_results.append(result)
-
-        return unique_results
+        columns = ResultColumns(self.output_manager.results)
+        return columns.view(columns.unique_indices())
 
     def _sort_results(self, results):
         """排序结果 - 按URL字母顺序"""
@@ -132,7 +170,7 @@ class FileOutputManager:
                                                                                                   "failed_requests"])) * 100,
                                       2)
             },
-            "results": results,
+            "results": list(results),
             "configuration": {
                 "timeout": getattr(config_args, 'timeout', 10) if config_args else 10,
                 "delay": getattr(config_args, 'delay', 0.5) if config_args else 0.5,
@@ -183,27 +221,39 @@ class FileOutputManager:
         with open(self.output_manager.output_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             # 写入头部
-            writer.writerow(['URL', 'Source', 'Timestamp', 'Source_Type', 'Domain'])
+            writer.writerow(CSV_HEADER)
 
             for result in results:
-                url = result['url']
-                source = result['source'] if result['source'] else 'Unknown'
-                timestamp = result['timestamp']
+                writer.writerow(self._csv_row(result))
 
-                # 分析URL类型
-                url_type = self._analyze_url_type(url)
+    def _csv_row(self, result):
+        """CSV中的一行结果"""
+        url = result['url']
+        source = result['source'] if result['source'] else 'Unknown'
+        timestamp = result['timestamp']
 
-                # 提取域名
-                try:
-                    domain = urlparse(url).netloc
-                except:
-                    domain = 'Unknown'
+        # 分析URL类型
+        url_type = self._analyze_url_type(url)
+
+        # 提取域名
+        try:
+            domain = urlparse(url).netloc
+        except:
+            domain = 'Unknown'
 
-                writer.writerow([url, source, timestamp, url_type, domain])
+        return [url, source, timestamp, url_type, domain]
 
     def _save_as_html(self, results, target_url):
-        """保存为HTML格式"""
-        html_content = f"""<!DOCTYPE html>
+        """保存为HTML格式，逐行写入文件而不是拼接整个文档"""
+        with open(self.output_manager.output_file, 'w', encoding='utf-8') as f:
+            f.write(self._html_header(target_url, len(results)))
+            for result in results:
+                f.write(self._html_row(result))
+            f.write(self._html_footer(len(results)))
+
+    def _html_header(self, target_url, count):
+        """HTML报告的头部（样式、统计和表头）"""
+        return f"""<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -404,7 +454,7 @@ class FileOutputManager:
 
         <div class="stats">
             <div class="stat">
-                <div class="stat-value">{len(results)}</div>
+                <div class="stat-value">{count}</div>
                 <div class="stat-label">发现的URL</div>
             </div>
             <div class="stat">
@@ -424,7 +474,7 @@ class FileOutputManager:
         <div class="info-section">
             <p><strong>🎯 目标URL:</strong> <a href="{target_url}" target="_blank" class="url-link">{target_url}</a></p>
             <p><strong>🕐 扫描时间:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p><strong>📊 扫描状态:</strong> {"✅ 完成" if len(results) > 0 else "⚠️ 未发现API端点"}</p>
+            <p><strong>📊 扫描状态:</strong> {"✅ 完成" if count > 0 else "⚠️ 未发现API端点"}</p>
         </div>
 
         <div class="filter-section">
@@ -446,24 +496,25 @@ class FileOutputManager:
             <tbody>
 """
 
-        for result in results:
-            url = result['url']
-            source = result['source'] if result['source'] else 'Unknown'
-            timestamp = result['timestamp']
-            url_type = self._analyze_url_type(url)
+    def _html_row(self, result):
+        """HTML报告中的一行结果"""
+        url = result['url']
+        source = result['source'] if result['source'] else 'Unknown'
+        timestamp = result['timestamp']
+        url_type = self._analyze_url_type(url)
 
-            # 格式化时间
-            try:
-                time_obj = datetime.fromisoformat(timestamp)
-                formatted_time = time_obj.strftime('%H:%M:%S')
-            except:
-                formatted_time = timestamp
+        # 格式化时间
+        try:
+            time_obj = datetime.fromisoformat(timestamp)
+            formatted_time = time_obj.strftime('%H:%M:%S')
+        except:
+            formatted_time = timestamp
 
-            # 生成类型标签的CSS类
-            type_class = 'api' if 'api' in url.lower() else 'js' if '.js' in url else 'css' if '.css' in url else 'image' if any(
-                ext in url.lower() for ext in ['.jpg', '.png', '.gif', '.svg']) else 'other'
+        # 生成类型标签的CSS类
+        type_class = 'api' if 'api' in url.lower() else 'js' if '.js' in url else 'css' if '.css' in url else 'image' if any(
+            ext in url.lower() for ext in ['.jpg', '.png', '.gif', '.svg']) else 'other'
 
-            html_content += f"""
+        return f"""
                 <tr>
                     <td>
                         <a href="{url}" class="url-link" target="_blank" rel="noopener noreferrer">{url}</a>
@@ -477,13 +528,15 @@ class FileOutputManager:
                 </tr>
 """
 
-        html_content += f"""
+    def _html_footer(self, count):
+        """HTML报告的尾部（页脚和脚本）"""
+        return f"""
             </tbody>
         </table>
 
         <div class="footer">
             <p>Generated by <strong>API Finder</strong> • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p>总共找到 <strong>{len(results)}</strong> 个URL</p>
+            <p>总共找到 <strong>{count}</strong> 个URL</p>
         </div>
     </div>
 
@@ -564,12 +617,10 @@ class FileOutputManager:
 </html>
 """
 
-        with open(self.output_manager.output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-
     def _save_as_xml(self, results, target_url):
         """保存为XML格式"""
-        xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+        with open(self.output_manager.output_file, 'w', encoding='utf-8') as f:
+            f.write(f"""<?xml version="1.0" encoding="UTF-8"?>
 <api_scan_results>
     <metadata>
         <tool>Api-Finder</tool>
@@ -585,30 +636,27 @@ class FileOutputManager:
         <scan_duration>{(datetime.now() - self.output_manager.stats['start_time']).total_seconds():.1f}</scan_duration>
     </statistics>
     <results>
-"""
+""")
 
-        for result in results:
-            url = result['url']
-            source = result['source'] if result['source'] else 'Unknown'
-            timestamp = result['timestamp']
-            url_type = self._analyze_url_type(url)
+            for result in results:
+                url = result['url']
+                source = result['source'] if result['source'] else 'Unknown'
+                timestamp = result['timestamp']
+                url_type = self._analyze_url_type(url)
 
-            xml_content += f"""
+                f.write(f"""
         <result>
             <url><![CDATA[{url}]]></url>
             <source><![CDATA[{source}]]></source>
             <type>{url_type}</type>
             <timestamp>{timestamp}</timestamp>
         </result>
-"""
+""")
 
-        xml_content += """
+            f.write("""
     </results>
 </api_scan_results>
-"""
-
-        with open(self.output_manager.output_file, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+""")
 
     def _save_as_excel(self, results, target_url):
         """保存为Excel格式"""
@@ -673,7 +721,8 @@ class FileOutputManager:
 
     def _save_as_markdown(self, results, target_url):
         """保存为Markdown格式"""
-        md_content = f"""# 🔍 API Finder 扫描结果
+        with open(self.output_manager.output_file, 'w', encoding='utf-8') as f:
+            f.write(f"""# 🔍 API Finder 扫描结果
 
 ## 📊 扫描信息
 
@@ -688,23 +737,23 @@ class FileOutputManager:
 
 | URL | 来源 | 类型 | 时间 |
 |-----|------|------|------|
-"""
+""")
 
-        for result in results:
-            url = result['url']
-            source = result['source'] if result['source'] else 'Unknown'
-            source_display = source.split('/')[-1] if source else 'Unknown'
-            url_type = self._analyze_url_type(url)
+            for result in results:
+                url = result['url']
+                source = result['source'] if result['source'] else 'Unknown'
+                source_display = source.split('/')[-1] if source else 'Unknown'
+                url_type = self._analyze_url_type(url)
 
-            try:
-                time_obj = datetime.fromisoformat(result['timestamp'])
-                formatted_time = time_obj.strftime('%H:%M:%S')
-            except:
-                formatted_time = result['timestamp']
+                try:
+                    time_obj = datetime.fromisoformat(result['timestamp'])
+                    formatted_time = time_obj.strftime('%H:%M:%S')
+                except:
+                    formatted_time = result['timestamp']
 
-            md_content += f"| {url} | {source_display} | {url_type} | {formatted_time} |\n"
+                f.write(f"| {url} | {source_display} | {url_type} | {formatted_time} |\n")
 
-        md_content += f"""
+            f.write(f"""
 
 ## 📈 统计信息
 
@@ -714,10 +763,7 @@ class FileOutputManager:
 
 ---
 *生成工具: Api-Finder v0.3.1*
-"""
-
-        with open(self.output_manager.output_file, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+""")
 
     def _analyze_url_type(self, url):
         """分析URL类型"""
@@ -12,12 +12,15 @@ from datetime import datetime
 from urllib.parse import urlparse
 from rich.console import Console
 from rich.text import Text
-from rich.panel import Panel
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 from rich.rule import Rule
-from rich.markdown import Markdown
 from .i18n import i18n
+from .scan_result import ScanResult, SourceTable
+from .metrics import Metrics
+from .profiler import _format_bytes
+
+# 总是出现在统计信息中的计数 (Counters always present in stats)
+BASE_COUNTERS = ("total_urls", "successful_requests", "failed_requests", "api_endpoints")
 
 
 class OutputManager:
@@ -28,13 +31,19 @@ class OutputManager:
         silent_mode (bool): 静默模式，只输出发现的API端点
         verbose_mode (bool): 详细输出模式
         output_file (str): 输出文件路径
-        results (list): 结果列表
-        stats (dict): 统计信息
+        results (list): ScanResult 结果列表
+        source_table (SourceTable): 结果来源的驻留表，随输出管理器释放
+        metrics (Metrics): 分片计数器，工作线程通过 count 计数
+        stats (dict): 统计信息的快照（计数器汇总 + set_stats 设置的值）
         console (Console): Rich console对象
         results_table (Table): 结果表格
+        sink (ResultSink): 流式结果输出，设置后结果直接写入文件而不保存在 results 中
+        profiler (Profiler): 性能分析器，开启时在统计信息之后输出分析报告
+        events (EventStream): --jsonl 事件流，设置后确认的端点写成事件而不输出到终端
     """
     
-    def __init__(self, silent_mode, verbose_mode=False, output_file=None):
+    def __init__(self, silent_mode, verbose_mode=False, output_file=None, console=None, sink=None, profiler=None,
+                 events=None):
         """
         初始化输出管理器
         
@@ -42,24 +51,43 @@ class OutputManager:
             silent_mode (bool): 静默模式
             verbose_mode (bool): 详细输出模式
             output_file (str): 输出文件路径
+            console (Console): 共用的Rich console，默认新建
+            sink (ResultSink): 共用的流式结果输出
+            profiler (Profiler): 共用的性能分析器
+            events (EventStream): 共用的JSONL事件流
         """
         self.silent_mode = silent_mode
         self.verbose_mode = verbose_mode
         self.output_file = output_file
-        self.console = Console()
+        self.console = console or Console()
         self.results = []
-        self.stats = {
-            "total_urls": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "api_endpoints": 0,
-            "start_time": datetime.now()
-        }
+        self.source_table = SourceTable()
+        self.sink = sink
+        self.profiler = profiler
+        self.events = events
+        self.metrics = Metrics()
+        self._values = {"start_time": datetime.now()}
         self.results_table = Table(title="🔍 Discovered API Endpoints", border_style="green")
         self.results_table.add_column("📍 URL", style="cyan", no_wrap=False)
         self.results_table.add_column("📄 Source", style="yellow", max_width=30)
         self.results_table.add_column("⏰ Time", style="dim", max_width=10)
     
+    @property
+    def stats(self):
+        """统计信息的快照：分片计数器汇总后与 set_stats 设置的值合并，修改快照不影响统计"""
+        stats = dict.fromkeys(BASE_COUNTERS, 0)
+        stats.update(self._values)
+        stats.update(self.metrics.snapshot())
+        return stats
+
+    def count(self, name, value=1):
+        """计数加 value，多个线程同时调用也不会丢失计数 (Thread-safe counter increment)"""
+        self.metrics.incr(name, value)
+
+    def set_stats(self, values):
+        """设置非计数的统计值，例如连接池和缓存的汇总 (Set gauge-like stats)"""
+        self._values.update(values)
+
     def print_info(self, text):
         """打印信息"""
         if not self.silent_mode:
@@ -70,9 +98,23 @@ class OutputManager:
         if self.verbose_mode and not self.silent_mode:
             self.console.print(f"[dim][DEBUG][/dim] {text}")
     
-    def print_url(self, url, source="", IsSuccess=True):
-        """打印发现的URL"""
-        if self.silent_mode:
+    def emit(self, event, **fields):
+        """写入一个 --jsonl 事件，未开启事件流时什么也不做"""
+        if self.events is not None:
+            self.events.emit(event, **fields)
+
+    def print_url(self, url, source="", IsSuccess=True, sources=None):
+        """
+        打印发现的URL
+
+        Args:
+            sources (list): 引用该端点的全部来源，保存到结果的 sources 字段
+        """
+        if self.events is not None:
+            # 事件流模式：不经过Rich渲染 (Event stream mode bypasses Rich)
+            if IsSuccess:
+                self.events.emit("result", url=url, source=source, sources=list(sources) if sources else None)
+        elif self.silent_mode:
             # 静默模式：输出可点击链接（如果终端支持）
             clickable_url = self._make_clickable_url(url)
             self.console.print(clickable_url, highlight=False)
@@ -83,7 +125,8 @@ class OutputManager:
             
             # 创建可点击的URL用于表格
             clickable_url = self._make_clickable_url(url)
-            self.results_table.add_row(clickable_url, source_display, time_display)
+            if self.sink is None:
+                self.results_table.add_row(clickable_url, source_display, time_display)
             
             # 终端输出也使用可点击链接
             if source:
@@ -93,12 +136,12 @@ class OutputManager:
         
         if IsSuccess:
         # 保存结果
-            self.results.append({
-                "url": url,
-                "source": source,
-                "timestamp": datetime.now().isoformat()
-            })
-            self.stats["api_endpoints"] += 1
+            result = ScanResult(url, source, sources=sources, table=self.source_table)
+            if self.sink is not None:
+                self.sink.write(result)
+            else:
+                self.results.append(result)
+            self.count("api_endpoints")
         else:
             pass
     
@@ -167,8 +210,9 @@ class OutputManager:
     def print_stats(self):
         """打印统计信息"""
         if not self.silent_mode:
+            stats = self.stats
             # 计算扫描时间
-            scan_duration = datetime.now() - self.stats["start_time"]
+            scan_duration = datetime.now() - stats["start_time"]
             duration_str = f"{scan_duration.total_seconds():.1f}s"
             
             # 创建统计表格
@@ -176,31 +220,69 @@ class OutputManager:
             stats_table.add_column("Item", style="yellow bold")
             stats_table.add_column("Value", style="green bold", justify="right")
             
-            stats_table.add_row("🎯 Total URLs", str(self.stats['total_urls']))
-            stats_table.add_row("✅ Successful Requests", str(self.stats['successful_requests']))
-            stats_table.add_row("❌ Failed Requests", str(self.stats['failed_requests']))
-            stats_table.add_row("🔍 API Endpoints Found", str(self.stats['api_endpoints']))
+            stats_table.add_row("🎯 Total URLs", str(stats['total_urls']))
+            stats_table.add_row("✅ Successful Requests", str(stats['successful_requests']))
+            stats_table.add_row("❌ Failed Requests", str(stats['failed_requests']))
+            stats_table.add_row("🔍 API Endpoints Found", str(stats['api_endpoints']))
             stats_table.add_row("⏱️ Scan Duration", duration_str)
+
+            # 连接池复用情况
+            if stats.get("pool_requests"):
+                stats_table.add_row("♻️ Pool Hits", str(stats['pool_hits']))
+                stats_table.add_row("🔌 Pool Misses (New Connections)", str(stats['pool_misses']))
+            if stats.get("throttled_responses"):
+                stats_table.add_row("⏳ Throttled Responses (429/503)", str(stats['throttled_responses']))
+            if stats.get("lazy_chunks"):
+                stats_table.add_row("🧩 Lazy Chunks", str(stats['lazy_chunks']))
+            if stats.get("source_map_sources"):
+                stats_table.add_row("🗺️ Source Map Files", str(stats['source_map_sources']))
+            if "endpoints_new" in stats:
+                stats_table.add_row("🆕 New Endpoints", str(stats['endpoints_new']))
+                stats_table.add_row("🗑️ Removed Endpoints", str(stats.get('endpoints_removed', 0)))
+                stats_table.add_row("🔀 Changed Endpoints", str(stats.get('endpoints_changed', 0)))
+            if stats.get("scripts_unchanged") or stats.get("probes_reused"):
+                stats_table.add_row("📇 Unchanged Scripts (Index)", str(stats.get('scripts_unchanged', 0)))
+                stats_table.add_row("📇 Reused Probes (Index)", str(stats.get('probes_reused', 0)))
+            # 页面、脚本、source map 和探测请求的状态码类别和错误类别 (All responses by status class and errors by class)
+            statuses = sorted((key[len("status_"):], value) for key, value in stats.items() if key.startswith("status_") and value)
+            if statuses:
+                stats_table.add_row("📶 Responses by Status", " · ".join(f"{name} {value}" for name, value in statuses))
+            errors = sorted((key[len("errors_"):], value) for key, value in stats.items() if key.startswith("errors_") and value)
+            if errors:
+                stats_table.add_row("⚠️ Request Errors", " · ".join(f"{name} {value}" for name, value in errors))
+            if stats.get("bytes"):
+                stats_table.add_row("📦 Response Bytes", _format_bytes(stats['bytes']))
+            if stats.get("cache_hits") or stats.get("cache_revalidated"):
+                stats_table.add_row("💾 Cache Hits", str(stats.get('cache_hits', 0)))
+                stats_table.add_row("🔁 Revalidated (304)", str(stats.get('cache_revalidated', 0)))
             
             # 计算成功率
-            total_requests = self.stats['successful_requests'] + self.stats['failed_requests']
+            total_requests = stats['successful_requests'] + stats['failed_requests']
             if total_requests > 0:
-                success_rate = (self.stats['successful_requests'] / total_requests) * 100
+                success_rate = (stats['successful_requests'] / total_requests) * 100
                 stats_table.add_row("📈 Success Rate", f"{success_rate:.1f}%")
             
             self.console.print(Rule(style="dim"))
             self.console.print(stats_table)
             
             # 如果找到了API端点，显示结果表格
-            if self.stats['api_endpoints'] > 0 and not self.silent_mode:
+            if stats['api_endpoints'] > 0 and not self.silent_mode and self.results_table.row_count:
                 self.console.print(Rule(style="dim"))
                 self.console.print(self.results_table)
+
+        # --profile 报告，静默模式下只写JSON
+        if self.profiler is not None and self.profiler.enabled:
+            if not self.silent_mode:
+                self.console.print(Rule(style="dim"))
+            self.profiler.report(self.console, show_table=not self.silent_mode)
     
     def create_progress(self, total_tasks=None):
         """创建进度条"""
         if self.silent_mode:
             return None
-        
+        # 进度条只在非静默模式使用，按需导入 (Imported on demand, silent runs never need it)
+        from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+
         return Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -232,8 +314,85 @@ class OutputManager:
         else:
             self.print_info(f"🎉 [bold green]Scan completed![/bold green]")
 
+    def merge_from(self, other):
+        """
+        合并另一个输出管理器的结果和统计（批量扫描时把单个目标合并到全局）
+
+        Args:
+            other (OutputManager): 单个目标的输出管理器
+        """
+        self.results.extend(other.results)
+        for key, value in other.metrics.snapshot().items():
+            self.count(key, value)
+
+        if not self.silent_mode:
+            self._add_table_rows(other.results)
+
+    def _add_table_rows(self, results):
+        for result in results:
+            source = result.source
+            source_display = source.split('/')[-1] if source else "unknown"
+            time_display = datetime.fromtimestamp(result.epoch).strftime("%H:%M:%S")
+            self.results_table.add_row(self._make_clickable_url(result.url), source_display, time_display)
+
+    def restore_results(self, results):
+        """
+        恢复检查点中已发现的结果，不重复输出到终端
+
+        Args:
+            results (list): 结果字典列表
+        """
+        results = [ScanResult.from_dict(result, self.source_table) for result in results]
+        self.count("api_endpoints", len(results))
+        if self.sink is not None:
+            for result in results:
+                self.sink.write(result)
+            return
+
+        self.results.extend(results)
+        if not self.silent_mode:
+            self._add_table_rows(results)
+
+    def print_target_summary(self, url, stats):
+        """批量扫描时输出单个目标的统计摘要"""
+        self.print_info(
+            f"📌 [bold]{url}[/bold] → [green]{stats['api_endpoints']}[/green] endpoints, "
+            f"{stats['successful_requests']} ok / {stats['failed_requests']} failed"
+        )
+
+    def print_index_changes(self, changes):
+        """
+        输出与增量扫描索引中上次结果的端点差异
+
+        Args:
+            changes (IndexDiff): 端点差异
+        """
+        if self.events is not None:
+            diff = changes.to_dict()
+            self.events.emit("changes", new=diff["new"], removed=diff["removed"], changed=diff["changed"],
+                             first_scan=diff["first_scan"])
+        if changes.first_scan:
+            self.print_info(f"📇 [bold cyan]First indexed scan of {changes.target}, {len(changes.new)} endpoints recorded[/bold cyan]")
+            return
+        if not changes:
+            self.print_info(f"📇 [bold cyan]No endpoint changes since last scan of {changes.target}[/bold cyan]")
+            return
+        self.print_info(
+            f"📇 [bold cyan]Changes since last scan of {changes.target}:[/bold cyan] "
+            f"[green]{len(changes.new)} new[/green], [red]{len(changes.removed)} removed[/red], "
+            f"[yellow]{len(changes.changed)} changed[/yellow]"
+        )
+        for url in changes.new:
+            self.print_info(f"  [green]+ {url}[/green]")
+        for url in changes.removed:
+            self.print_info(f"  [red]- {url}[/red]")
+        for url, was_ok, ok in changes.changed:
+            before, after = ("ok" if was_ok else "failed"), ("ok" if ok else "failed")
+            self.print_info(f"  [yellow]~ {url} ({before} → {after})[/yellow]")
+
     def print_json_stats(self):
         """统一输出JSON响应统计"""
-        if self.stats.get("json_responses", 0) > 0:
-            self.console.print(f"[bold green]共发现 {self.stats['json_responses']} 个JSON响应[/bold green]")
+        json_responses = self.metrics.value("json_responses")
+        if json_responses > 0:
+            self.console.print(f"[bold green]共发现 {json_responses} 个JSON响应[/bold green]")
 
@@ -4,12 +4,24 @@ Api-Finder - API端点扫描工具
 这是一个用于从前端文件中发现API端点的工具包。
 """
 
-from .FileOutputManager import FileOutputManager
-from .Output_Manager import OutputManager
-from .utils import URLProcessor, URLExtractor, UpdateManager
-from .ua_manager import UaManager
-from .config import DEFAULT_CONFIG
-from .i18n import I18nManager
+import importlib
+
+# 导出的名称按需从子模块导入，`python -m apifinder.apifinder` 和只用其中一部分的调用方不必加载全部依赖
+# (Exports are imported lazily so the CLI and partial users don't pay for every dependency)
+_EXPORTS = {
+    'FileOutputManager': '.FileOutputManager',
+    'OutputManager': '.Output_Manager',
+    'URLProcessor': '.utils',
+    'URLExtractor': '.utils',
+    'UpdateManager': '.utils',
+    'UaManager': '.ua_manager',
+    'HttpClient': '.http_client',
+    'Scanner': '.scanner',
+    'ScanConfig': '.scanner',
+    'ScanReport': '.scanner',
+    'DEFAULT_CONFIG': '.config',
+    'I18nManager': '.i18n',
+}
 
 __version__ = "0.5"
 __author__ = "jujubooom,bx33661,Rxiain"
@@ -23,6 +35,19 @@ __all__ = [
     'URLExtractor',
     'UpdateManager',
     'UaManager',
+    'HttpClient',
+    'Scanner',
+    'ScanConfig',
+    'ScanReport',
     'DEFAULT_CONFIG',
     'I18nManager'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步扫描引擎 (Asyncio Scanning Engine)
+在单个事件循环中完成页面抓取、脚本下载、端点探测和深度扫描，
+用信号量限制同时在途的请求数，替代 ThreadPoolExecutor + 每次探测两个线程的模式
+"""
+
+import json
+import asyncio
+import time
+import tempfile
+import contextlib
+from urllib.parse import urlparse
+import aiohttp
+from .html_document import ParsedDocument
+from .response_cache import CachedResponse, VALIDATOR_HEADERS
+from .profiler import Profiler
+from .chunk_resolver import find_chunk_urls
+from .source_map import find_source_map_url, data_url_chunks, decode_chunks, extract_source_map, MAP_CHUNK_SIZE, MAP_SPOOL_SIZE
+from .utils import URLProcessor, URLExtractor, ResultStore, DeepScanManager, EndpointIndex, BodyReader, is_json_response, escalation_methods
+
+
+class AsyncScanEngine:
+    """
+    基于asyncio/aiohttp的扫描引擎
+
+    与线程引擎的 find_by_url 产出相同的 OutputManager.results 和统计信息，
+    探测结果同样交给 report_probe_results 统一输出。
+
+    Attributes:
+        output (OutputManager): 输出管理器
+        concurrency (int): 同时在途的最大请求数
+        max_depth (int): 深度扫描层数
+    """
+
+    def __init__(self, output, report_probe, probe_headers, page_headers, cookie=None,
+                 timeout=10, rate_limiter=None, response_cache=None, concurrency=100, max_depth=2, proxy=None, html_parser="bs4",
+                 script_concurrency=8, deep_budget=10, checkpoint=None, target=None, endpoints=None,
+                 max_body=1024 * 1024, methods=("GET", "POST"), probe_strategy="full", profiler=None,
+                 extractor=None, index=None, source_maps=False, lazy_chunks=False, max_chunks=200, request_slot=None):
+        """
+        初始化异步扫描引擎
+
+        Args:
+            output (OutputManager): 输出管理器
+            report_probe (callable): 探测结果输出函数 report_probe(url, result_store)
+            probe_headers (callable): 生成探测请求头的函数
+            page_headers (callable): 生成页面/脚本请求头的函数
+            cookie (str): Cookie
+            timeout (int): 读取超时时间
+            rate_limiter (AdaptiveRateLimiter): 按主机的限速器，为None时不限速
+            response_cache (ResponseCache): 响应缓存，为None时不缓存
+            concurrency (int): 并发上限
+            max_depth (int): 深度扫描层数
+            proxy (str): HTTP代理地址（不支持SOCKS）
+            html_parser (str): HTML解析后端
+            script_concurrency (int): 每个主机同时下载脚本的最大数量
+            deep_budget (int): 深度扫描每层最多扫描的页面数
+            checkpoint (Checkpoint): 扫描检查点，为None时不记录
+            target (str): 检查点记录使用的目标URL
+            endpoints (EndpointIndex): 目标的端点索引，默认新建
+            max_body (int): 探测请求最多读取的响应体字节数，0表示不限制
+            methods (list): 探测使用的HTTP方法，第一个为主方法
+            probe_strategy (str): 探测策略，full / head / options
+            profiler (Profiler): 性能分析器，默认不开启
+            extractor (ParallelExtractor): 大脚本的进程池正则提取器，为None时在事件循环线程上提取
+            index (ScanIndex): 增量扫描索引，为None时不使用
+            source_maps (bool): 是否下载脚本的 source map 并从原始源文件中提取
+            lazy_chunks (bool): 是否还原并下载懒加载分块
+            max_chunks (int): 每个页面最多下载的懒加载分块数
+            request_slot (RequestSlot): 批量扫描时的全局请求配额，为None时只受 concurrency 限制
+        """
+        self.output = output
+        self.report_probe = report_probe
+        self.probe_headers = probe_headers
+        self.page_headers = page_headers
+        self.cookies = {"Cookie": cookie} if cookie else None
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.response_cache = response_cache
+        self._inflight = {}
+        self.concurrency = max(1, concurrency)
+        self.max_depth = max_depth
+        self.proxy = proxy
+        self.html_parser = html_parser
+        self.script_concurrency = max(1, script_concurrency)
+        self._script_semaphores = {}
+        self.deep_budget = deep_budget
+        self.checkpoint = checkpoint
+        self.target = target
+        self.endpoints = endpoints if endpoints is not None else EndpointIndex()
+        self.max_body = max_body
+        self.methods = list(methods)
+        self.probe_strategy = probe_strategy
+        self.profiler = profiler or Profiler()
+        self.extractor = extractor
+        self.index = index
+        self.source_maps = source_maps
+        self.lazy_chunks = lazy_chunks
+        self.max_chunks = max_chunks
+        self.request_slot = request_slot
+        self._session = None
+        self._semaphore = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """
+        占用全局请求配额；配额由线程条件变量保护，不能在事件循环中阻塞等待，只能轮询。
+        与线程引擎相同，调用方在读完响应体、关闭响应之后才退出，配额限制的是完整的传输而不只是发出请求
+        """
+        if self.request_slot is None:
+            yield
+            return
+        delay = 0.005
+        while not self.request_slot.acquire(blocking=False):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            self.request_slot.release()
+
+    def record_error(self, error):
+        """按异常类型计数一次没有拿到响应的请求，HTTP状态错误在收到响应时已按状态码计数"""
+        if isinstance(error, aiohttp.TooManyRedirects):
+            self.output.metrics.record_error("redirect")
+        elif isinstance(error, asyncio.TimeoutError):
+            self.output.metrics.record_error("timeout")
+        elif isinstance(error, aiohttp.ClientSSLError):
+            self.output.metrics.record_error("ssl")
+        elif isinstance(error, aiohttp.ClientConnectionError):
+            self.output.metrics.record_error("connection")
+        elif not isinstance(error, aiohttp.ClientResponseError):
+            self.output.metrics.record_error("other")
+
+    def run(self, url):
+        """同步入口，在新的事件循环中扫描一个目标"""
+        asyncio.run(self._run(url))
+
+    async def _run(self, url):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as session:
+            self._session = session
+            self._script_semaphores = {}
+            self._inflight = {}
+            await self.crawl(url, DeepScanManager(url, self.max_depth))
+        self._session = None
+
+    async def wait_for_host(self, host):
+        """按主机限速，在占用并发名额之前等待"""
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve(host)
+            if wait > 0:
+                self.profiler.add_stage("rate_wait", wait)
+                await asyncio.sleep(wait)
+
+    def observe(self, host, status=None, latency=None, retry_after=None):
+        """反馈请求结果给限速器和性能分析器，status 为None表示连接失败或超时"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(host, status, latency, retry_after)
+        self.profiler.record_request(host, "error" if status is None else status, latency)
+
+    async def fetch_page(self, url, max_retries=3):
+        """
+        异步获取页面或脚本内容，对应线程引擎的 Extract_html
+        先查响应缓存，同一URL的并发抓取共用一个请求
+
+        Returns:
+            str: 页面内容，失败时为None
+        """
+        if self.response_cache is not None:
+            cached = self.response_cache.get("page", "GET", url)
+            if cached is not None:
+                self.output.print_verbose(f"♻️ Using cached content: {url}")
+                return cached.text
+        task = self._inflight.get(url)
+        if task is None:
+            task = self._inflight[url] = asyncio.ensure_future(self._timed_fetch_page(url, max_retries))
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await task
+
+    async def _timed_fetch_page(self, url, max_retries):
+        with self.profiler.stage("fetch"):
+            return await self._fetch_page(url, max_retries)
+
+    async def _fetch_page(self, url, max_retries):
+        retry_delay = 1
+        timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=30)
+        host = urlparse(url).netloc
+        headers = self.page_headers()
+        if self.response_cache is not None:
+            headers.update(self.response_cache.validators(url))
+        for attempt in range(max_retries):
+            try:
+                await self.wait_for_host(host)
+                started = time.monotonic()
+                async with self._semaphore, self.slot():
+                    async with self._session.get(url, headers=headers, cookies=self.cookies,
+                                                 proxy=self.proxy, timeout=timeout) as resp:
+                        self.observe(host, resp.status, time.monotonic() - started, resp.headers.get('Retry-After'))
+                        self.output.metrics.record_response(resp.status)
+                        if resp.status == 304 and self.response_cache is not None:
+                            content = self.response_cache.revalidated(url)
+                            if content is not None:
+                                self.output.print_verbose(f"♻️ Not modified, using disk cache: {url}")
+                                self.response_cache.put("page", "GET", url, CachedResponse(content))
+                                return content
+                            # 发出条件请求后磁盘缓存被清除或损坏，304没有内容，不带验证头重新请求
+                            for name in VALIDATOR_HEADERS:
+                                headers.pop(name, None)
+                            if attempt < max_retries - 1:
+                                self.output.print_verbose(f"🔄 304 without a cached copy, refetching: {url}")
+                                continue
+                            self.output.print_error(f"Not modified but no cached copy for {url}")
+                            return None
+                        resp.raise_for_status()
+                        raw = await resp.read()
+                        response_headers = resp.headers
+                self.profiler.record_bytes(host, len(raw))
+                self.output.metrics.incr("bytes", len(raw))
+                if str(resp.url) != url:
+                    self.output.print_verbose(f"🔄 Redirect detected: {url} -> {resp.url}")
+                self.output.print_verbose(f"✅ Successfully retrieved HTML content: {url}")
+                content = raw.decode("utf-8", "ignore")
+                if self.response_cache is not None:
+                    self.response_cache.put("page", "GET", url, CachedResponse(content))
+                    self.response_cache.store_disk(url, content, response_headers)
+                return content
+            except Exception as e:
+                self.record_error(e)
+                if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                    self.observe(host, latency=time.monotonic() - started)
+                if isinstance(e, aiohttp.ClientResponseError) and e.status in (429, 503) and attempt < max_retries - 1:
+                    self.output.print_verbose(f"⏳ {e.status} from {host}, slowing down and retrying: {url}")
+                    continue
+                if attempt < max_retries - 1:
+                    self.output.print_verbose(f"🔄 Error on attempt {attempt + 1}, retrying: {url}")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    self.output.print_error(f"Request failed after {max_retries} attempts {url}: {str(e)}")
+        return None
+
+    async def fetch_script(self, url):
+        """按主机限制并发下载外部脚本"""
+        host = urlparse(url).netloc
+        semaphore = self._script_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._script_semaphores[host] = asyncio.Semaphore(self.script_concurrency)
+        async with semaphore:
+            return await self.fetch_page(url)
+
+    async def extract_script(self, script_url, content):
+        """对应线程引擎的 extract_script：使用索引时未变化的脚本直接使用上次的结果"""
+        rules = URLExtractor.rules_fingerprint()
+        if self.index is not None:
+            cached = self.index.script_urls(script_url, content, rules)
+            if cached is not None:
+                self.output.print_verbose(f"♻️ Script unchanged since last scan: {script_url}")
+                return cached
+        with self.profiler.regex(script_url, len(content)):
+            if self.extractor is not None and self.extractor.should_split(content):
+                # 等待进程池结果时不阻塞事件循环，其他页面的请求继续进行
+                urls = await asyncio.get_running_loop().run_in_executor(
+                    None, URLExtractor.extract_urls, content, self.extractor)
+            else:
+                urls = URLExtractor.extract_urls(content)
+        if self.index is not None:
+            self.index.store_script(script_url, content, rules, urls)
+        return urls
+
+    async def fetch_lazy_chunks(self, script_array, page=None):
+        """对应线程引擎的 fetch_lazy_chunks：逐轮还原并下载懒加载分块，原地加入 script_array"""
+        attempted = set()
+        fetched = 0
+        while len(attempted) < self.max_chunks:
+            with self.profiler.stage("chunks"):
+                chunk_urls = [chunk for chunk in find_chunk_urls(script_array, self.max_chunks)
+                              if chunk not in attempted][:self.max_chunks - len(attempted)]
+            if not chunk_urls:
+                break
+            self.output.print_verbose(f"🧩 Found {len(chunk_urls)} lazy chunks")
+            attempted.update(chunk_urls)
+            contents = await asyncio.gather(*(self.fetch_script(chunk) for chunk in chunk_urls))
+            for chunk, content in zip(chunk_urls, contents):
+                self.output.emit("script", url=chunk, page=page, ok=bool(content), bytes=len(content or ""))
+                if content:
+                    script_array[chunk] = content
+                    fetched += 1
+                else:
+                    self.output.print_warning(f"Cannot get external script: {chunk}")
+        if fetched:
+            self.output.count("lazy_chunks", fetched)
+        return fetched
+
+    async def source_map_urls(self, script_array, allurls):
+        """对应线程引擎的 source_map_urls：源文件的结果插在所属脚本之前"""
+        scripts = list(script_array.items())
+        found = await asyncio.gather(*(self.extract_source_map(script, content) for script, content in scripts))
+        merged = {}
+        if "HTML_attributes" in allurls:
+            merged["HTML_attributes"] = allurls["HTML_attributes"]
+        for (script, _), sources in zip(scripts, found):
+            merged.update(sources)
+            if script in allurls:
+                merged[script] = allurls[script]
+        return merged
+
+    async def extract_source_map(self, script_url, content):
+        """下载并解析脚本的 source map，结果按 .map 地址缓存，同一地址的并发请求共用一个任务"""
+        map_url = find_source_map_url(script_url, content)
+        if map_url is None:
+            return {}
+        key = f"{script_url}#inline-map" if map_url.startswith("data:") else map_url
+        cached = self.response_cache.get("sourcemap", "GET", key) if self.response_cache is not None else None
+        if cached is None:
+            task = self._inflight.get(("sourcemap", key))
+            if task is None:
+                task = self._inflight[("sourcemap", key)] = asyncio.ensure_future(self._read_source_map(map_url))
+                task.add_done_callback(lambda _: self._inflight.pop(("sourcemap", key), None))
+            found = await task
+            if self.response_cache is not None:
+                self.response_cache.put("sourcemap", "GET", key, CachedResponse(json.dumps(found or {}), success=found is not None))
+        else:
+            found = json.loads(cached.text)
+        if found:
+            self.output.print_verbose(f"🗺️ Source map for {script_url}: {len(found)} source files with URLs")
+        return {f"{script_url}::{name}": urls for name, urls in (found or {}).items()}
+
+    async def _read_source_map(self, map_url):
+        """
+        下载 source map 到临时文件（超过 MAP_SPOOL_SIZE 的部分落盘），再在线程中流式解析，不阻塞事件循环
+
+        Returns:
+            dict: {源文件名: [URL列表]}，失败时为None
+        """
+        analyzed = [0]
+
+        def extract(name, source):
+            analyzed[0] += 1
+            with self.profiler.regex(name, len(source)):
+                return URLExtractor.extract_urls(source, self.extractor)
+
+        loop = asyncio.get_running_loop()
+        spool = tempfile.SpooledTemporaryFile(max_size=MAP_SPOOL_SIZE)
+        try:
+            if map_url.startswith("data:"):
+                chunks = data_url_chunks(map_url)
+            else:
+                host = urlparse(map_url).netloc
+                timeout = aiohttp.ClientTimeout(sock_connect=10, sock_read=30)
+                await self.wait_for_host(host)
+                started = time.monotonic()
+                try:
+                    async with self._semaphore, self.slot():
+                        async with self._session.get(map_url, headers=self.page_headers(), cookies=self.cookies,
+                                                     proxy=self.proxy, timeout=timeout) as resp:
+                            self.observe(host, resp.status, time.monotonic() - started, resp.headers.get('Retry-After'))
+                            self.output.metrics.record_response(resp.status)
+                            if resp.status >= 400:
+                                self.output.print_verbose(f"🗺️ Source map unavailable ({resp.status}): {map_url}")
+                                return None
+                            while True:
+                                chunk = await resp.content.read(MAP_CHUNK_SIZE)
+                                if not chunk:
+                                    break
+                                spool.write(chunk)
+                                self.profiler.record_bytes(host, len(chunk))
+                                self.output.metrics.incr("bytes", len(chunk))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    self.record_error(e)
+                    self.observe(host, latency=time.monotonic() - started)
+                    self.output.print_verbose(f"🗺️ Cannot get source map {map_url}: {e}")
+                    return None
+                spool.seek(0)
+                chunks = iter(lambda: spool.read(MAP_CHUNK_SIZE), b"")
+            found = await loop.run_in_executor(None, extract_source_map, decode_chunks(chunks), extract)
+        except ValueError:
+            # 内联 source map 的base64不合法 (Malformed inline map)
+            return None
+        finally:
+            spool.close()
+        self.output.count("source_map_sources", analyzed[0])
+        return found
+
+    async def make_request(self, method, url, store, max_retries=2, max_redirects=5):
+        """异步发送单个探测请求，对应线程引擎的 make_request"""
+        if self.response_cache is not None:
+            cached = self.response_cache.get("probe", method, url)
+            if cached is not None:
+                store.update(method, cached.success, cached.text, cached.error, is_json=cached.is_json, length=cached.length,
+                             status=cached.status, allow=cached.allow)
+                return
+        retry_delay = 0.5
+        timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=self.timeout)
+        host = urlparse(url).netloc
+        for attempt in range(max_retries):
+            try:
+                await self.wait_for_host(host)
+                started = time.monotonic()
+                async with self._semaphore, self.slot(), self._session.request(
+                        method, url, headers=self.probe_headers(), cookies=self.cookies, proxy=self.proxy,
+                        timeout=timeout, max_redirects=max_redirects) as resp:
+                    self.observe(host, resp.status, time.monotonic() - started, resp.headers.get('Retry-After'))
+                    self.output.metrics.record_response(resp.status)
+                    if resp.status in (429, 503) and attempt < max_retries - 1:
+                        self.output.print_verbose(f"⏳ {resp.status} from {host}, slowing down and retrying: {url}")
+                        continue
+                    resp.raise_for_status()
+                    # 超过 max_body 即停止读取，退出时未读完的连接直接关闭
+                    body = BodyReader(self.max_body)
+                    while True:
+                        chunk = await resp.content.read(16384)
+                        if not chunk or not body.feed(chunk):
+                            break
+                    content_type = resp.headers.get('Content-Type', '')
+                    encoding = resp.charset or 'utf-8'
+                    status, allow = resp.status, resp.headers.get('Allow')
+                self.profiler.record_bytes(host, body.length)
+                self.output.metrics.incr("bytes", body.length)
+                text = body.preview.decode(encoding, "replace")
+                is_json = is_json_response(content_type, text, complete=body.complete)
+                store.update(method, True, text, is_json=is_json, length=body.length, status=status, allow=allow,
+                             elapsed=time.monotonic() - started)
+                if self.response_cache is not None:
+                    self.response_cache.put("probe", method, url, CachedResponse(text, is_json=is_json, length=body.length,
+                                                                                 status=status, allow=allow))
+                return
+            except aiohttp.TooManyRedirects as e:
+                self.record_error(e)
+                self.output.print_error(f"❌ 超过最大重定向次数({max_redirects})，终止请求: {url}")
+                store.update(method, False, None, f"Too many redirects (>{max_redirects})", is_json=False)
+                return
+            except Exception as e:
+                self.record_error(e)
+                if isinstance(e, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+                    self.observe(host, latency=time.monotonic() - started)
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2
+                else:
+                    error = f"Request error: {str(e) or type(e).__name__}"
+                    status = e.status if isinstance(e, aiohttp.ClientResponseError) else None
+                    store.update(method, False, None, error, status=status, elapsed=time.monotonic() - started)
+                    if isinstance(e, aiohttp.ClientResponseError) and self.response_cache is not None:
+                        self.response_cache.put("probe", method, url, CachedResponse(None, False, error=error, status=status))
+
+    async def do_request(self, url):
+        """按探测策略并发发送各方法并统一输出，对应线程引擎的 do_request"""
+        if self.probe_strategy == "full":
+            store = ResultStore(self.methods)
+        else:
+            cheap = self.probe_strategy.upper()
+            store = ResultStore([cheap])
+            await self.make_request(cheap, url, store)
+            methods = escalation_methods(self.probe_strategy, store.results[cheap], self.methods)
+            if not methods:
+                return self.report_probe(url, store)
+            store.escalate(methods)
+        await asyncio.gather(*(self.make_request(method, url, store) for method in store.results))
+        return self.report_probe(url, store)
+
+    async def process_url(self, target_url, source):
+        """探测一个已去重的端点"""
+        if self.checkpoint and self.checkpoint.is_probed(self.target, target_url):
+            return
+        if self.index is not None:
+            cached = self.index.cached_probe(self.target, target_url)
+            if cached is not None:
+                self.output.emit("probe", url=target_url, ok=cached["ok"], reused=True)
+                if cached["ok"]:
+                    self.output.print_url(target_url, source, True, sources=self.endpoints.sources(target_url))
+                if self.checkpoint:
+                    self.checkpoint.record_probe(self.target, target_url, source, cached["ok"])
+                return
+
+        try:
+            with self.profiler.stage("probe"):
+                resp = await self.do_request(target_url)
+            is_success = resp is not None
+        except Exception as e:
+            is_success = False
+            self.output.print_error(f"Error testing {target_url}: {str(e)}")
+        if is_success:
+            self.output.print_url(target_url, source, is_success, sources=self.endpoints.sources(target_url))
+        if self.checkpoint:
+            self.checkpoint.record_probe(self.target, target_url, source, is_success)
+        if self.index is not None:
+            self.index.record_probe(self.target, target_url, source, is_success)
+
+    async def scan_page(self, url, depth):
+        """
+        扫描单个页面：抓取、提取并探测发现的端点
+
+        Returns:
+            dict: {来源: [URL列表]}，页面无法访问时为None
+        """
+        if depth == 0:
+            self.output.print_scan_start(url)
+        else:
+            self.output.print_info(f"🔍 [bold blue]Deep scan (depth {depth}):[/bold blue] [green]{url}[/green]")
+
+        if self.checkpoint:
+            cached = self.checkpoint.get_page(self.target, url)
+            if cached is not None:
+                self.output.print_verbose(f"⏭️ Skipping page completed in checkpoint: {url}")
+                self.output.count("total_urls", sum(len(urls) for urls in cached.values()))
+                return cached
+
+        html_raw = await self.fetch_page(url)
+        self.output.emit("page", url=url, depth=depth, ok=html_raw is not None, bytes=len(html_raw or ""))
+        if html_raw is None:
+            self.output.print_error(f"Cannot access {url}")
+            return None
+
+        with self.profiler.stage("parse"):
+            html = ParsedDocument.parse(html_raw, backend=self.html_parser)
+            html_urls = URLExtractor.extract_urls_from_html(html)
+        self.output.print_verbose(f"📋 Found {len(html_urls)} URLs in HTML attributes")
+
+        # 内联脚本拼接，外部脚本并发下载
+        script_temp = ""
+        external_scripts = []
+        for script_src, script_text in html.scripts:
+            if script_src is None:
+                script_temp += script_text + "\n"
+            else:
+                external_scripts.append(URLProcessor.process_url(url, script_src))
+
+        external_scripts = list(dict.fromkeys(external_scripts))
+        contents = await asyncio.gather(*(self.fetch_script(purl) for purl in external_scripts))
+        script_array = {}
+        for purl, content in zip(external_scripts, contents):
+            self.output.emit("script", url=purl, page=url, ok=bool(content), bytes=len(content or ""))
+            if content:
+                script_array[purl] = content
+            else:
+                self.output.print_warning(f"Cannot get external script: {purl}")
+        script_array[url] = script_temp
+
+        # 路由拆分的懒加载分块 (Lazy route chunks referenced by the runtime)
+        if self.lazy_chunks:
+            await self.fetch_lazy_chunks(script_array, url)
+
+        allurls = {}
+        if html_urls:
+            allurls["HTML_attributes"] = html_urls
+        for script, content in script_array.items():
+            self.output.print_verbose(f"🔎 Analyzing script: {script}")
+            temp_urls = await self.extract_script(script, content)
+            if temp_urls:
+                allurls[script] = temp_urls
+
+        # 原始源文件中的URL (URLs from the original sources in source maps)
+        if self.source_maps:
+            allurls = await self.source_map_urls(script_array, allurls)
+
+        # 每个规范化后的端点只探测一次，其余来源只做记录
+        total_urls = sum(len(urls) for urls in allurls.values())
+        endpoints = []
+        with self.profiler.stage("dedupe"):
+            for source, urls in allurls.items():
+                for j in urls:
+                    target_url = URLProcessor.resolve_endpoint(j, url)
+                    if self.endpoints.add(target_url, source):
+                        endpoints.append((target_url, source))
+                        self.output.emit("endpoint", url=target_url, source=source, page=url)
+        if endpoints:
+            self.output.print_info(f"🎯 [bold green]Found {total_urls} potential API endpoints ({len(endpoints)} new unique). Testing them...[/bold green]")
+            await asyncio.gather(*(self.process_url(target_url, source) for target_url, source in endpoints))
+        elif total_urls > 0:
+            self.output.print_info(f"🎯 [bold green]Found {total_urls} potential API endpoints, all already tested[/bold green]")
+        else:
+            self.output.print_warning("⚠️ No API endpoints discovered in the scanned content")
+
+        self.output.count("total_urls", total_urls)
+        if self.checkpoint:
+            self.checkpoint.record_page(self.target, url, allurls)
+        return allurls
+
+    async def scan_page_safely(self, url, depth):
+        """扫描单个页面，深度扫描页面出错时只记录错误"""
+        if depth == 0:
+            return await self.scan_page(url, depth)
+        try:
+            return await self.scan_page(url, depth)
+        except Exception as e:
+            self.output.print_error(f"Error in deep scan for {url}: {str(e)}")
+            return None
+
+    async def crawl(self, url, deep_scan_manager):
+        """广度优先逐层扫描，同一层的页面并发扫描"""
+        if not deep_scan_manager.try_claim(url):
+            return
+        frontier = [url]
+        depth = 0
+        while frontier:
+            page_results = await asyncio.gather(*(self.scan_page_safely(page_url, depth) for page_url in frontier))
+            if depth >= deep_scan_manager.max_depth:
+                break
+            frontier, found = deep_scan_manager.select_frontier(
+                [(page_url, r) for page_url, r in zip(frontier, page_results) if r], self.deep_budget)
+            depth += 1
+            if found:
+                self.output.print_info(f"🔍 [bold yellow]Found {found} URLs for deep scan (depth {depth})...[/bold yellow]")
+                if found > len(frontier):
+                    self.output.print_warning(f"⚠️ Limiting deep scan to {len(frontier)} URLs (found {found})")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描检查点模块 (Scan Checkpoint Module)
+以追加写入的JSONL日志记录已完成的目标、已扫描的页面和已探测的端点，
+扫描中断后可以用 --resume 跳过已完成的工作
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+
+class Checkpoint:
+    """
+    追加写入的扫描日志 (Append-only scan journal)
+
+    每行一条记录，type 取值：
+        probe  - 端点探测完成 {target, url, source, ok, ts}
+        page   - 页面扫描完成 {target, url, urls}，urls 为该页面的 {来源: [URL列表]}
+        target - 目标扫描完成 {target}
+
+    页面记录在该页面所有端点探测完成后才写入，因此恢复时命中页面记录即可整体跳过该页面。
+    查询方法只反映加载的旧日志，本次运行写入的记录不影响本次扫描。
+    """
+
+    def __init__(self, path, resume=False):
+        """
+        初始化检查点
+
+        Args:
+            path (str): 日志文件路径
+            resume (bool): 是否加载已有日志继续扫描，否则清空重写
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.done_targets = set()
+        self._pages = {}
+        self._probes = {}
+
+        if resume and os.path.exists(path):
+            self._load()
+            self._file = open(path, 'a', encoding='utf-8', buffering=1)
+            # 上次可能在写入一半时中断，保证新记录从新的一行开始
+            if os.path.getsize(path) > 0:
+                with open(path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._file.write("\n")
+        else:
+            directory = os.path.dirname(path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._file = open(path, 'w', encoding='utf-8', buffering=1)
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 中断时写了一半的行
+                    continue
+                record_type = record.get("type")
+                target = record.get("target")
+                if record_type == "probe":
+                    self._probes[(target, record["url"])] = record
+                elif record_type == "page":
+                    self._pages[(target, record["url"])] = record["urls"]
+                elif record_type == "target":
+                    self.done_targets.add(target)
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def record_probe(self, target, url, source, ok):
+        """记录一次端点探测"""
+        self._write({"type": "probe", "target": target, "url": url, "source": source, "ok": ok, "ts": time.time()})
+
+    def record_page(self, target, url, urls):
+        """记录一个页面扫描完成及其提取结果"""
+        self._write({"type": "page", "target": target, "url": url, "urls": urls})
+
+    def record_target(self, target):
+        """记录一个目标扫描完成"""
+        self._write({"type": "target", "target": target})
+
+    def is_target_done(self, target):
+        return target in self.done_targets
+
+    def get_page(self, target, url):
+        """返回已完成页面的提取结果，未完成时为None"""
+        return self._pages.get((target, url))
+
+    def is_probed(self, target, url):
+        """该端点在上次运行中是否已探测过"""
+        return (target, url) in self._probes
+
+    def restored_results(self, target):
+        """
+        上次运行中该目标探测成功的结果
+
+        Returns:
+            list: 与 OutputManager.results 相同格式的结果字典
+        """
+        results = []
+        for (probe_target, url), record in self._probes.items():
+            if probe_target == target and record.get("ok"):
+                results.append({
+                    "url": url,
+                    "source": record.get("source", ""),
+                    "timestamp": datetime.fromtimestamp(record.get("ts", time.time())).isoformat()
+                })
+        return results
+
+    def close(self):
+        with self._lock:
+            self._file.close()
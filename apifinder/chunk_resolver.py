@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+懒加载分块解析模块 (Lazy Chunk Resolver Module)
+路由拆分的分块只有在运行时才由 webpack 运行时（__webpack_require__.u / jsonpScriptSrc）
+或 Vite 的 import() 加载，初始HTML中没有对应的 <script src>。
+这里从已下载的脚本中还原分块URL：webpack 运行时中的分块URL表达式按分块ID逐个求值，
+Vite/ES模块按 import() 和相对 import 语句的路径解析
+"""
+
+import re
+from urllib.parse import urljoin, urlparse
+
+# webpack 5: r.u=e=>..., r.u=function(e){return ...}
+_WEBPACK5_RUNTIME = re.compile(
+    r'\.u\s*=\s*(?:function\s*\(\s*([\w$]+)\s*\)\s*\{\s*return\b\s*|\(?\s*([\w$]+)\s*\)?\s*=>\s*(?:\{\s*return\b\s*)?)'
+)
+# webpack 4: function jsonpScriptSrc(e){return r.p+...}，压缩后函数名不固定，以返回 X.p+ 识别
+_WEBPACK4_RUNTIME = re.compile(r'function\s*[\w$]*\s*\(\s*([\w$]+)\s*\)\s*\{\s*return\b\s*(?=[\w$]+\.p\s*\+)')
+# 公共路径赋值 r.p="/"
+_PUBLIC_PATH = re.compile(r'\b[\w$]+\.p\s*=\s*(["\'])([^"\']*)\1')
+# 代码中按ID加载分块 r.e(123) / r.e("about")
+_CHUNK_LOAD = re.compile(r'\b[\w$]+\.e\(\s*(\d+|"[^"]+"|\'[^\']+\')\s*\)')
+# Vite/ES模块的动态 import() 和相对的静态 import
+_DYNAMIC_IMPORT = re.compile(r'\bimport\(\s*(["\'])([^"\']+?\.m?js)\1\s*\)')
+_STATIC_IMPORT = re.compile(r'\bfrom\s*(["\'])(\.{1,2}/[^"\']+?\.m?js)\1')
+# 对象字面量中的 键:"字符串值"
+_OBJECT_ENTRY = re.compile(r'(?:"([^"]*)"|\'([^\']*)\'|([\w$]+))\s*:\s*(?:"([^"]*)"|\'([^\']*)\')')
+_STRING = re.compile(r'^(["\'])(.*)\1$', re.DOTALL)
+
+# 分块URL表达式的最大长度，超过时视为无法识别 (Longest runtime expression considered)
+MAX_EXPRESSION_CHARS = 256 * 1024
+
+_CLOSE = {"(": ")", "[": "]", "{": "}"}
+
+
+def _read_expression(content, start):
+    """从 start 开始读取一个表达式，遇到顶层的 ; , } ) 时结束，括号和字符串内的字符不计"""
+    depth = []
+    quote = None
+    end = min(len(content), start + MAX_EXPRESSION_CHARS)
+    i = start
+    while i < end:
+        char = content[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in _CLOSE:
+            depth.append(_CLOSE[char])
+        elif depth and char == depth[-1]:
+            depth.pop()
+        elif not depth and char in ";,})":
+            return content[start:i]
+        i += 1
+    return None
+
+
+def _split_top_level(expression, separator):
+    """按顶层的分隔符切分表达式"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    i = 0
+    while i < len(expression):
+        char = expression[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif depth == 0 and expression.startswith(separator, i):
+            parts.append(expression[start:i].strip())
+            i += len(separator)
+            start = i
+            continue
+        i += 1
+    parts.append(expression[start:].strip())
+    return parts
+
+
+def _strip_parens(term):
+    while term.startswith("(") and term.endswith(")") and _read_expression(term, 1) == term[1:-1]:
+        term = term[1:-1].strip()
+    return term
+
+
+def _parse_object(literal):
+    """解析 {12:"about",34:"user"} 形式的对象字面量，只保留字符串值"""
+    mapping = {}
+    for match in _OBJECT_ENTRY.finditer(literal):
+        key = next(group for group in match.groups()[:3] if group is not None)
+        mapping[key] = match.group(4) if match.group(4) is not None else match.group(5)
+    return mapping
+
+
+class ChunkExpression:
+    """
+    webpack 运行时中的分块URL表达式，例如 "static/js/"+e+"."+{12:"a1b2"}[e]+".chunk.js"
+
+    Attributes:
+        terms (list): 按顺序的项：("str", 文本) / ("id",) / ("map", 映射, 回退) / ("public",)
+        chunk_ids (list): 表达式中映射表出现的分块ID
+    """
+
+    def __init__(self, terms):
+        self.terms = terms
+        ids = []
+        for term in terms:
+            if term[0] == "map":
+                ids.extend(key for key in term[1] if key not in ids)
+        self.chunk_ids = ids
+
+    @classmethod
+    def parse(cls, expression, var):
+        """
+        解析表达式，包含无法识别的项时返回None
+
+        Args:
+            expression (str): 表达式源码
+            var (str): 分块ID参数名
+        """
+        terms = []
+        for term in _split_top_level(expression, "+"):
+            parsed = cls._parse_term(_strip_parens(term), var)
+            if parsed is None:
+                return None
+            terms.append(parsed)
+        return cls(terms) if terms else None
+
+    @classmethod
+    def _parse_term(cls, term, var):
+        string = _STRING.match(term)
+        if string:
+            return ("str", string.group(2))
+        if term == var:
+            return ("id",)
+        if re.fullmatch(r'[\w$]+\.p', term):
+            return ("public",)
+        alternatives = _split_top_level(term, "||")
+        if len(alternatives) == 2:
+            lookup = cls._parse_term(_strip_parens(alternatives[0]), var)
+            fallback = cls._parse_term(_strip_parens(alternatives[1]), var)
+            if lookup and lookup[0] == "map" and fallback and fallback[0] in ("id", "str"):
+                return ("map", lookup[1], fallback)
+            return None
+        # {…}[e] 或 ({…})[e]
+        if term.endswith(f"[{var}]"):
+            literal = _strip_parens(term[:-len(var) - 2].strip())
+            if literal.startswith("{") and literal.endswith("}"):
+                return ("map", _parse_object(literal), None)
+        return None
+
+    def evaluate(self, chunk_id, public_path):
+        """
+        按分块ID求值
+
+        Returns:
+            str: 分块路径，映射表中没有该ID且没有回退时为None
+        """
+        parts = []
+        for term in self.terms:
+            kind = term[0]
+            if kind == "str":
+                parts.append(term[1])
+            elif kind == "id":
+                parts.append(chunk_id)
+            elif kind == "public":
+                parts.append(public_path)
+            else:
+                value = term[1].get(chunk_id)
+                if value is None:
+                    fallback = term[2]
+                    if fallback is None:
+                        return None
+                    value = chunk_id if fallback[0] == "id" else fallback[1]
+                parts.append(value)
+        return "".join(parts)
+
+
+def _public_base(script_url, path, public_path):
+    """
+    分块路径的基准URL：有 X.p="..." 时按公共路径解析，
+    否则在运行时脚本的路径中找到分块路径的目录前缀（如 static/js/），取它之前的部分；
+    分块路径不含目录时与运行时脚本同目录（webpack 5 的 publicPath: "auto"）
+    """
+    if public_path is not None:
+        return urljoin(script_url, public_path)
+    if "/" not in path:
+        return script_url
+    directory = path.rsplit("/", 1)[0] + "/"
+    script_path = urlparse(script_url).path
+    if directory in script_path:
+        return urljoin(script_url, script_path[:script_path.rindex(directory)])
+    return urljoin(script_url, "/")
+
+
+def find_chunk_urls(scripts, limit=200):
+    """
+    从已下载的脚本中还原懒加载分块的URL
+
+    Args:
+        scripts (dict): {脚本URL: 内容}
+        limit (int): 最多返回的分块数
+
+    Returns:
+        list: 不在 scripts 中的分块绝对URL，按发现顺序去重
+    """
+    runtimes = []
+    loaded_ids = []
+    found = []
+    seen = set(scripts)
+
+    def add(url):
+        if url not in seen and len(found) < limit:
+            seen.add(url)
+            found.append(url)
+
+    for script_url, content in scripts.items():
+        if not content:
+            continue
+        for match in _CHUNK_LOAD.finditer(content):
+            chunk_id = match.group(1).strip("\"'")
+            if chunk_id not in loaded_ids:
+                loaded_ids.append(chunk_id)
+        for pattern in (_WEBPACK5_RUNTIME, _WEBPACK4_RUNTIME):
+            for match in pattern.finditer(content):
+                var = next(group for group in match.groups() if group)
+                source = _read_expression(content, match.end())
+                expression = ChunkExpression.parse(source, var) if source else None
+                if expression is not None:
+                    public = _PUBLIC_PATH.search(content)
+                    runtimes.append((script_url, expression, public.group(2) if public else None))
+        # Vite/ES模块：相对于引用它的模块解析 (Relative to the importing module)
+        for pattern in (_DYNAMIC_IMPORT, _STATIC_IMPORT):
+            for match in pattern.finditer(content):
+                add(urljoin(script_url, match.group(2)))
+
+    for script_url, expression, public_path in runtimes:
+        chunk_ids = expression.chunk_ids + [chunk_id for chunk_id in loaded_ids if chunk_id not in expression.chunk_ids]
+        for chunk_id in chunk_ids:
+            path = expression.evaluate(chunk_id, public_path or "")
+            if not path or not path.endswith((".js", ".mjs")):
+                continue
+            if "://" in path or path.startswith("//"):
+                add(urljoin(script_url, path))
+            else:
+                add(urljoin(_public_base(script_url, path, public_path), path.lstrip("/") if public_path is None else path))
+    return found
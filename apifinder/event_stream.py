@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSONL事件流模块 (JSONL Event Stream Module)
+--jsonl 模式下把扫描过程中的每个事件写成一行紧凑的JSON，直接写入 stdout 的字节缓冲区，
+不经过Rich的标记解析和渲染；事件先累积在内存缓冲区中，攒够一块或间隔到期时才写出
+
+事件类型：
+    target   - 开始扫描一个目标 {target}
+    page     - 页面抓取完成 {target, url, depth, ok, bytes}
+    script   - 外部脚本或懒加载分块下载完成 {target, url, page, ok, bytes}
+    endpoint - 发现新的唯一端点 {target, url, source, page}
+    probe    - 一个方法的探测结果 {target, url, method, ok, status, bytes, latency_ms, json, error}
+    result   - 确认存活的端点 {target, url, source, sources}
+    changes  - 与增量扫描索引的差异 {target, new, removed, changed}
+    stats    - 扫描结束时的汇总统计
+"""
+
+import sys
+import json
+import time
+import threading
+
+# 缓冲区超过这个大小（字节）时立即写出 (Flush once this many bytes are pending)
+BUFFER_SIZE = 64 * 1024
+
+# 事件较少时最长的写出间隔（秒），下游仍能及时看到结果 (Longest delay before pending events are written)
+FLUSH_INTERVAL = 1.0
+
+
+class EventStream:
+    """
+    带缓冲的JSONL事件写入器，线程安全 (Buffered, thread-safe JSONL event writer)
+
+    Attributes:
+        events (int): 已写入的事件数
+        closed (bool): 已关闭或下游已断开（管道被关闭时不再写入，也不抛出异常）
+    """
+
+    def __init__(self, stream=None, buffer_size=BUFFER_SIZE, flush_interval=FLUSH_INTERVAL):
+        """
+        Args:
+            stream: 二进制输出流，默认为 sys.stdout.buffer
+            buffer_size (int): 缓冲区大小（字节）
+            flush_interval (float): 最长写出间隔（秒），为0时不启动后台写出线程
+        """
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self.buffer_size = buffer_size
+        self.events = 0
+        self.closed = False
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+        self._stop = threading.Event()
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_periodically, args=(flush_interval,), daemon=True)
+            self._flusher.start()
+
+    def emit(self, event, **fields):
+        """写入一个事件，值为None的字段省略"""
+        record = {"event": event, "ts": round(time.time(), 3)}
+        for key, value in fields.items():
+            if value is not None:
+                record[key] = value
+        line = (self._dumps(record) + "\n").encode("utf-8")
+        with self._lock:
+            if self.closed:
+                return
+            self._buffer += line
+            self.events += 1
+            if len(self._buffer) >= self.buffer_size:
+                self._flush_locked()
+
+    def for_target(self, target):
+        """返回自动附带 target 字段的视图，批量扫描时每个目标一个"""
+        return TargetEvents(self, target)
+
+    def _flush_locked(self):
+        if not self._buffer or self.closed:
+            return
+        try:
+            self.stream.write(self._buffer)
+            self.stream.flush()
+        except (BrokenPipeError, ValueError, OSError):
+            # 下游（例如 | head）已关闭，丢弃之后的事件 (Downstream went away)
+            self.closed = True
+        self._buffer.clear()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_periodically(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def close(self):
+        """写出剩余事件并停止后台写出线程"""
+        self._stop.set()
+        with self._lock:
+            self._flush_locked()
+            self.closed = True
+
+
+class TargetEvents:
+    """单个目标的事件视图，每个事件自动带上 target 字段"""
+
+    __slots__ = ("stream", "target")
+
+    def __init__(self, stream, target):
+        self.stream = stream
+        self.target = target
+
+    def emit(self, event, **fields):
+        self.stream.emit(event, target=self.target, **fields)
+
+    def for_target(self, target):
+        return self.stream.for_target(target)
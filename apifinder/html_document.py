@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML文档解析模块 (HTML Document Module)
+一次遍历同时得到脚本、URL属性、data-*属性和标题，供页面分析和探测结果共用
+"""
+
+from html.parser import HTMLParser
+
+# 可能携带URL的 (标签, 属性) 组合
+URL_ATTRIBUTES = frozenset({
+    ('a', 'href'),
+    ('link', 'href'),
+    ('img', 'src'),
+    ('script', 'src'),
+    ('iframe', 'src'),
+    ('form', 'action'),
+    ('area', 'href'),
+    ('source', 'src'),
+    ('track', 'src'),
+    ('audio', 'src'),
+    ('video', 'src'),
+    ('embed', 'src'),
+    ('object', 'data'),
+    ('frame', 'src'),
+    ('meta', 'content'),
+    ('base', 'href'),
+})
+
+# 支持的解析后端
+BACKENDS = ("bs4", "stream")
+
+
+class ParsedDocument:
+    """
+    单次解析后的HTML文档
+
+    Attributes:
+        scripts (list): (src, text) 列表，外部脚本的text为空，内联脚本的src为None
+        url_attributes (list): URL属性值列表，按文档顺序
+        data_attributes (list): data-*属性值列表，按文档顺序
+        title (str): 页面标题，没有时为None
+    """
+
+    __slots__ = ("scripts", "url_attributes", "data_attributes", "title")
+
+    def __init__(self):
+        self.scripts = []
+        self.url_attributes = []
+        self.data_attributes = []
+        self.title = None
+
+    @classmethod
+    def parse(cls, html_content, backend="bs4"):
+        """
+        解析HTML (Parse HTML)
+
+        Args:
+            html_content (str): HTML内容
+            backend (str): "bs4" 使用BeautifulSoup一次遍历，"stream" 使用 html.parser 事件流
+
+        Returns:
+            ParsedDocument: 解析结果
+        """
+        if backend == "stream":
+            return _StreamingParser().run(html_content)
+        return _parse_with_bs4(html_content)
+
+    def _add_attributes(self, tag, attrs):
+        for attr, value in attrs:
+            if not isinstance(value, str):
+                continue
+            if (tag, attr) in URL_ATTRIBUTES:
+                self.url_attributes.append(value)
+            elif attr.startswith('data-'):
+                self.data_attributes.append(value)
+
+
+def _parse_with_bs4(html_content):
+    from bs4 import BeautifulSoup
+
+    doc = ParsedDocument()
+    soup = BeautifulSoup(html_content, "html.parser")
+    for tag in soup.find_all(True):
+        doc._add_attributes(tag.name, tag.attrs.items())
+        if tag.name == 'script':
+            src = tag.get('src')
+            doc.scripts.append((src, "" if src is not None else tag.get_text()))
+        elif tag.name == 'title' and doc.title is None and tag.string:
+            doc.title = str(tag.string)
+    return doc
+
+
+class _StopParsing(Exception):
+    """提前结束事件流解析"""
+
+
+class _StreamingParser(HTMLParser):
+    """
+    基于 html.parser 事件的流式解析后端，不构建DOM树
+    """
+
+    def __init__(self, title_only=False):
+        super().__init__(convert_charrefs=True)
+        self.doc = ParsedDocument()
+        self.title_only = title_only
+        self._script_src = None
+        self._script_parts = None
+        self._title_parts = None
+
+    def run(self, html_content):
+        try:
+            self.feed(html_content)
+            self.close()
+        except _StopParsing:
+            pass
+        self._flush_script()
+        return self.doc
+
+    def handle_starttag(self, tag, attrs):
+        if self.title_only:
+            if tag == 'title' and self.doc.title is None:
+                self._title_parts = []
+            return
+        self.doc._add_attributes(tag, attrs)
+        if tag == 'script':
+            self._flush_script()
+            self._script_src = dict(attrs).get('src')
+            self._script_parts = []
+        elif tag == 'title' and self.doc.title is None:
+            self._title_parts = []
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == 'script':
+            self._flush_script()
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self._flush_script()
+        elif tag == 'title' and self._title_parts is not None:
+            self.doc.title = "".join(self._title_parts)
+            self._title_parts = None
+            if self.title_only:
+                raise _StopParsing()
+
+    def handle_data(self, data):
+        if self._script_parts is not None:
+            self._script_parts.append(data)
+        elif self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def _flush_script(self):
+        if self._script_parts is None:
+            return
+        text = "".join(self._script_parts) if self._script_src is None else ""
+        self.doc.scripts.append((self._script_src, text))
+        self._script_src = None
+        self._script_parts = None
+
+
+def extract_title(html_content):
+    """
+    只读取页面标题，遇到 </title> 立即停止解析
+
+    Returns:
+        str: 标题，没有时为None
+    """
+    return _StreamingParser(title_only=True).run(html_content).title
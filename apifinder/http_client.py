@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP传输层 (HTTP Transport Layer)
+提供长连接复用、按主机划分连接池的线程安全HTTP客户端
+"""
+
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+class _RejectAllCookiesPolicy(DefaultCookiePolicy):
+    """
+    拒绝写入会话Cookie的策略
+    共享Session在多线程间复用，服务端的Set-Cookie不能串到其他请求里
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class PoolCountingAdapter(HTTPAdapter):
+    """
+    统计连接池命中/未命中的HTTP适配器
+
+    每次send都会从连接池取出一个连接，只有池中没有空闲连接时才会新建，
+    因此 命中数 = 发送次数 - 新建连接数
+    """
+
+    def __init__(self, client, **kwargs):
+        self._client = client
+        super().__init__(**kwargs)
+
+    def _pool_classes(self):
+        client = self._client
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):
+                client._incr("pool_misses")
+                return super()._new_conn()
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                client._incr("pool_misses")
+                return super()._new_conn()
+
+        return {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes()
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKS代理使用自己的连接池类型，这里只替换HTTP代理的
+        if not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = self._pool_classes()
+        return manager
+
+    def send(self, request, **kwargs):
+        self._client._incr("pool_requests")
+        return super().send(request, **kwargs)
+
+
+class HttpClient:
+    """
+    长生命周期的共享HTTP客户端
+
+    整个扫描过程只创建一个Session，所有请求共用同一组按主机划分的连接池，
+    同一主机的后续请求会复用已建立的TCP/TLS连接（keep-alive）。
+
+    Attributes:
+        session (requests.Session): 共享会话
+        pool_size (int): 每个主机的最大连接数
+    """
+
+    def __init__(self, pool_size=10, max_retries=1, verify=False):
+        """
+        初始化HTTP客户端
+
+        Args:
+            pool_size (int): 每个主机连接池大小，一般与 --threads 一致
+            max_retries (int): 底层连接失败时的重试次数
+            verify (bool): 是否校验SSL证书
+        """
+        # 每个工作线程会同时发出GET和POST两个请求
+        self.pool_size = max(1, pool_size) * 2
+        self._lock = threading.Lock()
+        self._counters = {"pool_requests": 0, "pool_misses": 0}
+
+        self.session = requests.Session()
+        self.session.verify = verify
+        self.session.cookies.set_policy(_RejectAllCookiesPolicy())
+
+        adapter = PoolCountingAdapter(
+            self,
+            pool_connections=max(10, pool_size),
+            pool_maxsize=self.pool_size,
+            # 429/503的Retry-After交给调用方的按主机限速器处理，不在连接层睡眠重试
+            max_retries=Retry(total=max_retries, respect_retry_after_header=False),
+            pool_block=False
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _incr(self, key, amount=1):
+        with self._lock:
+            self._counters[key] += amount
+
+    def request(self, method, url, **kwargs):
+        """
+        发送HTTP请求 (Send HTTP request)
+
+        Args:
+            method (str): 请求方法
+            url (str): 目标URL
+            **kwargs: 透传给 requests.Session.request 的参数
+
+        Returns:
+            requests.Response: 响应对象
+        """
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_stats(self):
+        """
+        获取连接池统计信息
+
+        Returns:
+            dict: pool_hits / pool_misses / pool_requests
+        """
+        with self._lock:
+            requests_sent = self._counters["pool_requests"]
+            misses = self._counters["pool_misses"]
+        return {
+            "pool_requests": requests_sent,
+            "pool_hits": max(0, requests_sent - misses),
+            "pool_misses": misses
+        }
+
+    def close(self):
+        """关闭所有连接池"""
+        self.session.close()
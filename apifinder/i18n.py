@@ -42,16 +42,42 @@ class I18nManager:
             'arg_cookie_help': 'Website Cookie for authentication',
             'arg_proxy_help': 'Proxy address, use "0" for auto proxy pool, supports socks5 and http',
             'arg_silent_help': 'Silent mode, only output discovered API endpoints',
-            'arg_output_help': 'Output file path (supports .txt, .json, .csv, .html, .xml, .xlsx, .md formats, default: no output)',
+            'arg_jsonl_help': 'Write one compact JSON object per event (page, script, endpoint, probe, result, stats) to stdout through a buffered writer that bypasses Rich; implies -s',
+            'arg_output_help': 'Output file path (supports .txt, .json, .jsonl, .csv, .html, .xml, .xlsx, .md formats; .jsonl/.csv/.html are written as results arrive; default: no output)',
             'arg_timeout_help': 'Request timeout (default: 10 seconds)',
-            'arg_delay_help': 'Request interval (default: 0.5 seconds)',
+            'arg_delay_help': 'Request interval per worker, used to derive the default per-host rate when --rate is not set (default: 0.5 seconds)',
+            'arg_rate_help': 'Maximum requests per second to each host; slows down on 429/503/Retry-After and recovers while latency is healthy (default: threads*2/delay)',
+            'arg_cache_size_help': 'In-memory response cache size in MB, shared by pages, scripts and probes; 0 disables it (default: 64)',
+            'arg_max_body_help': 'Maximum response body to read per probe in KB, larger bodies are cut off; 0 means unlimited (default: 1024)',
+            'arg_methods_help': 'Comma-separated HTTP methods used to probe endpoints, the first one decides whether an endpoint is alive (default: GET,POST)',
+            'arg_profile_help': 'Print a profile after the scan: per-stage timings, request latency per host/status, bytes received and regex time per script',
+            'arg_profile_json_help': 'Write the profile report to a JSON file (implies --profile)',
+            'arg_probe_strategy_help': 'Probe strategy: full sends every --methods request, head sends HEAD first and falls back on 405/501, options sends OPTIONS first and only the methods listed in Allow (default: full)',
+            'arg_extract_workers_help': 'Worker processes for regex extraction of large scripts, 0 uses the CPU count, 1 extracts on the calling thread (default: 0)',
+            'arg_extract_min_size_help': 'Scripts at least this large (KB) are split on string-literal boundaries and extracted in parallel (default: 1024)',
+            'arg_source_maps_help': 'Fetch the source maps referenced by sourceMappingURL and extract endpoints from each original source file, streamed with bounded memory',
+            'arg_lazy_chunks_help': 'Reconstruct lazily loaded chunk URLs from the webpack runtime and Vite import() calls, and scan those chunks too',
+            'arg_max_chunks_help': 'Maximum number of lazy chunks fetched per page (default: 200)',
+            'arg_cache_dir_help': 'Directory for a persistent page/script cache revalidated with ETag/Last-Modified (default: off)',
             'arg_verbose_help': 'Verbose output mode',
             'arg_random_help': 'Random User-Agent',
             'arg_app_help': 'Device User-Agent, default: common browser, weixin: WeChat, phone: mobile',
-            'arg_update_help': 'Force update the rules file (Force update of the rules file)',
+            'arg_update_help': 'Force update the rules file and exit; without it a due update check runs in the background',
             'arg_threads_help': 'Select the number of threads. The default is 10',
             'arg_depth_help': 'Select the depth of the scan. The default is 1',
             'arg_urlsfile_help': 'Select the file path of the urls',
+            'arg_engine_help': 'Scan engine: thread (default) or async (requires aiohttp)',
+            'arg_concurrency_help': 'Maximum in-flight requests for the async engine (default: 100)',
+            'arg_html_parser_help': 'HTML parser backend: bs4 (default) or stream (html.parser events, no DOM tree)',
+            'arg_script_concurrency_help': 'Maximum concurrent external script downloads per host (default: 8)',
+            'arg_crawl_threads_help': 'Number of pages scanned concurrently at each deep-scan depth (default: 4)',
+            'arg_deep_budget_help': 'Maximum number of pages scanned at each deep-scan depth (default: 10)',
+            'arg_batch_threads_help': 'Number of targets from -f scanned concurrently (default: 4)',
+            'arg_request_budget_help': 'Maximum in-flight requests shared by all batch targets, split evenly among targets still scanning (default: 100)',
+            'arg_checkpoint_help': 'Append-only JSONL journal recording finished targets, pages and probed endpoints',
+            'arg_resume_help': 'Resume from the --checkpoint journal, skipping work that already finished',
+            'arg_index_help': 'Persistent incremental scan index (JSON): unchanged scripts skip extraction, fresh probe results are reused, and each target reports new, removed and changed endpoints since the last scan',
+            'arg_reprobe_after_help': 'Re-probe endpoints whose indexed result is older than this many hours, 0 always re-probes (default: 24)',
 
 
             # Output messages (输出消息)
@@ -97,16 +123,42 @@ class I18nManager:
             'arg_cookie_help': '网站Cookie认证信息',
             'arg_proxy_help': '代理地址，使用"0"表示自动代理池，支持socks5和http',
             'arg_silent_help': '静默模式，仅输出发现的API端点',
-            'arg_output_help': '输出文件路径（支持.txt, .json, .csv, .html, .xml, .xlsx, .md格式，默认不输出）',
+            'arg_jsonl_help': '在 stdout 上每个事件输出一行紧凑的JSON（页面、脚本、端点、探测结果、确认结果、统计），经缓冲直接写出，不经过Rich；隐含 -s',
+            'arg_output_help': '输出文件路径（支持.txt, .json, .jsonl, .csv, .html, .xml, .xlsx, .md格式，其中.jsonl/.csv/.html边扫描边写入，默认不输出）',
             'arg_timeout_help': '请求超时时间（默认：10秒）',
-            'arg_delay_help': '请求间隔时间（默认：0.5秒）',
+            'arg_delay_help': '每个工作线程的请求间隔，未指定 --rate 时用于换算每个主机的默认速率（默认：0.5秒）',
+            'arg_rate_help': '每个主机每秒最多请求数，遇到429/503/Retry-After自动降速，延迟正常时逐步恢复（默认：线程数*2/间隔）',
+            'arg_cache_size_help': '内存响应缓存大小（MB），页面、脚本和探测结果共用，0表示关闭（默认：64）',
+            'arg_max_body_help': '每个探测请求最多读取的响应体大小（KB），超出部分直接断开，0表示不限制（默认：1024）',
+            'arg_methods_help': '探测端点使用的HTTP方法，逗号分隔，第一个方法决定端点是否存活（默认：GET,POST）',
+            'arg_profile_help': '扫描结束后输出性能分析：各阶段耗时、按主机/状态码的请求延迟、接收字节数和每个脚本的正则耗时',
+            'arg_profile_json_help': '把性能分析报告写入JSON文件（隐含 --profile）',
+            'arg_probe_strategy_help': '探测策略：full 发送 --methods 中的全部方法，head 先发HEAD、遇到405/501再完整探测，options 先发OPTIONS、只发送 Allow 中允许的方法（默认：full）',
+            'arg_extract_workers_help': '大脚本正则提取使用的工作进程数，0表示使用CPU核数，1表示只在当前线程提取（默认：0）',
+            'arg_extract_min_size_help': '不小于该大小（KB）的脚本按字符串字面量边界切块并行提取（默认：1024）',
+            'arg_source_maps_help': '下载 sourceMappingURL 指向的 source map，流式读取 sourcesContent，从每个原始源文件中提取端点',
+            'arg_lazy_chunks_help': '从 webpack 运行时和 Vite 的 import() 还原懒加载分块的URL，一并下载和分析',
+            'arg_max_chunks_help': '每个页面最多下载的懒加载分块数 (默认: 200)',
+            'arg_cache_dir_help': '页面/脚本的磁盘缓存目录，重复扫描时按ETag/Last-Modified重新验证（默认不启用）',
             'arg_verbose_help': '详细输出模式',
             'arg_random_help': '随机User-Agent',
             'arg_app_help': '设备User-Agent，默认：普通浏览器，weixin：微信，phone：手机',
-            'arg_update_help': '强制更新规则文件',
+            'arg_update_help': '强制更新规则文件后退出；不指定时到期的更新检查在后台进行，不阻塞扫描',
             'arg_threads_help': '选择线程数量，默认为10',
             'arg_depth_help': '选择扫描深度，默认为1',
             'arg_urlsfile_help': '选择URL文件路径',
+            'arg_engine_help': '扫描引擎：thread（默认）或 async（需要aiohttp）',
+            'arg_concurrency_help': '异步引擎同时在途的最大请求数（默认：100）',
+            'arg_html_parser_help': 'HTML解析后端：bs4（默认）或 stream（基于html.parser事件流，不构建DOM树）',
+            'arg_script_concurrency_help': '每个主机同时下载外部脚本的最大数量（默认：8）',
+            'arg_crawl_threads_help': '深度扫描时每层同时扫描的页面数（默认：4）',
+            'arg_deep_budget_help': '深度扫描每层最多扫描的页面数（默认：10）',
+            'arg_batch_threads_help': '批量扫描(-f)时同时扫描的目标数（默认：4）',
+            'arg_request_budget_help': '批量扫描时所有目标共享的最大在途请求数，由正在扫描的目标平分（默认：100）',
+            'arg_checkpoint_help': '检查点日志文件（JSONL，追加写入），记录已完成的目标、页面和已探测的端点',
+            'arg_resume_help': '从 --checkpoint 日志恢复扫描，跳过已完成的工作',
+            'arg_index_help': '增量扫描索引文件（JSON）：内容未变化的脚本跳过提取，沿用未过期的探测结果，每个目标报告与上次相比新增、消失和变化的端点',
+            'arg_reprobe_after_help': '索引中的探测结果超过多少小时后重新探测，0表示总是重新探测 (默认: 24)',
 
                 # 输出消息
             'scan_start': '开始API端点扫描...',
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片计数器模块 (Sharded Metrics Module)
+探测线程很多时，共享字典上的 stats[key] += 1 既会丢失计数，加锁又会让所有线程争用同一把锁。
+这里每个线程只写自己的分片字典，写入不加锁；读取时把所有分片汇总
+"""
+
+import threading
+
+# 分片数超过这个值时合并已退出线程的分片 (Fold shards of finished threads past this many)
+COMPACT_THRESHOLD = 64
+
+
+def status_class(status):
+    """HTTP状态码的类别，例如 404 -> "4xx" (Status class of an HTTP status code)"""
+    return f"{status // 100}xx" if isinstance(status, int) and 100 <= status < 600 else "other"
+
+
+class Metrics:
+    """
+    按线程分片的计数器 (Per-thread sharded counters)
+
+    每个线程第一次计数时注册一个分片，之后只有该线程写它，所以 incr 不需要锁；
+    snapshot 在锁内用 dict.copy()（在GIL下是原子的）复制每个分片再求和。
+    探测会为每个方法启动短命线程，注册时把已退出线程的分片合并进 _retired，分片数不会无限增长。
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._compact_at = COMPACT_THRESHOLD
+        self._lock = threading.Lock()
+
+    def _register(self):
+        shard = {}
+        with self._lock:
+            if len(self._shards) >= self._compact_at:
+                self._compact()
+            self._shards.append((threading.current_thread(), shard))
+        self._local.counts = shard
+        return shard
+
+    def _compact(self):
+        """合并已退出线程的分片，调用时持有 _lock (Caller holds _lock)"""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for name, value in shard.items():
+                    self._retired[name] = self._retired.get(name, 0) + value
+        self._shards = live
+        self._compact_at = max(COMPACT_THRESHOLD, len(live) * 2)
+
+    def incr(self, name, value=1):
+        """计数加 value，只写当前线程的分片"""
+        shard = getattr(self._local, "counts", None)
+        if shard is None:
+            shard = self._register()
+        shard[name] = shard.get(name, 0) + value
+
+    def snapshot(self):
+        """
+        汇总所有分片
+
+        Returns:
+            dict: {计数名: 总数}
+        """
+        with self._lock:
+            totals = dict(self._retired)
+            for _, shard in self._shards:
+                for name, value in shard.copy().items():
+                    totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def value(self, name):
+        """单个计数的当前总数"""
+        return self.snapshot().get(name, 0)
+
+    def record_response(self, status, nbytes=0):
+        """记录一次请求：总数、响应字节数和状态码类别"""
+        self.incr("requests")
+        if nbytes:
+            self.incr("bytes", nbytes)
+        self.incr("status_" + status_class(status))
+
+    def record_error(self, kind):
+        """记录一次没有拿到响应的请求，kind 为 timeout / connection / ssl / redirect / other"""
+        self.incr("requests")
+        self.incr("errors_" + kind)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程正则提取模块 (Multi-process Regex Extraction Module)
+几MB的压缩脚本上 URL 提取正则是纯CPU计算，在调用线程上只能用满一个核。
+超过阈值的脚本在字符串字面量边界切块，交给进程池并行匹配，再按块的顺序合并
+"""
+
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 默认只有超过这个大小（字节）的脚本才并行提取，小脚本的进程间传输开销大于收益
+DEFAULT_MIN_SIZE = 1024 * 1024
+
+# 每块至少这么大，避免把中等大小的脚本切得太碎
+MIN_CHUNK_SIZE = 256 * 1024
+
+
+def _find_matches(pattern, flags, text):
+    """在工作进程中匹配一块文本，返回去掉两端引号的结果；re 模块自带编译缓存，同一规则只编译一次"""
+    return [match.group().strip('"').strip("'") for match in re.compile(pattern, flags).finditer(text)]
+
+
+def _next_quote(text, pos):
+    """pos 之后第一个引号的位置，没有时返回-1"""
+    double = text.find('"', pos)
+    single = text.find("'", pos)
+    if double == -1 or single == -1:
+        return max(double, single)
+    return min(double, single)
+
+
+def split_on_literals(text, pattern, chunk_size):
+    """
+    在字符串字面量边界把文本切成大约 chunk_size 的块，各块独立匹配的结果按顺序拼接后与整体 finditer 相同
+
+    规则中的URL以引号开始、以其后第一个引号结束，内容不含引号。切分点选在一个不能作为匹配开头的引号上：
+    它之前的匹配最迟在这个引号处结束，顺序扫描到这里时下一个位置一定是引号之后，
+    所以前一块包含这个引号、后一块从引号之后开始，都不会改变匹配结果。
+
+    Args:
+        text (str): 脚本内容
+        pattern (re.Pattern): URL提取正则
+        chunk_size (int): 目标块大小
+
+    Returns:
+        list: (start, end) 切片列表，覆盖整个文本
+    """
+    spans = []
+    start = 0
+    while len(text) - start > chunk_size:
+        split = None
+        pos = start + chunk_size
+        while True:
+            quote = _next_quote(text, pos)
+            if quote == -1:
+                break
+            if pattern.match(text, quote) is None:
+                split = quote
+                break
+            pos = quote + 1
+        if split is None:
+            break
+        spans.append((start, split + 1))
+        start = split + 1
+    spans.append((start, len(text)))
+    return spans
+
+
+class ParallelExtractor:
+    """
+    进程池正则提取 (Process-pool regex extraction)
+    进程池在第一次遇到大脚本时才创建，使用 spawn 启动：扫描时进程中已有多个线程，fork 不安全
+
+    Attributes:
+        workers (int): 工作进程数，1表示只在调用线程上提取
+        min_size (int): 并行提取的最小脚本大小（字节）
+        parallel_runs (int): 并行提取过的脚本数
+    """
+
+    def __init__(self, workers=0, min_size=DEFAULT_MIN_SIZE):
+        """
+        Args:
+            workers (int): 工作进程数，0表示使用CPU核数
+            min_size (int): 并行提取的最小脚本大小（字节）
+        """
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.min_size = min_size
+        self.parallel_runs = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def should_split(self, text):
+        """是否值得并行提取 (Whether the text is worth splitting)"""
+        return self.workers > 1 and len(text) >= self.min_size
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def find_matches(self, pattern, text):
+        """
+        并行匹配，结果与 pattern.finditer 的顺序和内容相同；进程池不可用时回退到调用线程并停用并行提取
+
+        Args:
+            pattern (re.Pattern): URL提取正则
+            text (str): 脚本内容
+
+        Returns:
+            list: 去掉两端引号的匹配结果
+        """
+        spans = split_on_literals(text, pattern, max(MIN_CHUNK_SIZE, -(-len(text) // self.workers)))
+        if len(spans) > 1:
+            try:
+                pool = self._get_pool()
+                futures = [pool.submit(_find_matches, pattern.pattern, pattern.flags, text[start:end])
+                           for start, end in spans]
+                matches = []
+                for future in futures:
+                    matches.extend(future.result())
+                with self._lock:
+                    self.parallel_runs += 1
+                return matches
+            except Exception:
+                # 无法启动工作进程（例如受限环境）时不再尝试 (Pool unusable: stop trying)
+                self.workers = 1
+        return _find_matches(pattern.pattern, pattern.flags, text)
+
+    def close(self):
+        """关闭进程池"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
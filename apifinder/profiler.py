@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描性能分析模块 (Scan Profiler Module)
+统计各阶段耗时、按主机和状态码的请求延迟直方图、传输字节数以及每个脚本的正则提取耗时，
+由 --profile 开启，扫描结束时随统计信息一起输出表格，可选写入JSON
+"""
+
+import json
+import time
+import threading
+import contextlib
+from collections import defaultdict
+
+# 延迟直方图的桶上界（秒），最后一个桶收集超过上界的请求
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 关闭时所有计时都返回这个空上下文，不产生额外开销
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class _Timer:
+    """累计耗时 (Accumulated timing)"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "avg": round(self.total / self.count, 6) if self.count else 0.0,
+            "max": round(self.max, 6)
+        }
+
+
+class LatencyHistogram:
+    """按固定桶统计的请求延迟直方图 (Fixed-bucket latency histogram)"""
+
+    __slots__ = ("buckets", "timer")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.timer = _Timer()
+
+    def add(self, seconds):
+        self.timer.add(seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q):
+        """按桶估算分位数，返回所在桶的上界，落在最后一个桶时返回最大值"""
+        if not self.timer.count:
+            return 0.0
+        rank = q * self.timer.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.timer.max
+        return self.timer.max
+
+    def to_dict(self):
+        data = self.timer.to_dict()
+        data["p50"] = self.percentile(0.5)
+        data["p95"] = self.percentile(0.95)
+        data["buckets"] = {
+            (f"<={bound}" if i < len(LATENCY_BUCKETS) else f">{LATENCY_BUCKETS[-1]}"): count
+            for i, (bound, count) in enumerate(zip(LATENCY_BUCKETS + (None,), self.buckets))
+        }
+        return data
+
+
+class Profiler:
+    """
+    扫描性能分析器 (Scan profiler)
+
+    各阶段耗时是所有线程/协程的累计值，并发扫描时总和会超过扫描的墙钟时间。
+
+    Attributes:
+        enabled (bool): 是否开启，关闭时所有记录方法直接返回
+        json_path (str): 报告JSON的输出路径，为None时只输出表格
+    """
+
+    def __init__(self, enabled=False, json_path=None):
+        self.enabled = enabled
+        self.json_path = json_path
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages = defaultdict(_Timer)
+        self._latency = defaultdict(LatencyHistogram)
+        self._bytes = defaultdict(int)
+        self._regex = defaultdict(_Timer)
+        self._regex_bytes = {}
+
+    def add_stage(self, name, seconds):
+        """记录一次阶段耗时"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stages[name].add(seconds)
+
+    def stage(self, name):
+        """
+        阶段计时上下文 (Stage timer context)
+
+        Usage:
+            with profiler.stage("parse"):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def regex(self, source, nbytes):
+        """正则提取计时上下文，同时计入 extract 阶段和该脚本的耗时"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed_regex(source, nbytes)
+
+    @contextlib.contextmanager
+    def _timed_regex(self, source, nbytes):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._stages["extract"].add(elapsed)
+                self._regex[source].add(elapsed)
+                self._regex_bytes[source] = nbytes
+
+    def record_request(self, host, status, latency):
+        """
+        记录一次请求的延迟
+
+        Args:
+            host (str): 主机
+            status (int|str): HTTP状态码，连接失败或超时时为 "error"
+            latency (float): 从发出请求到收到响应头的秒数
+        """
+        if not self.enabled or latency is None:
+            return
+        with self._lock:
+            self._latency[(host, str(status))].add(latency)
+
+    def record_bytes(self, host, nbytes):
+        """记录从主机接收的响应体字节数"""
+        if not self.enabled or not nbytes:
+            return
+        with self._lock:
+            self._bytes[host] += nbytes
+
+    def to_dict(self):
+        """报告的JSON结构 (Report as a JSON-serializable dict)"""
+        with self._lock:
+            return {
+                "wall_time": round(time.perf_counter() - self.started, 6),
+                "stages": {name: timer.to_dict() for name, timer in self._stages.items()},
+                "latency": [
+                    dict(host=host, status=status, **histogram.to_dict())
+                    for (host, status), histogram in sorted(self._latency.items())
+                ],
+                "bytes": dict(sorted(self._bytes.items())),
+                "regex": [
+                    dict(source=source, bytes=self._regex_bytes.get(source, 0), **timer.to_dict())
+                    for source, timer in sorted(self._regex.items(), key=lambda item: -item[1].total)
+                ]
+            }
+
+    def report(self, console, show_table=True, top=10):
+        """
+        输出分析报告：终端表格，以及指定了 json_path 时写入JSON
+
+        Args:
+            console (Console): Rich console
+            show_table (bool): 是否输出表格，静默模式下只写JSON
+            top (int): 表格中显示的最耗时脚本数
+        """
+        if not self.enabled:
+            return
+        data = self.to_dict()
+
+        if show_table:
+            from rich.table import Table
+
+            stages = Table(title=f"⏱️ Stage Timings (cumulative, wall {data['wall_time']:.2f}s)", border_style="magenta")
+            stages.add_column("Stage", style="yellow bold")
+            for column in ("Count", "Total", "Avg", "Max"):
+                stages.add_column(column, justify="right")
+            for name, timing in sorted(data["stages"].items(), key=lambda item: -item[1]["total"]):
+                stages.add_row(name, str(timing["count"]), f"{timing['total']:.3f}s",
+                               f"{timing['avg'] * 1000:.1f}ms", f"{timing['max'] * 1000:.1f}ms")
+            console.print(stages)
+
+            if data["latency"]:
+                latency = Table(title="🌐 Request Latency by Host / Status", border_style="magenta")
+                latency.add_column("Host", style="cyan")
+                latency.add_column("Status", style="yellow")
+                for column in ("Count", "p50", "p95", "Max", "Bytes"):
+                    latency.add_column(column, justify="right")
+                previous_host = None
+                for row in data["latency"]:
+                    # 字节数按主机统计，只在该主机的第一行显示
+                    host_bytes = _format_bytes(data["bytes"].get(row["host"], 0)) if row["host"] != previous_host else ""
+                    previous_host = row["host"]
+                    latency.add_row(row["host"], row["status"], str(row["count"]),
+                                    f"≤{row['p50'] * 1000:.0f}ms", f"≤{row['p95'] * 1000:.0f}ms",
+                                    f"{row['max'] * 1000:.0f}ms", host_bytes)
+                console.print(latency)
+
+            if data["regex"]:
+                regex = Table(title=f"🔎 Regex Extraction (top {min(top, len(data['regex']))} scripts)", border_style="magenta")
+                regex.add_column("Script", style="cyan", max_width=60)
+                for column in ("Size", "Runs", "Total"):
+                    regex.add_column(column, justify="right")
+                for row in data["regex"][:top]:
+                    regex.add_row(row["source"], _format_bytes(row["bytes"]), str(row["count"]), f"{row['total'] * 1000:.1f}ms")
+                console.print(regex)
+
+        if self.json_path:
+            with open(self.json_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            if show_table:
+                console.print(f"[green]📝 Profile saved to {self.json_path}[/green]")
+
+
+def _format_bytes(nbytes):
+    for unit in ("B", "KB", "MB"):
+        if nbytes < 1024:
+            return f"{nbytes:.0f}{unit}" if unit == "B" else f"{nbytes:.1f}{unit}"
+        nbytes /= 1024
+    return f"{nbytes:.1f}GB"
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应缓存模块 (Response Cache Module)
+进程内按 (类型, 方法, URL) 缓存响应的LRU，按字节数限制大小；
+可选的磁盘缓存保存页面/脚本及其 ETag/Last-Modified，重复扫描时用条件请求重新验证
+"""
+
+import os
+import json
+import hashlib
+import threading
+import contextlib
+from collections import OrderedDict
+
+# 条件请求头，304 时磁盘缓存已不可用的话去掉它们重新请求 (Dropped when a 304 has no cached body)
+VALIDATOR_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class CachedResponse:
+    """
+    缓存的响应
+
+    Attributes:
+        text (str): 响应内容，失败时为None
+        success (bool): 请求是否成功
+        is_json (bool): 是否为JSON响应
+        error (str): 失败原因
+        length (int): 原响应体的字节数，text 只是预览时大于 len(text)
+        status (int): HTTP状态码
+        allow (str): Allow 响应头，OPTIONS探测时使用
+    """
+
+    __slots__ = ("text", "success", "is_json", "error", "length", "status", "allow")
+
+    def __init__(self, text, success=True, is_json=False, error=None, length=None, status=None, allow=None):
+        self.text = text
+        self.success = success
+        self.is_json = is_json
+        self.error = error
+        self.length = length
+        self.status = status
+        self.allow = allow
+
+    @property
+    def size(self):
+        # 按字符数估算占用，避免为计算大小再编码一遍
+        return len(self.text or "") + len(self.error or "") + 64
+
+
+class ResponseCache:
+    """
+    LRU响应缓存 (LRU response cache)
+
+    key 为 (kind, method, url)，kind 区分页面/脚本抓取 ("page") 和端点探测 ("probe")，
+    同一URL两种请求的请求头和处理方式不同，不能共用结果。
+    超过 max_bytes 时淘汰最久未使用的条目，单个条目超过上限时不缓存。
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None):
+        """
+        Args:
+            max_bytes (int): 内存缓存上限（字节），为0时不使用内存缓存
+            disk_dir (str): 磁盘缓存目录，为None时不使用磁盘缓存
+        """
+        self.max_bytes = max(0, max_bytes)
+        self.disk_dir = disk_dir
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._counters = {"cache_hits": 0, "cache_misses": 0, "cache_revalidated": 0}
+        if disk_dir and not os.path.exists(disk_dir):
+            os.makedirs(disk_dir)
+
+    def get(self, kind, method, url):
+        """
+        Returns:
+            CachedResponse: 命中时的缓存响应，未命中时为None
+        """
+        key = (kind, method, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["cache_misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["cache_hits"] += 1
+            return entry
+
+    def put(self, kind, method, url, entry):
+        """写入一个缓存条目，必要时淘汰最久未使用的条目"""
+        size = entry.size
+        if size > self.max_bytes:
+            return
+        key = (kind, method, url)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+            self._entries[key] = entry
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+
+    def clear(self, kind=None):
+        """
+        清除内存缓存中的条目
+
+        Args:
+            kind (str): 只清除该类型（例如 "probe"），为None时全部清除
+        """
+        with self._lock:
+            if kind is None:
+                self._entries.clear()
+                self.bytes = 0
+                return
+            for key in [key for key in self._entries if key[0] == kind]:
+                self.bytes -= self._entries.pop(key).size
+
+    @contextlib.contextmanager
+    def fetch_lock(self, kind, method, url):
+        """同一URL的并发抓取共用一把锁，后到的线程等待后直接命中缓存；没有线程使用时释放"""
+        key = (kind, method, url)
+        with self._lock:
+            holder = self._fetch_locks.get(key)
+            if holder is None:
+                holder = self._fetch_locks[key] = [threading.Lock(), 0]
+            holder[1] += 1
+        try:
+            with holder[0]:
+                yield
+        finally:
+            with self._lock:
+                holder[1] -= 1
+                if holder[1] == 0:
+                    del self._fetch_locks[key]
+
+    def _disk_path(self, url):
+        return os.path.join(self.disk_dir, hashlib.sha256(url.encode('utf-8', 'replace')).hexdigest() + '.json')
+
+    def _load_disk(self, url):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(url), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return record if record.get("url") == url else None
+
+    def validators(self, url):
+        """
+        磁盘缓存中该URL的条件请求头
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since，没有缓存时为空
+        """
+        record = self._load_disk(url)
+        if not record:
+            return {}
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def revalidated(self, url):
+        """
+        服务端返回304时取出磁盘缓存的内容
+
+        Returns:
+            str: 缓存的内容，磁盘中没有时为None
+        """
+        record = self._load_disk(url)
+        if record is None:
+            return None
+        with self._lock:
+            self._counters["cache_revalidated"] += 1
+        return record.get("text")
+
+    def store_disk(self, url, text, headers):
+        """带有 ETag 或 Last-Modified 的响应写入磁盘缓存，空内容不缓存"""
+        if not self.disk_dir or not text:
+            return
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        path = self._disk_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"url": url, "etag": etag, "last_modified": last_modified, "text": text}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: cache_hits / cache_misses / cache_revalidated
+        """
+        with self._lock:
+            return dict(self._counters)
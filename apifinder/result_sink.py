@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式结果输出模块 (Streaming Result Sink Module)
+每确认一个端点就去重并写入文件，内存中只保留URL摘要，
+不再在扫描结束时一次性排序和渲染全部结果
+"""
+
+import os
+import csv
+import json
+import hashlib
+import threading
+from .scan_result import ScanResult
+
+# CSV表头，流式写入和一次性保存共用
+CSV_HEADER = ['URL', 'Source', 'Timestamp', 'Source_Type', 'Domain']
+
+
+class ResultSink:
+    """
+    流式结果输出基类 (Base streaming sink)
+
+    线程安全，按URL去重，每条结果写入后立即flush。
+    去重集合只保存8字节摘要而不是完整URL。
+
+    Attributes:
+        path (str): 输出文件路径
+        written (int): 已写入的唯一结果数
+        duplicates (int): 被去重丢弃的结果数
+    """
+
+    def __init__(self, path, renderer):
+        """
+        Args:
+            path (str): 输出文件路径
+            renderer (FileOutputManager): 提供行渲染方法的文件输出管理器
+        """
+        self.path = path
+        self.renderer = renderer
+        self.written = 0
+        self.duplicates = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._file = self._open()
+
+    def _open(self):
+        return open(self.path, 'w', encoding='utf-8')
+
+    def write(self, result):
+        """
+        写入一条结果，重复的URL直接丢弃
+
+        Returns:
+            bool: 是否写入
+        """
+        digest = hashlib.blake2b(result['url'].encode('utf-8', 'replace'), digest_size=8).digest()
+        with self._lock:
+            if digest in self._seen:
+                self.duplicates += 1
+                return False
+            self._seen.add(digest)
+            self._write(result)
+            self._file.flush()
+            self.written += 1
+        return True
+
+    def _write(self, result):
+        raise NotImplementedError
+
+    def close(self, target_url=None):
+        """结束写入 (Finish writing)"""
+        with self._lock:
+            self._file.close()
+
+
+class JsonlSink(ResultSink):
+    """每行一个JSON对象 (.jsonl / .ndjson)"""
+
+    def _write(self, result):
+        if isinstance(result, ScanResult):
+            result = result.to_dict()
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+class CsvSink(ResultSink):
+    """逐行写入CSV，列与一次性保存的CSV相同"""
+
+    def _open(self):
+        f = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(f)
+        self._writer.writerow(CSV_HEADER)
+        return f
+
+    def _write(self, result):
+        self._writer.writerow(self.renderer._csv_row(result))
+
+
+class HtmlSink(JsonlSink):
+    """
+    先把结果流式写入同名 .ndjson 文件，扫描结束时再逐行渲染成HTML报告
+
+    HTML头部需要最终统计，所以报告在 close 时生成，但渲染过程逐行读写，
+    不会把全部结果或整个文档放进内存。报告生成后删除 .ndjson 文件，扫描中断时它保留已确认的结果。
+    """
+
+    def __init__(self, path, renderer):
+        self.html_path = path
+        super().__init__(os.path.splitext(path)[0] + '.ndjson', renderer)
+
+    def close(self, target_url=None):
+        super().close()
+        with open(self.html_path, 'w', encoding='utf-8') as html, open(self.path, 'r', encoding='utf-8') as spill:
+            html.write(self.renderer._html_header(target_url, self.written))
+            for line in spill:
+                html.write(self.renderer._html_row(json.loads(line)))
+            html.write(self.renderer._html_footer(self.written))
+        os.remove(self.path)
+
+
+# 支持流式写入的输出格式 (Output formats written as results arrive)
+STREAMING_SINKS = {
+    '.jsonl': JsonlSink,
+    '.ndjson': JsonlSink,
+    '.csv': CsvSink,
+    '.html': HtmlSink,
+}
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量扫描索引模块 (Incremental Scan Index Module)
+跨运行保存每个脚本的内容哈希和提取结果，以及每个目标的端点和探测结果。
+重复扫描同一批目标时，内容未变化的脚本不再做正则提取，探测结果未过期的端点不再重新探测，
+每个目标结束时与上次的端点集合对比，报告新增、消失和探测结果变化的端点
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from .utils import _write_atomic
+
+# 超过这么久没有再出现的脚本从索引中清除（秒）(Scripts unseen for this long are pruned)
+SCRIPT_TTL = 30 * 24 * 3600
+
+INDEX_VERSION = 1
+
+
+def content_hash(content):
+    """脚本内容的哈希 (Hash of a script's content)"""
+    return hashlib.sha256(content.encode('utf-8', 'replace')).hexdigest()
+
+
+class IndexDiff:
+    """
+    一个目标本次与上次扫描的端点差异
+
+    Attributes:
+        target (str): 目标URL
+        new (list): 本次新出现的端点
+        removed (list): 上次存在、本次没有再发现的端点
+        changed (list): (端点, 上次是否成功, 本次是否成功)，只包含本次重新探测过的端点
+        first_scan (bool): 索引中没有该目标的记录
+    """
+
+    __slots__ = ("target", "new", "removed", "changed", "first_scan")
+
+    def __init__(self, target, new, removed, changed, first_scan):
+        self.target = target
+        self.new = new
+        self.removed = removed
+        self.changed = changed
+        self.first_scan = first_scan
+
+    def __bool__(self):
+        return bool(self.new or self.removed or self.changed)
+
+    def to_dict(self):
+        return {
+            "target": self.target,
+            "new": self.new,
+            "removed": self.removed,
+            "changed": [{"url": url, "was_ok": was_ok, "ok": ok} for url, was_ok, ok in self.changed],
+            "first_scan": self.first_scan,
+        }
+
+
+class ScanIndex:
+    """
+    持久化的增量扫描索引 (Persistent incremental scan index)
+
+    文件结构：
+        scripts - {脚本URL: {hash, rules, urls, seen}}，rules 为提取时规则集的指纹，规则更新后旧结果失效
+        targets - {目标URL: {端点URL: {source, ok, ts}}}，ts 为最近一次真正探测的时间
+
+    查询只反映加载时的旧索引和本次运行已写入的脚本结果；端点的差异在 finish_target 时计算，
+    索引在 save 时整体原子写回
+    """
+
+    def __init__(self, path, max_age=24 * 3600):
+        """
+        Args:
+            path (str): 索引文件路径，不存在时新建
+            max_age (float): 探测结果的有效期（秒），过期的端点重新探测，为0时总是重新探测
+        """
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._scripts = {}
+        self._targets = {}
+        self._runs = {}
+        self._counters = {"scripts_unchanged": 0, "probes_reused": 0}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._scripts = data.get("scripts", {})
+        self._targets = data.get("targets", {})
+
+    def script_urls(self, script_url, content, rules):
+        """
+        内容和规则都未变化时返回上次提取的URL
+
+        Args:
+            script_url (str): 脚本URL
+            content (str): 本次下载的脚本内容
+            rules (str): 当前规则集的指纹
+
+        Returns:
+            list: 上次的提取结果，脚本是新的或已变化时为None
+        """
+        digest = content_hash(content)
+        with self._lock:
+            entry = self._scripts.get(script_url)
+            if entry is None or entry.get("hash") != digest or entry.get("rules") != rules:
+                return None
+            entry["seen"] = time.time()
+            self._counters["scripts_unchanged"] += 1
+            return list(entry["urls"])
+
+    def store_script(self, script_url, content, rules, urls):
+        """记录脚本的提取结果"""
+        entry = {"hash": content_hash(content), "rules": rules, "urls": list(urls), "seen": time.time()}
+        with self._lock:
+            self._scripts[script_url] = entry
+
+    def cached_probe(self, target, url):
+        """
+        端点未过期的上次探测结果
+
+        Returns:
+            dict: {source, ok, ts}，没有记录或已过期时为None
+        """
+        if target is None or not self.max_age:
+            return None
+        with self._lock:
+            record = self._targets.get(target, {}).get(url)
+            if record is None or time.time() - record.get("ts", 0) > self.max_age:
+                return None
+            self._runs.setdefault(target, {})[url] = record
+            self._counters["probes_reused"] += 1
+            return record
+
+    def record_probe(self, target, url, source, ok):
+        """记录本次运行的一次探测"""
+        if target is None:
+            return
+        with self._lock:
+            self._runs.setdefault(target, {})[url] = {"source": source, "ok": ok, "ts": time.time(), "probed": True}
+
+    def finish_target(self, target, endpoints):
+        """
+        目标扫描完成：与上次的端点集合对比，并用本次结果替换该目标的记录
+
+        Args:
+            target (str): 目标URL
+            endpoints (list): 本次发现的全部端点，包括未探测的（例如预算用尽）
+
+        Returns:
+            IndexDiff: 端点差异
+        """
+        with self._lock:
+            previous = self._targets.get(target)
+            run = self._runs.pop(target, {})
+            first_scan = previous is None
+            previous = previous or {}
+
+            current = {}
+            new, changed = [], []
+            for url in endpoints:
+                old = previous.get(url)
+                record = run.get(url)
+                if old is None:
+                    new.append(url)
+                elif record is not None and record.get("probed") and bool(old.get("ok")) != bool(record["ok"]):
+                    changed.append((url, bool(old.get("ok")), bool(record["ok"])))
+                if record is None:
+                    # 本次没有探测（检查点跳过或预算用尽），保留上次的结果；没有上次结果时记为已过期
+                    record = old or {"source": "", "ok": False, "ts": 0}
+                current[url] = {"source": record.get("source", ""), "ok": record.get("ok", False), "ts": record.get("ts", 0)}
+            removed = [url for url in previous if url not in current]
+            self._targets[target] = current
+        return IndexDiff(target, new, removed, changed, first_scan)
+
+    def save(self):
+        """把索引原子写回文件，同时清除长期未出现的脚本"""
+        now = time.time()
+        with self._lock:
+            self._scripts = {url: entry for url, entry in self._scripts.items() if now - entry.get("seen", 0) <= SCRIPT_TTL}
+            data = json.dumps({"version": INDEX_VERSION, "scripts": self._scripts, "targets": self._targets}, ensure_ascii=False)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        _write_atomic(self.path, lambda f: f.write(data))
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: scripts_unchanged / probes_reused
+        """
+        with self._lock:
+            return dict(self._counters)
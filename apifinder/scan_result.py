@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描结果记录模块 (Scan Result Record Module)
+紧凑的结果记录：来源URL按所属输出管理器驻留为同一个字符串对象，时间戳保存为epoch浮点数；
+导出时转成按列存储，来源编号为整数ID，去重和排序只操作列，不为每条结果构建字典
+"""
+
+import threading
+from array import array
+from datetime import datetime
+
+
+class SourceTable:
+    """
+    来源驻留表 (Interned source table)
+    同一个脚本URL在结果中重复成千上万次，只保存一份字符串，结果里都引用这一份。
+    驻留表属于每个目标的输出管理器，随它一起释放；Scanner 默认不合并结果，长期复用时不会让它无限增长
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def intern(self, source):
+        """返回与 source 相等的唯一字符串对象，第一次出现时登记"""
+        interned = self._sources.get(source)
+        if interned is not None:
+            return interned
+        with self._lock:
+            return self._sources.setdefault(source, source)
+
+    def __len__(self):
+        return len(self._sources)
+
+
+class ScanResult:
+    """
+    单条扫描结果 (Single scan result)
+
+    兼容原来的结果字典，可以用 result["url"] / result["source"] / result["timestamp"] 读取，
+    其中 timestamp 按需格式化为ISO字符串。
+
+    Attributes:
+        url (str): 端点URL
+        source (str): 首次发现该端点的来源，传入 table 时为驻留后的字符串
+        epoch (float): 发现时间（epoch秒）
+        sources (list): 引用该端点的全部来源（创建时的副本），没有时为None
+    """
+
+    __slots__ = ("url", "source", "epoch", "sources")
+
+    def __init__(self, url, source="", epoch=None, sources=None, table=None):
+        """
+        Args:
+            table (SourceTable): 来源驻留表，为None时不驻留
+        """
+        intern = table.intern if table is not None else str
+        self.url = url
+        self.source = intern(source or "")
+        self.epoch = epoch if epoch is not None else datetime.now().timestamp()
+        self.sources = [intern(s) for s in sources] if sources is not None else None
+
+    @classmethod
+    def from_dict(cls, data, table=None):
+        """从结果字典（检查点、旧格式）构建"""
+        try:
+            epoch = datetime.fromisoformat(data["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            epoch = None
+        return cls(data["url"], data.get("source", ""), epoch, data.get("sources"), table)
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self.epoch).isoformat()
+
+    def __getitem__(self, key):
+        if key in ("url", "source", "timestamp", "sources"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def to_dict(self):
+        """转换为与原来相同的结果字典"""
+        data = {"url": self.url, "source": self.source, "timestamp": self.timestamp}
+        if self.sources is not None:
+            data["sources"] = list(self.sources)
+        return data
+
+
+class ResultColumns:
+    """
+    按列存储的结果 (Columnar result export)
+
+    urls / source_ids / epochs 三列加上可选的 sources，去重和排序只产生下标，
+    写文件时再用 rows 逐条生成字典；来源ID只在本次导出内有效
+    """
+
+    def __init__(self, results):
+        self.urls = []
+        self.source_ids = array('I')
+        self.epochs = array('d')
+        self.sources = []
+        self._source_names = []
+        ids = {}
+        for result in results:
+            if not isinstance(result, ScanResult):
+                result = ScanResult.from_dict(result)
+            source_id = ids.get(result.source)
+            if source_id is None:
+                source_id = ids[result.source] = len(self._source_names)
+                self._source_names.append(result.source)
+            self.urls.append(result.url)
+            self.source_ids.append(source_id)
+            self.epochs.append(result.epoch)
+            self.sources.append(result.sources)
+
+    def __len__(self):
+        return len(self.urls)
+
+    def unique_indices(self):
+        """每个URL第一次出现的下标，保持原顺序"""
+        seen = set()
+        indices = []
+        for i, url in enumerate(self.urls):
+            if url not in seen:
+                seen.add(url)
+                indices.append(i)
+        return indices
+
+    def sorted_indices(self, indices):
+        """按URL字母顺序排序下标"""
+        return sorted(indices, key=self.urls.__getitem__)
+
+    def row(self, i):
+        data = {
+            "url": self.urls[i],
+            "source": self._source_names[self.source_ids[i]],
+            "timestamp": datetime.fromtimestamp(self.epochs[i]).isoformat()
+        }
+        if self.sources[i] is not None:
+            data["sources"] = list(self.sources[i])
+        return data
+
+    def view(self, indices):
+        """按下标选出的结果视图"""
+        return ResultView(self, indices)
+
+
+class ResultView:
+    """
+    结果视图，支持 len() 和迭代，迭代时逐条生成结果字典
+    """
+
+    def __init__(self, columns, indices):
+        self.columns = columns
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __iter__(self):
+        for i in self.indices:
+            yield self.columns.row(i)
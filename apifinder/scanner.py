@@ -0,0 +1,1426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描器模块 (Scanner Module)
+不依赖命令行参数和模块级全局状态的扫描入口：ScanConfig 描述一次运行的全部设置，
+Scanner 持有连接池、限速器、响应缓存等可在多次扫描之间复用的资源，
+命令行 (apifinder.py) 和嵌入的服务都通过它扫描
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import requests
+import urllib3
+from urllib3.exceptions import InsecureRequestWarning
+from rich.console import Console
+from rich.status import Status
+from .ua_manager import UaManager
+from .utils import (URLProcessor, URLExtractor, ResultStore, DeepScanManager, HostLimiter, RequestBudget, ScanContext,
+                    AdaptiveRateLimiter, BodyReader, is_json_response, parse_methods, escalation_methods)
+from .i18n import i18n
+from .Output_Manager import OutputManager
+from .http_client import HttpClient
+from .html_document import ParsedDocument, extract_title
+from .checkpoint import Checkpoint
+from .response_cache import ResponseCache, CachedResponse, VALIDATOR_HEADERS
+from .profiler import Profiler
+from .parallel_extract import ParallelExtractor
+from .source_map import find_source_map_url, data_url_chunks, decode_chunks, extract_source_map, MAP_CHUNK_SIZE
+from .chunk_resolver import find_chunk_urls
+from .scan_index import ScanIndex
+from .event_stream import EventStream
+
+
+class ScanConfig:
+    """
+    扫描配置 (Scan configuration)
+    字段与命令行参数一一对应，默认值与命令行默认值相同
+
+    Attributes:
+        cookie (str): 请求携带的Cookie
+        proxy (str): 代理地址，"0" 表示自动获取SOCKS5代理
+        silent (bool): 静默模式，jsonl 开启时总是静默
+        verbose (bool): 详细输出
+        output (str): 输出文件路径（命令行使用，Scanner 本身不写文件）
+        timeout (int): 探测请求读取超时（秒）
+        threads (int): 探测线程数
+        delay (float): 每个工作线程的请求间隔，未设置 rate 时换算为每个主机的速率
+        rate (float): 每个主机每秒最多请求数
+        cache_size (int): 内存响应缓存大小（MB）
+        cache_dir (str): 磁盘缓存目录
+        max_body (int): 探测请求最多读取的响应体大小（KB），0表示不限制
+        extract_workers (int): 大脚本正则提取的工作进程数，0表示使用CPU核数，1表示不使用进程池
+        extract_min_size (int): 并行提取的最小脚本大小（KB）
+        source_maps (bool): 是否下载脚本的 source map 并从原始源文件中提取
+        lazy_chunks (bool): 是否从 webpack 运行时和 Vite import() 还原并下载懒加载分块
+        max_chunks (int): 每个页面最多下载的懒加载分块数
+        methods (str|list): 探测使用的HTTP方法
+        probe_strategy (str): 探测策略，full / head / options
+        profile (bool): 是否开启性能分析
+        profile_json (str): 性能分析报告JSON路径
+        random (bool): 随机User-Agent
+        app (str): User-Agent类型
+        depth (int): 深度扫描层数
+        engine (str): 扫描引擎，thread / async
+        concurrency (int): 异步引擎同时在途的最大请求数
+        html_parser (str): HTML解析后端
+        script_concurrency (int): 每个主机同时下载的脚本数
+        crawl_threads (int): 同一层同时扫描的页面数
+        deep_budget (int): 每层深度扫描最多选取的页面数
+        batch_threads (int): scan_many 同时扫描的目标数
+        request_budget (int): scan_many 所有目标共享的最大在途请求数
+        checkpoint (str): 检查点文件路径
+        resume (bool): 是否从检查点恢复
+        index (str): 增量扫描索引文件路径，跨运行复用未变化脚本的提取结果和未过期的探测结果
+        reprobe_after (float): 索引中的探测结果超过多少小时后重新探测，0表示总是重新探测
+        jsonl (bool): 把页面、脚本、端点和探测结果写成 stdout 上的JSONL事件流，不经过Rich
+    """
+
+    def __init__(self, cookie=None, proxy=None, silent=False, verbose=False, output=None, timeout=10, threads=10,
+                 delay=0.5, rate=None, cache_size=64, cache_dir=None, max_body=1024, methods="GET,POST",
+                 probe_strategy="full", extract_workers=0, extract_min_size=1024, source_maps=False,
+                 lazy_chunks=False, max_chunks=200,
+                 profile=False, profile_json=None, random=False, app="common", depth=2,
+                 engine="thread", concurrency=100, html_parser="bs4", script_concurrency=8, crawl_threads=4,
+                 deep_budget=10, batch_threads=4, request_budget=100, checkpoint=None, resume=False,
+                 index=None, reprobe_after=24, jsonl=False):
+        self.cookie = cookie
+        self.proxy = proxy
+        # stdout 留给事件流 (stdout is reserved for the event stream)
+        self.silent = silent or jsonl
+        self.verbose = verbose
+        self.output = output
+        self.timeout = timeout
+        self.threads = threads
+        self.delay = delay
+        self.rate = rate
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self.max_body = max_body
+        self.methods = methods
+        self.probe_strategy = probe_strategy
+        self.extract_workers = extract_workers
+        self.extract_min_size = extract_min_size
+        self.source_maps = source_maps
+        self.lazy_chunks = lazy_chunks
+        self.max_chunks = max_chunks
+        self.profile = profile
+        self.profile_json = profile_json
+        self.random = random
+        self.app = app
+        self.depth = depth
+        self.engine = engine
+        self.concurrency = concurrency
+        self.html_parser = html_parser
+        self.script_concurrency = script_concurrency
+        self.crawl_threads = crawl_threads
+        self.deep_budget = deep_budget
+        self.batch_threads = batch_threads
+        self.request_budget = request_budget
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.index = index
+        self.reprobe_after = reprobe_after
+        self.jsonl = jsonl
+
+    @classmethod
+    def from_args(cls, args):
+        """从 argparse 的结果构建，忽略与扫描无关的参数"""
+        fields = cls().__dict__
+        return cls(**{name: getattr(args, name) for name in fields if hasattr(args, name)})
+
+    def host_rate(self):
+        """每个主机的默认速率：未设置 rate 时按 threads 和 delay 换算出原来的请求速率"""
+        if self.rate is not None:
+            return self.rate
+        if self.delay > 0:
+            return self.threads * 2 / self.delay
+        return None
+
+
+class ScanReport:
+    """
+    单个目标的扫描结果
+
+    Attributes:
+        url (str): 目标URL
+        results (list): ScanResult 列表，输出管理器使用流式结果输出时为空
+        stats (dict): 该目标的统计信息
+        changes (IndexDiff): 与增量扫描索引中上次结果的端点差异，未使用索引时为None
+    """
+
+    __slots__ = ("url", "results", "stats", "changes")
+
+    def __init__(self, url, output, changes=None):
+        self.url = url
+        self.results = output.results
+        self.stats = output.stats
+        self.changes = changes
+
+    @property
+    def endpoints(self):
+        """发现的端点URL列表"""
+        return [result.url for result in self.results]
+
+
+class Scanner:
+    """
+    API端点扫描器 (API endpoint scanner)
+
+    连接池、限速器、响应缓存和性能分析器属于扫描器，同一个 Scanner 的多次 scan / scan_many
+    共用这些资源（内存响应缓存在每次 scan / scan_many 开始时清空，重复扫描总会重新抓取页面、脚本并重新探测，
+    磁盘缓存保留，用条件请求重新验证）；
+    每个目标有自己的输出、上下文和端点索引。
+
+    Usage:
+        with Scanner(ScanConfig(depth=1), console=Console(quiet=True)) as scanner:
+            report = scanner.scan("https://example.com")
+            for result in report.results:
+                print(result.url, result.source)
+
+    Attributes:
+        config (ScanConfig): 扫描配置
+        output (OutputManager): 汇总输出，merge_results 为 True 时 scan / scan_many 的结果和统计会合并到这里
+        merge_results (bool): 是否把每个目标的结果合并到汇总输出
+    """
+
+    def __init__(self, config=None, output=None, console=None, merge_results=False):
+        """
+        Args:
+            config (ScanConfig): 扫描配置，默认使用默认配置
+            output (OutputManager): 汇总输出管理器，默认按配置新建
+            console (Console): 新建输出管理器时使用的Rich console，传入 Console(quiet=True) 可关闭终端输出
+            merge_results (bool): 是否把每个目标的结果、统计和表格行合并到汇总输出。命令行需要汇总后保存文件；
+                长期复用同一个 Scanner 的服务只使用每次调用返回的 ScanReport，保持默认的 False，汇总输出不会随扫描次数增长
+
+        Raises:
+            InvalidMethodsError: methods 配置不合法
+            ValueError: 其他配置不合法
+        """
+        self.config = config or ScanConfig()
+        # 探测使用的HTTP方法，第一个为主方法 (Probe methods, the first one decides liveness)
+        methods = self.config.methods
+        self.probe_methods = parse_methods(methods) if isinstance(methods, str) else parse_methods(",".join(methods))
+        # 探测请求最多读取的响应体字节数，0表示不限制 (Probe body cap in bytes, 0 means unlimited)
+        self.max_body = max(0, self.config.max_body) * 1024
+
+        # 请求不校验证书，关闭对应的警告
+        urllib3.disable_warnings(InsecureRequestWarning)
+
+        self.profiler = Profiler(self.config.profile or bool(self.config.profile_json), self.config.profile_json)
+        if output is None:
+            output = OutputManager(self.config.silent, self.config.verbose, self.config.output,
+                                   console=console or Console(), profiler=self.profiler)
+        elif output.profiler is None:
+            output.profiler = self.profiler
+        if self.config.jsonl and output.events is None:
+            output.events = EventStream()
+        self.output = output
+        self.merge_results = merge_results
+        self.ua = UaManager(self.config.app, self.config.random)
+
+        # 共享HTTP客户端，连接池大小与线程数一致 (Shared HTTP client, pool sized to threads)
+        self.http_client = HttpClient(pool_size=max(self.config.threads, self.config.script_concurrency))
+        # 外部脚本下载的按主机并发限制 (Per-host concurrency limit for script downloads)
+        self.script_host_limiter = HostLimiter(self.config.script_concurrency)
+        # 按主机的自适应限速 (Per-host adaptive rate limit)
+        self.rate_limiter = AdaptiveRateLimiter(self.config.host_rate())
+        # 响应缓存：复用脚本和探测结果，设置 cache_dir 时跨运行按ETag/Last-Modified重新验证
+        self.response_cache = ResponseCache(self.config.cache_size * 1024 * 1024, self.config.cache_dir)
+        # 大脚本的进程池正则提取，进程池在第一次遇到大脚本时才创建
+        self.extractor = ParallelExtractor(self.config.extract_workers, self.config.extract_min_size * 1024)
+
+        self.checkpoint = self._open_checkpoint()
+        # 增量扫描索引：未变化的脚本跳过提取，未过期的端点跳过探测
+        self.index = ScanIndex(self.config.index, self.config.reprobe_after * 3600) if self.config.index else None
+        self.default_ctx = ScanContext(self.output, checkpoint=self.checkpoint)
+        self._proxies = None
+        self._progress_lock = threading.Lock()
+        self._merge_lock = threading.Lock()
+
+    def _open_checkpoint(self):
+        """按 checkpoint/resume 配置打开扫描检查点"""
+        path = self.config.checkpoint
+        if not path:
+            return None
+        if self.config.resume and not os.path.exists(path):
+            self.output.print_warning(f"⚠️ Checkpoint file not found, starting a new scan: {path}")
+        self.output.print_verbose(f"📝 Writing checkpoint journal to {path}")
+        return Checkpoint(path, resume=self.config.resume)
+
+    def scan(self, url, show_progress=False):
+        """
+        扫描一个目标 (Scan one target)
+
+        Args:
+            url (str): 目标URL
+            show_progress (bool): 是否显示进度条
+
+        Returns:
+            ScanReport: 该目标的结果和统计
+        """
+        self.response_cache.clear()
+        return self._scan_in_context(url, None, show_progress)
+
+    def scan_many(self, urls, show_progress=False):
+        """
+        同时扫描多个目标，所有目标共享 request_budget 个在途请求，正在扫描的目标平分，目标结束后份额分给其他目标
+
+        Args:
+            urls (list): 目标URL列表
+            show_progress (bool): 只有一个工作线程时是否显示进度条
+
+        Returns:
+            list: 与 urls 顺序相同的 ScanReport 列表
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        self.response_cache.clear()
+        workers = max(1, min(self.config.batch_threads, len(urls)))
+        budget = RequestBudget(self.config.request_budget)
+        if workers == 1:
+            return [self._scan_in_context(url, budget, show_progress) for url in urls]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda url: self._scan_in_context(url, budget, False), urls))
+
+    def _scan_in_context(self, url, budget, show_progress):
+        """
+        在独立的上下文中扫描一个目标，merge_results 为 True 时完成后合并到汇总输出
+        每个目标有自己的统计、结果和DeepScanManager，有预算时请求配额来自共享预算
+        """
+        events = self.output.events.for_target(url) if self.output.events is not None else None
+        target_output = OutputManager(self.config.silent, self.config.verbose, console=self.output.console, sink=self.output.sink,
+                                      events=events)
+        target_output.emit("target")
+        ctx = ScanContext(target_output, budget.slot() if budget else None, target=url, checkpoint=self.checkpoint)
+        changes = None
+        try:
+            changes = self.scan_target(url, ctx, show_progress)
+        except Exception as e:
+            if budget is None:
+                raise
+            self.output.print_error(f"Error scanning {url}: {e}")
+        finally:
+            if self.merge_results:
+                with self._merge_lock:
+                    self.output.merge_from(target_output)
+            if budget is not None:
+                ctx.request_slot.close()
+                self.output.print_target_summary(url, target_output.stats)
+        return ScanReport(url, target_output, changes)
+
+    def update_stats(self):
+        """把连接池、限速和缓存的统计写入汇总输出"""
+        self.output.set_stats(self.http_client.get_stats())
+        self.output.set_stats({"throttled_responses": self.rate_limiter.throttle_events})
+        self.output.set_stats(self.response_cache.get_stats())
+        if self.index is not None:
+            self.output.set_stats(self.index.get_stats())
+
+    def close(self):
+        """关闭检查点、连接池和提取进程池，写回增量扫描索引并写出剩余的事件"""
+        if self.checkpoint:
+            self.checkpoint.close()
+            self.checkpoint = None
+        if self.index is not None:
+            self.index.save()
+            self.index = None
+        self.http_client.close()
+        self.extractor.close()
+        if self.output.events is not None:
+            self.update_stats()
+            self.output.emit("stats", **{key: value for key, value in self.output.stats.items() if isinstance(value, (int, float))})
+            self.output.events.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def proxies(self):
+        """按 proxy 配置生成代理，第一次调用时确定并缓存"""
+        if self._proxies is not None:
+            return self._proxies
+
+        if self.config.proxy == "0":
+            # 自动获取代理列表 (Auto fetch proxy list)
+            header = {"User-Agent": self.ua.getUa()}
+            proxy_response = requests.get("https://proxy.scdn.io/api/get_proxy.php?protocol=socks5&count=5", headers=header).text
+            proxy_data = json.loads(proxy_response)
+            if proxy_data.get("code") == 200 and "data" in proxy_data and "proxies" in proxy_data["data"]:
+                self._proxies = proxy_data["data"]["proxies"]
+            else:
+                self.output.print_error(i18n.get('proxy_fetch_failed'))
+                self._proxies = []
+
+        elif self.config.proxy:
+            # 判断代理类型是否为socks5
+            if self.config.proxy.startswith('socks5://'):
+                self._proxies = {
+                    "http": self.config.proxy,
+                    "https": self.config.proxy
+                }
+            # 普通http/https代理
+            else:
+                self._proxies = {
+                    "http": self.config.proxy if self.config.proxy.startswith('http') else f'http://{self.config.proxy}',
+                    "https": self.config.proxy if self.config.proxy.startswith('http') else f'http://{self.config.proxy}'
+                }
+
+        return self._proxies
+
+    # 更完整的请求头 (Request headers)
+    def build_probe_headers(self):
+        return {
+            "User-Agent": self.ua.getUa(),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+            "Cache-Control": "max-age=0"
+        }
+
+    def build_page_headers(self):
+        return {
+            "User-Agent": self.ua.getUa(),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+            "Sec-Fetch-Dest": "document",
+            "Sec-Fetch-Mode": "navigate",
+            "Sec-Fetch-Site": "none",
+            "Cache-Control": "max-age=0"
+        }
+
+    # 请求执行函数 (Request execution function)
+    def make_request(self, method, url, cookies, timeout, store, redirect_count=0, max_redirects=5, ctx=None):
+        ctx = ctx or self.default_ctx
+        # 请求前的配置 (Request configuration)
+        proxies = self.proxies()
+        if proxies and isinstance(proxies, list):
+            proxies = {
+                "socks5": proxies[random.randint(0,len(proxies)-1)],
+            }
+
+        # 同一端点已经探测过时直接复用结果 (Reuse the result when this endpoint was already probed)
+        cached = self.response_cache.get("probe", method, url)
+        if cached is not None:
+            store.update(method, cached.success, cached.text, cached.error, is_json=cached.is_json, length=cached.length,
+                status=cached.status, allow=cached.allow)
+            return
+
+        header = self.build_probe_headers()
+        host = urlparse(url).netloc
+
+        max_retries = 2
+        retry_delay = 0.5
+
+        for attempt in range(max_retries):
+            try:
+                # 按主机限速，等待时不占用请求配额 (Per-host rate limit, waited outside the request slot)
+                with self.profiler.stage("rate_wait"):
+                    self.rate_limiter.acquire(host)
+                started = time.monotonic()
+                # 复用共享连接池，代理按请求传入；读完响应体并关闭连接后才释放请求配额
+                # (Reuse shared pools; the request slot is held until the body is read and the response closed)
+                redirect_url = None
+                with ctx.slot():
+                    res = self.http_client.request(
+                        method,
+                        url, 
+                        headers=header, 
+                        cookies=cookies, 
+                        proxies=proxies or None,
+                        timeout=(5, timeout),
+                        allow_redirects=True,
+                        stream=True
+                    )
+                    self.rate_limiter.observe(host, res.status_code, time.monotonic() - started, res.headers.get('Retry-After'))
+                    self.profiler.record_request(host, res.status_code, time.monotonic() - started)
+                    ctx.output.metrics.record_response(res.status_code)
+
+                    # 被限流时降速后重试 (Back off and retry when throttled)
+                    if res.status_code in [429, 503] and attempt < max_retries - 1:
+                        ctx.output.print_verbose(f"⏳ {res.status_code} from {host}, slowing down and retrying: {url}")
+                        res.close()
+                        continue
+
+                    if res.status_code in [301, 302, 303, 307, 308]:
+                        if redirect_count >= max_redirects:
+                            res.close()
+                            ctx.output.print_error(f"❌ 超过最大重定向次数({max_redirects})，终止请求: {url}")
+                            store.update(method, False, None, f"Too many redirects (>{max_redirects})", is_json=False)
+                            return
+                        if res.url != url:
+                            redirect_url = res.url
+                            res.close()
+
+                    if redirect_url is None:
+                        if not res.ok:
+                            res.close()
+                        res.raise_for_status()
+                        # if res.status_code not in [200, 201, 202, 203, 204, 205, 206, 207, 208, 226]:
+                        # 	ctx.output.print_error(f"❌ 请求失败: {url} (状态码: {res.status_code})")
+                        # 	store.update(method, False, None, f"Request failed with status code: {res.status_code}", is_json=False)
+                        # 	return 
+
+                        # 流式读取响应体，超过 --max-body 即断开，只保留开头的预览 (Stream the body up to --max-body, keep only a preview)
+                        body = BodyReader(self.max_body)
+                        try:
+                            for chunk in res.iter_content(chunk_size=16384):
+                                if not body.feed(chunk):
+                                    break
+                        finally:
+                            res.close()
+
+                # 跟随重定向前先释放配额，新请求重新占用 (Release the slot before following the redirect)
+                if redirect_url is not None:
+                    ctx.output.print_verbose(f"🔄 Redirect detected in {method} request: {url} -> {redirect_url}")
+                    return self.make_request(method, redirect_url, cookies, timeout, store, redirect_count=redirect_count+1, max_redirects=max_redirects, ctx=ctx)
+                self.profiler.record_bytes(host, body.length)
+                ctx.output.metrics.incr("bytes", body.length)
+
+                encoding = res.encoding
+                if encoding is None or encoding == 'ISO-8859-1':
+                    encoding = 'utf-8'
+                response_text = body.preview.decode(encoding, errors='replace')
+
+                # 检查是否为JSON响应，响应体不完整时只嗅探开头
+                is_json = is_json_response(res.headers.get('Content-Type', ''), response_text, complete=body.complete)
+
+                allow = res.headers.get('Allow')
+                store.update(method, True, response_text, is_json=is_json, length=body.length, status=res.status_code, allow=allow,
+                    elapsed=time.monotonic() - started)
+                self.response_cache.put("probe", method, url, CachedResponse(response_text, is_json=is_json, length=body.length,
+                    status=res.status_code, allow=allow))
+                return
+
+            except requests.exceptions.SSLError as e:
+                ctx.output.metrics.record_error("ssl")
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    store.update(method, False, None, f"SSL error: {str(e)}")
+                    return
+
+            except requests.exceptions.ConnectionError as e:
+                ctx.output.metrics.record_error("connection")
+                self.rate_limiter.observe(host)
+                self.profiler.record_request(host, "error", time.monotonic() - started)
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    store.update(method, False, None, f"Connection error: {str(e)}", elapsed=time.monotonic() - started)
+                    return
+
+            except requests.exceptions.Timeout as e:
+                ctx.output.metrics.record_error("timeout")
+                self.rate_limiter.observe(host)
+                self.profiler.record_request(host, "error", time.monotonic() - started)
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    store.update(method, False, None, f"Timeout: {str(e)}", elapsed=time.monotonic() - started)
+                    return
+
+            except requests.exceptions.RequestException as e:
+                # HTTP状态错误在收到响应时已按状态码计数 (HTTP errors were counted by status on arrival)
+                if not isinstance(e, requests.exceptions.HTTPError):
+                    ctx.output.metrics.record_error("redirect" if isinstance(e, requests.exceptions.TooManyRedirects) else "other")
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    status = e.response.status_code if e.response is not None else None
+                    store.update(method, False, None, f"Request error: {str(e)}", status=status, elapsed=time.monotonic() - started)
+                    # HTTP状态错误是确定的结果，可以复用；连接类错误下次仍然重试
+                    if isinstance(e, requests.exceptions.HTTPError):
+                        self.response_cache.put("probe", method, url, CachedResponse(None, False, error=f"Request error: {str(e)}", status=status))
+                    return
+
+            except Exception as e:
+                ctx.output.metrics.record_error("other")
+                if attempt < max_retries - 1:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    store.update(method, False, None, f"Unexpected error: {str(e)}")
+                    return
+
+    def do_request(self, url, ctx=None):
+        ctx = ctx or self.default_ctx
+        cookies = {"Cookie": self.config.cookie}
+
+        if self.config.probe_strategy == "full":
+            result_store = ResultStore(self.probe_methods)
+        else:
+            # 先发HEAD/OPTIONS，只在需要时升级为完整探测 (Cheap probe first, escalate only when needed)
+            cheap = self.config.probe_strategy.upper()
+            result_store = ResultStore([cheap])
+            self.make_request(cheap, url, cookies, self.config.timeout, result_store, 0, ctx=ctx)
+            methods = escalation_methods(self.config.probe_strategy, result_store.results[cheap], self.probe_methods)
+            if not methods:
+                return self.report_probe_results(url, result_store, ctx)
+            result_store.escalate(methods)
+
+        # 每个方法一个线程 (One thread per method)
+        threads = [
+            threading.Thread(
+                target=self.make_request,
+                args=(method, url, cookies, self.config.timeout, result_store, 0),
+                kwargs={"ctx": ctx}
+            )
+            for method in result_store.results
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 请求间隔由按主机的 self.rate_limiter 控制，不再占用工作线程睡眠
+        return self.report_probe_results(url, result_store, ctx)
+
+    def emit_probe(self, url, method, result, ctx):
+        """写出一个方法的 probe 事件"""
+        if ctx.output.events is None:
+            return
+        elapsed = result.get("elapsed")
+        ctx.output.emit("probe", url=url, method=method, ok=bool(result.get("success")), status=result.get("status"),
+                        bytes=result.get("length"), latency_ms=round(elapsed * 1000, 1) if elapsed is not None else None,
+                        json=result.get("is_json") or None, error=result.get("error"))
+
+    def report_probe_results(self, url, result_store, ctx=None):
+        """
+        统一输出各方法的探测结果并更新统计，线程引擎和异步引擎共用
+
+        Returns:
+            str: 主方法（默认GET）的响应内容，失败时为None
+        """
+        ctx = ctx or self.default_ctx
+        response_text_to_return = None
+
+        # 升级前的HEAD/OPTIONS请求同样发出过，只记录事件和统计，不输出 (Record the escalated cheap probe without printing it)
+        for method, result in result_store.escalated.items():
+            self.emit_probe(url, method, result, ctx)
+            ctx.output.count("successful_requests" if result.get("success") else "failed_requests")
+
+        # 统一输出结果 (Unified output results)
+        primary = result_store.primary
+        for method, result in result_store.results.items():
+            self.emit_probe(url, method, result, ctx)
+            if result.get("success"):
+                response_text = result['response']
+                is_json = result.get('is_json', False)
+                if is_json:
+                    ctx.output.count("json_responses")
+
+                if method == primary:
+                    response_text_to_return = response_text or ""
+                    # 尝试解析和打印标题，读到 </title> 即停止
+                    try:
+                        if response_text and '<html' in response_text.lower():
+                            title = extract_title(response_text)
+                            if title:
+                                title = title.strip().replace('\\n', '').replace('\\r', '')
+                                if title:
+                                    ctx.output.print_title(url, title)
+                    except Exception as e:
+                        ctx.output.print_verbose(f"Could not parse title from {url}: {e}")
+
+                if method == primary and ctx.output.silent_mode and ctx.output.events is None:
+                    ctx.output.console.print(("[JSON] " if is_json else "") + url, highlight=False)
+                elif not ctx.output.silent_mode:
+                    msg = f"{method} request successful for {url}"
+                    if is_json:
+                        msg = "[JSON] " + msg
+                    ctx.output.print_success(msg)
+                    if ctx.output.verbose_mode:
+                        res_len = result.get('length') or 0
+                        ctx.output.print_verbose(f"📏 Response length: {res_len} bytes")
+                        preview = (response_text or "")[:200]
+                        if is_json:
+                            ctx.output.print_verbose(f"👀 [JSON] Response preview: {preview}...")
+                        else:
+                            ctx.output.print_verbose(f"👀 Response preview: {preview}...")
+
+                ctx.output.count("successful_requests")
+            else:
+                # 只有主方法失败时才输出错误信息，其他方法失败时不输出
+                if method == primary:
+                    ctx.output.print_error(f"{method} request failed for {url}: {result['error']}")
+                ctx.output.count("failed_requests")
+
+        return response_text_to_return
+
+    # 获取HTML内容 (Extract HTML content)
+    def extract_html(self, URL, follow_redirects=True, ctx=None):
+        """
+        URL: 目标URL (Target URL)
+        ctx: 扫描上下文 (Scan context)
+        return: 返回HTML内容 (Return HTML content)
+
+        先查响应缓存，同一URL的并发抓取只发一次请求 (Cached; concurrent fetches of one URL share a request)
+        """
+        ctx = ctx or self.default_ctx
+        cached = self.response_cache.get("page", "GET", URL)
+        if cached is None:
+            with self.response_cache.fetch_lock("page", "GET", URL):
+                cached = self.response_cache.get("page", "GET", URL)
+                if cached is None:
+                    with self.profiler.stage("fetch"):
+                        content = self._extract_html(URL, follow_redirects, ctx)
+                    if content is not None:
+                        self.response_cache.put("page", "GET", URL, CachedResponse(content))
+                    return content
+        ctx.output.print_verbose(f"♻️ Using cached content: {URL}")
+        return cached.text
+
+    def _extract_html(self, URL, follow_redirects=True, ctx=None):
+        """
+        URL: 目标URL (Target URL)
+        header: 请求头 (Request headers)
+        raw: 请求返回的内容 (Raw response content)
+        content: 解析后的HTML内容 (Parsed HTML content)
+        ctx: 扫描上下文 (Scan context)
+        return: 返回HTML内容 (Return HTML content)
+        """
+        ctx = ctx or self.default_ctx
+        header = self.build_page_headers()
+        # 磁盘缓存中有该URL时发送条件请求 (Conditional request when the disk cache has this URL)
+        header.update(self.response_cache.validators(URL))
+        host = urlparse(URL).netloc
+
+        # 设置重试次数
+        max_retries = 3
+        retry_delay = 1
+
+        for attempt in range(max_retries):
+            try:
+                # 添加代理支持
+                proxies = self.proxies()
+                if not (proxies and isinstance(proxies, dict)):
+                    proxies = None
+
+                # 发送请求，复用共享连接池
+                with self.profiler.stage("rate_wait"):
+                    self.rate_limiter.acquire(host)
+                started = time.monotonic()
+                with ctx.slot():
+                    raw = self.http_client.get(
+                        URL, 
+                        headers=header, 
+                        proxies=proxies,
+                        timeout=(10, 30),  # 连接超时10秒，读取超时30秒
+                        cookies=self.config.cookie if self.config.cookie else None,
+                        allow_redirects=follow_redirects,  # 根据参数决定是否跟随重定向
+                        stream=False
+                    )
+                self.rate_limiter.observe(host, raw.status_code, time.monotonic() - started, raw.headers.get('Retry-After'))
+                self.profiler.record_request(host, raw.status_code, time.monotonic() - started)
+                self.profiler.record_bytes(host, len(raw.content))
+                ctx.output.metrics.record_response(raw.status_code, len(raw.content))
+
+                if raw.status_code in [429, 503] and attempt < max_retries - 1:
+                    ctx.output.print_verbose(f"⏳ {raw.status_code} from {host}, slowing down and retrying: {URL}")
+                    continue
+
+                # 内容未变化，使用磁盘缓存 (Not modified, use the disk cache)
+                if raw.status_code == 304:
+                    content = self.response_cache.revalidated(URL)
+                    if content is not None:
+                        ctx.output.print_verbose(f"♻️ Not modified, using disk cache: {URL}")
+                        return content
+                    # 发出条件请求后磁盘缓存被清除或损坏，304没有内容，不带验证头重新请求
+                    for name in VALIDATOR_HEADERS:
+                        header.pop(name, None)
+                    if attempt < max_retries - 1:
+                        ctx.output.print_verbose(f"🔄 304 without a cached copy, refetching: {URL}")
+                        continue
+                    ctx.output.print_error(f"Not modified but no cached copy for {URL}")
+                    return None
+
+                # 检查重定向状态码
+                if follow_redirects and raw.status_code in [301, 302, 303, 307, 308]:
+                    # 获取重定向后的URL
+                    redirect_url = raw.url
+                    if redirect_url != URL:
+                        ctx.output.print_verbose(f"🔄 Redirect detected: {URL} -> {redirect_url}")
+                        ctx.output.print_info(f"📡 [bold yellow]Following redirect:[/bold yellow] [green]{redirect_url}[/green]")
+                        # 递归调用自身获取重定向后的内容
+                        return self._extract_html(redirect_url, follow_redirects=True, ctx=ctx)
+
+                raw.raise_for_status()
+
+                # 这里做了三个尝试，如果都失败，则返回None
+                try:
+                    content = raw.content.decode("utf-8", "ignore")
+                except UnicodeDecodeError:
+                    try:
+                        content = raw.content.decode("gbk", "ignore")
+                    except UnicodeDecodeError:
+                        content = raw.content.decode("latin-1", "ignore")
+
+                self.response_cache.store_disk(URL, content, raw.headers)
+                ctx.output.print_verbose(f"✅ Successfully retrieved HTML content: {URL}")
+                return content
+
+            except requests.exceptions.SSLError as e:
+                ctx.output.metrics.record_error("ssl")
+                if attempt < max_retries - 1:
+                    ctx.output.print_verbose(f"🔄 SSL error on attempt {attempt + 1}, retrying: {URL}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    ctx.output.print_error(f"SSL error after {max_retries} attempts {URL}: {str(e)}")
+                    return None
+
+            except requests.exceptions.ConnectionError as e:
+                ctx.output.metrics.record_error("connection")
+                self.rate_limiter.observe(host)
+                self.profiler.record_request(host, "error", time.monotonic() - started)
+                if attempt < max_retries - 1:
+                    ctx.output.print_verbose(f"🔄 Connection error on attempt {attempt + 1}, retrying: {URL}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    ctx.output.print_error(f"Connection error after {max_retries} attempts {URL}: {str(e)}")
+                    return None
+
+            except requests.exceptions.Timeout as e:
+                ctx.output.metrics.record_error("timeout")
+                self.rate_limiter.observe(host)
+                self.profiler.record_request(host, "error", time.monotonic() - started)
+                if attempt < max_retries - 1:
+                    ctx.output.print_verbose(f"🔄 Timeout on attempt {attempt + 1}, retrying: {URL}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    ctx.output.print_error(f"Timeout after {max_retries} attempts {URL}: {str(e)}")
+                    return None
+
+            except requests.exceptions.RequestException as e:
+                # HTTP状态错误在收到响应时已按状态码计数 (HTTP errors were counted by status on arrival)
+                if not isinstance(e, requests.exceptions.HTTPError):
+                    ctx.output.metrics.record_error("redirect" if isinstance(e, requests.exceptions.TooManyRedirects) else "other")
+                if attempt < max_retries - 1:
+                    ctx.output.print_verbose(f"🔄 Request error on attempt {attempt + 1}, retrying: {URL}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    ctx.output.print_error(f"Request failed after {max_retries} attempts {URL}: {str(e)}")
+                    return None
+
+            except Exception as e:
+                ctx.output.metrics.record_error("other")
+                if attempt < max_retries - 1:
+                    ctx.output.print_verbose(f"🔄 Unexpected error on attempt {attempt + 1}, retrying: {URL}")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2
+                    continue
+                else:
+                    ctx.output.print_error(f"Unexpected error after {max_retries} attempts {URL}: {str(e)}")
+                    return None
+
+        return None
+
+    def fetch_scripts(self, script_urls, on_done=None, ctx=None, page=None):
+        """
+        并发下载外部脚本，每个主机同时最多 --script-concurrency 个请求
+
+        Args:
+            script_urls (list): 按文档顺序排列的脚本URL
+            on_done (callable): 每个脚本下载完成后的回调 on_done(url)
+            ctx (ScanContext): 扫描上下文
+            page (str): 引用这些脚本的页面，只用于 --jsonl 事件
+
+        Returns:
+            dict: {脚本URL: 内容}，按文档顺序，下载失败的脚本不包含在内
+        """
+        ctx = ctx or self.default_ctx
+        if not script_urls:
+            return {}
+
+        def fetch(purl):
+            with self.script_host_limiter.get(urlparse(purl).netloc):
+                content = self.extract_html(purl, ctx=ctx)
+            if on_done:
+                on_done(purl)
+            return content
+
+        hosts = {urlparse(purl).netloc for purl in script_urls}
+        max_workers = min(len(script_urls), len(hosts) * self.script_host_limiter.limit)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            contents = list(executor.map(fetch, script_urls))
+
+        # 按文档顺序合并结果
+        script_array = {}
+        for purl, script_content in zip(script_urls, contents):
+            ctx.output.emit("script", url=purl, page=page, ok=bool(script_content), bytes=len(script_content or ""))
+            if script_content:
+                script_array[purl] = script_content
+            else:
+                ctx.output.print_warning(f"Cannot get external script: {purl}")
+        return script_array
+
+    def extract_script(self, script_url, content, ctx=None):
+        """
+        提取一个脚本中的URL，使用 --index 时内容和规则都未变化的脚本直接使用索引中上次的结果
+
+        Returns:
+            list: 提取到的URL
+        """
+        ctx = ctx or self.default_ctx
+        rules = URLExtractor.rules_fingerprint()
+        if self.index is not None:
+            cached = self.index.script_urls(script_url, content, rules)
+            if cached is not None:
+                ctx.output.print_verbose(f"♻️ Script unchanged since last scan: {script_url}")
+                return cached
+        with self.profiler.regex(script_url, len(content)):
+            urls = URLExtractor.extract_urls(content, self.extractor)
+        if self.index is not None:
+            self.index.store_script(script_url, content, rules, urls)
+        return urls
+
+    def fetch_lazy_chunks(self, script_array, ctx=None, page=None):
+        """
+        按 --lazy-chunks 从已下载的脚本中还原懒加载分块的URL，经 fetch_scripts 下载后加入 script_array
+        分块中还可能引用其他分块（Vite 的嵌套 import()），逐轮发现直到没有新分块或达到 --max-chunks
+
+        Args:
+            script_array (dict): {脚本URL: 内容}，原地追加分块
+            ctx (ScanContext): 扫描上下文
+            page (str): 所在页面，只用于 --jsonl 事件
+
+        Returns:
+            int: 下载成功的分块数
+        """
+        ctx = ctx or self.default_ctx
+        attempted = set()
+        fetched = 0
+        while len(attempted) < self.config.max_chunks:
+            with self.profiler.stage("chunks"):
+                chunk_urls = [chunk for chunk in find_chunk_urls(script_array, self.config.max_chunks)
+                              if chunk not in attempted][:self.config.max_chunks - len(attempted)]
+            if not chunk_urls:
+                break
+            ctx.output.print_verbose(f"🧩 Found {len(chunk_urls)} lazy chunks")
+            attempted.update(chunk_urls)
+            chunks = self.fetch_scripts(chunk_urls, ctx=ctx, page=page)
+            script_array.update(chunks)
+            fetched += len(chunks)
+        if fetched:
+            ctx.output.count("lazy_chunks", fetched)
+        return fetched
+
+    def source_map_urls(self, script_array, allurls, ctx=None):
+        """
+        按 --source-maps 下载每个脚本的 source map，从原始源文件中提取URL
+        源文件的结果插在所属脚本之前，同一端点优先归属到原始源文件
+
+        Args:
+            script_array (dict): {脚本URL: 内容}
+            allurls (dict): {来源: [URL列表]}
+            ctx (ScanContext): 扫描上下文
+
+        Returns:
+            dict: 加入源文件结果后的 {来源: [URL列表]}
+        """
+        ctx = ctx or self.default_ctx
+        scripts = list(script_array.items())
+        hosts = {urlparse(script).netloc for script, _ in scripts}
+        max_workers = max(1, min(len(scripts), len(hosts) * self.script_host_limiter.limit))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            found = list(executor.map(lambda item: self.extract_source_map(item[0], item[1], ctx), scripts))
+
+        merged = {}
+        if "HTML_attributes" in allurls:
+            merged["HTML_attributes"] = allurls["HTML_attributes"]
+        for (script, _), sources in zip(scripts, found):
+            merged.update(sources)
+            if script in allurls:
+                merged[script] = allurls[script]
+        return merged
+
+    def extract_source_map(self, script_url, content, ctx=None):
+        """
+        下载脚本末尾 sourceMappingURL 指向的 source map，按原始源文件提取URL
+        结果按 .map 地址缓存，多个页面引用同一个脚本时只下载一次
+
+        Returns:
+            dict: {"脚本URL::源文件名": [URL列表]}，没有 source map 或下载失败时为空
+        """
+        ctx = ctx or self.default_ctx
+        map_url = find_source_map_url(script_url, content)
+        if map_url is None:
+            return {}
+        key = f"{script_url}#inline-map" if map_url.startswith("data:") else map_url
+        cached = self.response_cache.get("sourcemap", "GET", key)
+        if cached is None:
+            with self.response_cache.fetch_lock("sourcemap", "GET", key):
+                cached = self.response_cache.get("sourcemap", "GET", key)
+                if cached is None:
+                    with self.script_host_limiter.get(urlparse(script_url).netloc):
+                        found = self._read_source_map(map_url, ctx)
+                    cached = CachedResponse(json.dumps(found or {}), success=found is not None)
+                    self.response_cache.put("sourcemap", "GET", key, cached)
+        found = json.loads(cached.text)
+        if found:
+            ctx.output.print_verbose(f"🗺️ Source map for {script_url}: {len(found)} source files with URLs")
+        return {f"{script_url}::{name}": urls for name, urls in found.items()}
+
+    @staticmethod
+    def _error_kind(error):
+        """requests 异常对应的错误计数类别，与探测请求的分类相同"""
+        if isinstance(error, requests.exceptions.SSLError):
+            return "ssl"
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return "connection"
+        if isinstance(error, requests.exceptions.Timeout):
+            return "timeout"
+        if isinstance(error, requests.exceptions.TooManyRedirects):
+            return "redirect"
+        return "other"
+
+    def _read_source_map(self, map_url, ctx):
+        """流式下载并解析 source map，返回 {源文件名: [URL列表]}，失败时为None"""
+        def extract(name, source):
+            ctx.output.count("source_map_sources")
+            with self.profiler.regex(name, len(source)):
+                return URLExtractor.extract_urls(source, self.extractor)
+
+        if map_url.startswith("data:"):
+            try:
+                return extract_source_map(decode_chunks(data_url_chunks(map_url)), extract)
+            except ValueError:
+                return None
+
+        host = urlparse(map_url).netloc
+        proxies = self.proxies()
+        if not (proxies and isinstance(proxies, dict)):
+            proxies = None
+        with self.profiler.stage("rate_wait"):
+            self.rate_limiter.acquire(host)
+        started = time.monotonic()
+        try:
+            with ctx.slot():
+                res = self.http_client.get(
+                    map_url,
+                    headers=self.build_page_headers(),
+                    proxies=proxies,
+                    timeout=(10, 30),
+                    cookies=self.config.cookie if self.config.cookie else None,
+                    stream=True
+                )
+                try:
+                    self.rate_limiter.observe(host, res.status_code, time.monotonic() - started, res.headers.get('Retry-After'))
+                    self.profiler.record_request(host, res.status_code, time.monotonic() - started)
+                    ctx.output.metrics.record_response(res.status_code)
+                    if not res.ok:
+                        ctx.output.print_verbose(f"🗺️ Source map unavailable ({res.status_code}): {map_url}")
+                        return None
+
+                    def chunks():
+                        for chunk in res.iter_content(MAP_CHUNK_SIZE):
+                            self.profiler.record_bytes(host, len(chunk))
+                            ctx.output.metrics.incr("bytes", len(chunk))
+                            yield chunk
+
+                    return extract_source_map(decode_chunks(chunks()), extract)
+                finally:
+                    res.close()
+        except requests.exceptions.RequestException as e:
+            ctx.output.metrics.record_error(self._error_kind(e))
+            self.rate_limiter.observe(host)
+            self.profiler.record_request(host, "error", time.monotonic() - started)
+            ctx.output.print_verbose(f"🗺️ Cannot get source map {map_url}: {e}")
+            return None
+
+    def _safe_advance(self, progress, task, purl):
+        """线程安全地推进脚本下载进度条"""
+        with self._progress_lock:
+            progress.update(task, description=f"[cyan]📄 Fetched: {purl.split('/')[-1]}")
+            progress.advance(task)
+
+    def find_by_url(self, url, deep_scan_manager=None, ctx=None, show_progress=True):
+        """
+        广度优先扫描目标 (Breadth-first scan of a target)
+        逐层并发扫描页面，每层按优先级最多选取 --deep-budget 个同域名页面进入下一层
+
+        Args:
+            url (str): 目标URL
+            deep_scan_manager (DeepScanManager): 深度扫描管理器，用于去重
+            ctx (ScanContext): 扫描上下文，批量扫描时每个目标独立
+            show_progress (bool): 是否显示进度条
+        """
+        ctx = ctx or self.default_ctx
+        if deep_scan_manager is None:
+            deep_scan_manager = DeepScanManager(url, self.config.depth)
+
+        if not deep_scan_manager.try_claim(url):
+            return None
+
+        frontier = [url]
+        depth = 0
+        while frontier:
+            workers = min(len(frontier), max(1, self.config.crawl_threads))
+            if workers == 1:
+                page_results = [self.scan_page_safely(page_url, depth, show_progress, ctx) for page_url in frontier]
+            else:
+                # 多个页面同时扫描时不显示进度条（Rich同一时间只能有一个动态显示）
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    page_results = list(executor.map(lambda page_url: self.scan_page_safely(page_url, depth, False, ctx), frontier))
+
+            if depth >= deep_scan_manager.max_depth:
+                break
+
+            # 深度扫描：按优先级选出下一层要扫描的同域名页面
+            frontier, found = deep_scan_manager.select_frontier(
+                [(page_url, r) for page_url, r in zip(frontier, page_results) if r], self.config.deep_budget)
+            depth += 1
+            if found:
+                ctx.output.print_info(f"🔍 [bold yellow]Found {found} URLs for deep scan (depth {depth})...[/bold yellow]")
+                if found > len(frontier):
+                    ctx.output.print_warning(f"⚠️ Limiting deep scan to {len(frontier)} URLs (found {found})")
+
+    def scan_page_safely(self, url, depth, show_progress=True, ctx=None):
+        """扫描单个页面，深度扫描页面出错时只记录错误"""
+        ctx = ctx or self.default_ctx
+        if depth == 0:
+            return self.scan_page(url, depth, show_progress, ctx)
+        try:
+            ctx.output.print_verbose(f"🔍 Starting deep scan for: {url}")
+            return self.scan_page(url, depth, show_progress, ctx)
+        except Exception as e:
+            ctx.output.print_error(f"Error in deep scan for {url}: {str(e)}")
+            return None
+
+    def scan_page(self, url, depth=0, show_progress=True, ctx=None):
+        """
+        扫描单个页面：抓取、解析、提取并探测发现的端点
+
+        Returns:
+            dict: {来源: [URL列表]}，页面无法访问时为None
+        """
+        ctx = ctx or self.default_ctx
+        try:
+            if depth == 0:
+                ctx.output.print_scan_start(url)
+            else:
+                ctx.output.print_info(f"🔍 [bold blue]Deep scan (depth {depth}):[/bold blue] [green]{url}[/green]")
+        except:
+            ctx.output.print_info("❌ Please specify a valid URL, e.g.: https://www.google.com")
+            return None
+
+        # 上次运行已完成的页面直接使用检查点中的提取结果，其端点也都已探测过
+        if ctx.checkpoint:
+            cached = ctx.checkpoint.get_page(ctx.target, url)
+            if cached is not None:
+                ctx.output.print_verbose(f"⏭️ Skipping page completed in checkpoint: {url}")
+                ctx.output.count("total_urls", sum(len(urls) for urls in cached.values()))
+                return cached
+
+        # 使用状态显示
+        if show_progress and not ctx.output.silent_mode:
+            with Status("[bold green]🔍 Fetching target page...", console=ctx.output.console):
+                html_raw = self.extract_html(url, ctx=ctx)
+        else:
+            html_raw = self.extract_html(url, ctx=ctx)
+
+        ctx.output.emit("page", url=url, depth=depth, ok=html_raw is not None, bytes=len(html_raw or ""))
+        if html_raw == None: 
+            ctx.output.print_error(f"Cannot access {url}")
+            return None
+
+        ctx.output.print_verbose("🔍 Starting to parse HTML content...")
+        # 一次解析得到脚本、URL属性和data属性 (Single parse shared by all extractors)
+        with self.profiler.stage("parse"):
+            html = ParsedDocument.parse(html_raw, backend=self.config.html_parser)
+
+            # 首先从HTML标签中提取URL
+            ctx.output.print_verbose("📋 Extracting URLs from HTML attributes...")
+            html_urls = URLExtractor.extract_urls_from_html(html)
+        ctx.output.print_verbose(f"📋 Found {len(html_urls)} URLs in HTML attributes")
+
+        # 然后处理JavaScript
+        html_scripts = html.scripts
+        ctx.output.print_verbose(f"📄 Found {len(html_scripts)} script tags")
+
+        # 内联脚本直接拼接，外部脚本按文档顺序收集后并发下载
+        script_temp = ""
+        script_urls = []
+        for script_src, script_text in html_scripts:
+            if script_src is None:
+                script_temp += script_text + "\n"
+            else:
+                purl = URLProcessor.process_url(url, script_src)
+                if purl not in script_urls:
+                    script_urls.append(purl)
+
+        # 创建进度条来显示脚本下载进度
+        progress = ctx.output.create_progress() if show_progress else None
+        if progress and script_urls:
+            with progress:
+                script_task = progress.add_task("[cyan]📄 Fetching scripts...", total=len(script_urls))
+                script_array = self.fetch_scripts(script_urls, lambda purl: self._safe_advance(progress, script_task, purl), ctx, url)
+        else:
+            # 静默模式或无进度条时的处理
+            script_array = self.fetch_scripts(script_urls, ctx=ctx, page=url)
+
+        script_array[url] = script_temp
+
+        # 路由拆分的懒加载分块 (Lazy route chunks referenced by the runtime)
+        if self.config.lazy_chunks:
+            self.fetch_lazy_chunks(script_array, ctx, url)
+
+        # 分析脚本以提取URL
+        allurls = {}
+
+        # 先添加HTML中提取的URLs
+        if html_urls:
+            allurls["HTML_attributes"] = html_urls
+
+        total_scripts = len(script_array)
+
+        if not ctx.output.silent_mode:
+            ctx.output.print_info(f"🔎 [bold yellow]Analyzing {total_scripts} scripts for API endpoints...[/bold yellow]")
+
+        progress = ctx.output.create_progress() if show_progress else None
+        if progress:
+            with progress:
+                analyze_task = progress.add_task("[green]🔍 Analyzing scripts...", total=total_scripts)
+
+                for script in script_array:
+                    script_name = script.split('/')[-1] if '/' in script else script
+                    progress.update(analyze_task, description=f"[green]🔍 Analyzing: {script_name}")
+
+                    ctx.output.print_verbose(f"🔎 Analyzing script: {script}")
+                    temp_urls = self.extract_script(script, script_array[script], ctx)
+
+                    if len(temp_urls) == 0: 
+                        ctx.output.print_verbose("🔍 No URLs found")
+                    else:
+                        ctx.output.print_verbose(f"✅ Found {len(temp_urls)} URLs")
+                        allurls[script] = temp_urls
+
+                    progress.advance(analyze_task)
+        else:
+            # 静默模式处理
+            for script in script_array:
+                ctx.output.print_verbose(f"🔎 Analyzing script: {script}")
+                temp_urls = self.extract_script(script, script_array[script], ctx)
+                if len(temp_urls) == 0: 
+                    ctx.output.print_verbose("🔍 No URLs found")
+                else:
+                    ctx.output.print_verbose(f"✅ Found {len(temp_urls)} URLs")
+                    allurls[script] = temp_urls
+
+        # 原始源文件中的URL (URLs from the original sources in source maps)
+        if self.config.source_maps:
+            allurls = self.source_map_urls(script_array, allurls, ctx)
+
+        # 添加锁保证输出的线程安全
+        print_lock = threading.Lock()
+
+        # 处理发现的URL：先解析为绝对URL并按目标去重，每个端点只探测一次，其余来源只做记录
+        # (Resolve and dedupe candidates first; each endpoint is probed once and every source is recorded)
+        total_urls = sum(len(urls) for urls in allurls.values())
+        endpoints = []
+        with self.profiler.stage("dedupe"):
+            for i in allurls:
+                for j in allurls[i]:
+                    target_url = URLProcessor.resolve_endpoint(j, url)
+                    if ctx.endpoints.add(target_url, i):
+                        endpoints.append((target_url, i))
+                        ctx.output.emit("endpoint", url=target_url, source=i, page=url)
+
+        if endpoints:
+            ctx.output.print_info(f"🎯 [bold green]Found {total_urls} potential API endpoints ({len(endpoints)} new unique). Testing them...[/bold green]")
+
+            # 进度条更新：Rich Progress 内部自带锁，不再与表格输出争用 print_lock
+            def safe_update_progress(progress, task, description=None):
+                if description:
+                    progress.update(task, description=description)
+                progress.advance(task)
+
+            # 线程安全的URL打印
+            def safe_print_url(url, source, IsSuccess):
+                with print_lock:
+                    if IsSuccess:
+                        ctx.output.print_url(url, source, IsSuccess, sources=ctx.endpoints.sources(url))
+                    # 失败则不输出到表格
+
+            # 线程安全的请求处理
+            def process_url(target_url, i):
+                # 上次运行已探测过的端点，结果已在开始扫描时恢复
+                if ctx.checkpoint and ctx.checkpoint.is_probed(ctx.target, target_url):
+                    return
+                # 增量扫描索引中未过期的探测结果直接沿用
+                if self.index is not None:
+                    cached = self.index.cached_probe(ctx.target, target_url)
+                    if cached is not None:
+                        ctx.output.emit("probe", url=target_url, ok=cached["ok"], reused=True)
+                        safe_print_url(target_url, i, cached["ok"])
+                        # 沿用的结果同样写入检查点，中断后 --resume 不会丢失这些端点
+                        if ctx.checkpoint:
+                            ctx.checkpoint.record_probe(ctx.target, target_url, i, cached["ok"])
+                        return
+
+                try:
+                    # 注意线程安全
+                    with self.profiler.stage("probe"):
+                        resp = self.do_request(target_url, ctx)
+                    IsSuccess = resp is not None
+                except Exception as e:
+                    IsSuccess = False
+                    with print_lock:
+                        ctx.output.print_error(f"Error testing {target_url}: {str(e)}")
+                safe_print_url(target_url, i, IsSuccess)
+                if ctx.checkpoint:
+                    ctx.checkpoint.record_probe(ctx.target, target_url, i, IsSuccess)
+                if self.index is not None:
+                    self.index.record_probe(ctx.target, target_url, i, IsSuccess)
+
+            progress = ctx.output.create_progress() if show_progress else None
+            if progress:
+                with progress:
+                    test_task = progress.add_task("[blue]🌐 Testing endpoints...", total=len(endpoints))
+                    with ThreadPoolExecutor(max_workers=self.config.threads) as executor:  # 可根据需要调整线程数
+                        futures = []
+                        for target_url, i in endpoints:
+                            url_display = target_url[:50] + "..." if len(target_url) > 50 else target_url
+
+                            # 提交任务到线程池
+                            futures.append(executor.submit(process_url, target_url, i))
+
+                            # 更新进度条描述（非必需）
+                            progress.update(test_task, description=f"[blue]🌐 In queue: {url_display}")
+
+                        # 动态更新进度条
+                        for future in as_completed(futures):
+                            safe_update_progress(progress, test_task)
+            else:
+                # 静默模式处理
+                with ThreadPoolExecutor(max_workers=self.config.threads) as executor:
+                    futures = [executor.submit(process_url, target_url, i) for target_url, i in endpoints]
+
+                    # 等待所有任务完成
+                    for future in as_completed(futures):
+                        pass
+        elif total_urls > 0:
+            ctx.output.print_info(f"🎯 [bold green]Found {total_urls} potential API endpoints, all already tested[/bold green]")
+        else:
+            ctx.output.print_warning("⚠️ No API endpoints discovered in the scanned content")
+
+        # 更新统计信息
+        ctx.output.count("total_urls", total_urls)
+
+        if ctx.checkpoint:
+            ctx.checkpoint.record_page(ctx.target, url, allurls)
+
+        return allurls
+
+    def get_async_engine(self, ctx):
+        """
+        创建异步扫描引擎，缺少aiohttp或使用SOCKS代理时返回None回退到线程引擎
+        """
+        try:
+            from .async_engine import AsyncScanEngine
+        except ImportError:
+            self.output.print_error("需要安装aiohttp库才能使用异步引擎: pip install aiohttp，已回退到线程引擎")
+            return None
+
+        proxies = self.proxies()
+        proxy = None
+        if proxies:
+            proxy = proxies.get("http") if isinstance(proxies, dict) else None
+            if proxy is None or proxy.startswith("socks"):
+                self.output.print_warning("异步引擎不支持SOCKS代理，已回退到线程引擎")
+                return None
+
+        return AsyncScanEngine(
+            ctx.output,
+            lambda url, store: self.report_probe_results(url, store, ctx),
+            self.build_probe_headers,
+            self.build_page_headers,
+            cookie=self.config.cookie,
+            timeout=self.config.timeout,
+            rate_limiter=self.rate_limiter,
+            response_cache=self.response_cache,
+            concurrency=self.config.concurrency,
+            max_depth=self.config.depth,
+            proxy=proxy,
+            html_parser=self.config.html_parser,
+            script_concurrency=self.config.script_concurrency,
+            deep_budget=self.config.deep_budget,
+            checkpoint=ctx.checkpoint,
+            target=ctx.target,
+            endpoints=ctx.endpoints,
+            max_body=self.max_body,
+            methods=self.probe_methods,
+            probe_strategy=self.config.probe_strategy,
+            profiler=self.profiler,
+            extractor=self.extractor,
+            index=self.index,
+            source_maps=self.config.source_maps,
+            lazy_chunks=self.config.lazy_chunks,
+            max_chunks=self.config.max_chunks,
+            request_slot=ctx.request_slot
+        )
+
+    def scan_target(self, url, ctx=None, show_progress=True):
+        """
+        按 --engine 选择扫描引擎扫描一个目标，有检查点时先恢复上次的结果并跳过已完成的目标
+
+        Returns:
+            IndexDiff: 使用 --index 时与上次扫描的端点差异，否则为None
+        """
+        ctx = ctx or self.default_ctx
+        if ctx.checkpoint:
+            restored = ctx.checkpoint.restored_results(url)
+            if restored:
+                ctx.output.restore_results(restored)
+                ctx.output.print_info(f"♻️ [bold cyan]Restored {len(restored)} endpoints from checkpoint for {url}[/bold cyan]")
+            if ctx.checkpoint.is_target_done(url):
+                ctx.output.print_info(f"⏭️ [bold cyan]Skipping target completed in checkpoint: {url}[/bold cyan]")
+                return
+
+        engine = self.get_async_engine(ctx) if self.config.engine == "async" else None
+        if engine is not None:
+            engine.run(url)
+        else:
+            self.find_by_url(url, ctx=ctx, show_progress=show_progress)
+
+        if ctx.checkpoint:
+            ctx.checkpoint.record_target(url)
+
+        if self.index is not None and ctx.target:
+            changes = self.index.finish_target(ctx.target, ctx.endpoints.urls())
+            ctx.output.count("endpoints_new", len(changes.new))
+            ctx.output.count("endpoints_removed", len(changes.removed))
+            ctx.output.count("endpoints_changed", len(changes.changed))
+            ctx.output.print_index_changes(changes)
+            return changes
+        return None
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Source Map 提取模块 (Source Map Extraction Module)
+压缩脚本末尾的 //# sourceMappingURL= 指向的 .map 文件中，sourcesContent 保存了打包前的源文件。
+这里按块流式解析 .map：只保留 sources 文件名列表，sourcesContent 每次只解码一个源文件，
+mappings 等大字段边读边丢弃，几十MB的 .map 内存占用也只取决于最大的单个源文件
+"""
+
+import re
+import json
+import base64
+import codecs
+from urllib.parse import urljoin, unquote_to_bytes
+
+# 单个源文件超过这个大小（字符）时跳过，不解码 (Sources larger than this are skipped)
+MAX_SOURCE_CHARS = 4 * 1024 * 1024
+
+# 读取 .map 的块大小 (Chunk size for reading maps)
+MAP_CHUNK_SIZE = 64 * 1024
+
+# 异步引擎先把 .map 写入临时文件再在线程中解析，超过这个大小的部分落盘 (Async engine spools maps to disk past this size)
+MAP_SPOOL_SIZE = 1024 * 1024
+
+# 默认跳过的第三方源文件 (Third-party sources skipped by default)
+SKIPPED_SOURCES = ("/node_modules/", "webpack/bootstrap", "webpack/runtime")
+
+_SOURCE_MAPPING_URL = re.compile(r'(?://|/\*)[#@]\s*sourceMappingURL=([^\s\'"*]+)')
+_NON_SPACE = re.compile(r'\S')
+# 字符串内容：非引号非反斜杠字符，或转义序列 (String body, unrolled for speed)
+_STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r'[,\]}]')
+
+
+def find_source_map_url(script_url, content):
+    """
+    查找脚本末尾的 sourceMappingURL 注释
+
+    Args:
+        script_url (str): 脚本URL，相对的 .map 地址相对它解析
+        content (str): 脚本内容
+
+    Returns:
+        str: .map 的绝对URL或 data: URL，没有时为None
+    """
+    index = content.rfind("sourceMappingURL=")
+    if index == -1:
+        return None
+    match = _SOURCE_MAPPING_URL.search(content, max(0, index - 4))
+    if match is None:
+        return None
+    url = match.group(1)
+    if url.startswith("data:"):
+        return url
+    return urljoin(script_url, url)
+
+
+def data_url_chunks(url, chunk_size=MAP_CHUNK_SIZE):
+    """
+    内联 source map（data:application/json;base64,...）的内容，按块产出
+
+    Yields:
+        bytes: 解码后的内容块
+    """
+    header, _, payload = url.partition(",")
+    data = base64.b64decode(payload) if header.endswith(";base64") else unquote_to_bytes(payload)
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def decode_chunks(chunks):
+    """把字节块增量解码为UTF-8文本块，多字节字符可以跨块"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class _CharStream:
+    """按需从块迭代器补充的文本缓冲区，只保留尚未处理的部分"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.buf = ""
+        self.pos = 0
+
+    def fill(self, keep_from=None):
+        """
+        读入下一块，丢弃 keep_from（默认当前位置）之前的内容
+
+        Returns:
+            int: 丢弃的字符数，已到末尾时为-1
+        """
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return -1
+        keep_from = self.pos if keep_from is None else keep_from
+        self.buf = self.buf[keep_from:] + chunk
+        self.pos -= keep_from
+        return keep_from
+
+    def peek(self):
+        """跳过空白并返回下一个字符，不消费；已到末尾时返回空串"""
+        while True:
+            match = _NON_SPACE.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if self.fill() == -1:
+                return ""
+
+    def take(self):
+        char = self.peek()
+        self.pos += len(char)
+        return char
+
+    def read_string(self, limit=None):
+        """
+        读取当前位置的JSON字符串并解码
+
+        Args:
+            limit (int): 原始内容超过这么多字符时放弃，改为边读边丢弃
+
+        Returns:
+            str: 解码后的字符串，超过 limit 或无法解码时为None
+        """
+        self.pos += 1
+        start = self.pos
+        skipping = False
+        while True:
+            end = _STRING_BODY.match(self.buf, self.pos).end()
+            if end < len(self.buf) and self.buf[end] == '"':
+                self.pos = end + 1
+                if skipping:
+                    return None
+                try:
+                    return json.loads('"' + self.buf[start:end] + '"')
+                except ValueError:
+                    return None
+            if not skipping and limit is not None and end - start > limit:
+                skipping = True
+            # 末尾可能是不完整的转义，从它开始保留 (Keep a trailing partial escape)
+            self.pos = end
+            if skipping:
+                dropped = self.fill()
+            else:
+                dropped = self.fill(keep_from=start)
+                start -= dropped
+            if dropped == -1:
+                return None
+
+    def skip_value(self):
+        """跳过当前位置的任意JSON值，字符串和嵌套结构都不保留"""
+        char = self.peek()
+        if char == '"':
+            self.read_string(limit=0)
+        elif char in ("{", "["):
+            self.pos += 1
+            depth = 1
+            while depth:
+                match = _STRUCTURE.search(self.buf, self.pos)
+                if match is None:
+                    self.pos = len(self.buf)
+                    if self.fill() == -1:
+                        return
+                    continue
+                self.pos = match.start()
+                if match.group() == '"':
+                    self.read_string(limit=0)
+                else:
+                    depth += 1 if match.group() in "[{" else -1
+                    self.pos += 1
+        else:
+            # 数字和字面量至少一个字符，先消费一个，避免在不合法的 "]"/"}" 处原地打转
+            self.pos += 1
+            while True:
+                match = _SCALAR_END.search(self.buf, self.pos)
+                if match:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buf)
+                if self.fill() == -1:
+                    return
+
+
+def iter_sources(chunks, max_source=MAX_SOURCE_CHARS, skip=SKIPPED_SOURCES):
+    """
+    流式读取 source map，逐个产出带内容的源文件
+
+    Args:
+        chunks (iterable): .map 的文本块
+        max_source (int): 单个源文件的最大字符数
+        skip (tuple): 文件名包含这些片段的源文件不产出
+
+    Yields:
+        tuple: (源文件名, 源文件内容)
+    """
+    stream = _CharStream(chunks)
+    if stream.take() != "{":
+        return
+    sources = None
+    source_root = ""
+    # sourcesContent 出现在 sources 之前时暂存（少见）(Held until sources is known)
+    pending = []
+
+    def named(index, content):
+        name = sources[index] if sources and index < len(sources) and sources[index] else f"source-{index}"
+        if source_root and "://" not in name:
+            # sourceRoot 本身可能以 "//" 结尾（webpack://），只补足一个分隔符
+            name = source_root + ("" if source_root.endswith("/") else "/") + name.lstrip("/")
+        return name, content
+
+    while True:
+        char = stream.peek()
+        if char in ("}", ""):
+            break
+        if char == ",":
+            stream.pos += 1
+            continue
+        if char != '"':
+            stream.skip_value()
+            continue
+        key = stream.read_string(limit=256)
+        if stream.take() != ":":
+            break
+
+        if key in ("sources", "sourcesContent") and stream.peek() == "[":
+            stream.pos += 1
+            values = [] if key == "sources" else None
+            index = 0
+            while True:
+                char = stream.peek()
+                if char in ("]", ""):
+                    stream.pos += 1
+                    break
+                if char == ",":
+                    stream.pos += 1
+                    continue
+                if char != '"':
+                    stream.skip_value()
+                    if values is not None:
+                        values.append(None)
+                    index += 1
+                    continue
+                if values is not None:
+                    values.append(stream.read_string(limit=4096))
+                else:
+                    content = stream.read_string(limit=max_source)
+                    if content:
+                        if sources is None:
+                            pending.append((index, content))
+                        else:
+                            name, content = named(index, content)
+                            if not any(part in name for part in skip):
+                                yield name, content
+                index += 1
+            if values is not None:
+                sources = values
+        elif key == "sourceRoot" and stream.peek() == '"':
+            source_root = stream.read_string(limit=4096) or ""
+        else:
+            stream.skip_value()
+
+    for index, content in pending:
+        name, content = named(index, content)
+        if not any(part in name for part in skip):
+            yield name, content
+
+
+def extract_source_map(chunks, extract, max_source=MAX_SOURCE_CHARS):
+    """
+    从 source map 的每个源文件中提取URL
+
+    Args:
+        chunks (iterable): .map 的文本块
+        extract (callable): 提取函数 extract(源文件名, 内容) -> list
+        max_source (int): 单个源文件的最大字符数
+
+    Returns:
+        dict: {源文件名: [URL列表]}，只包含提取到URL的源文件
+    """
+    found = {}
+    for name, content in iter_sources(chunks, max_source):
+        urls = extract(name, content)
+        if urls:
+            found.setdefault(name, []).extend(urls)
+    return found
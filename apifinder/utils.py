@@ -5,21 +5,122 @@
 包含Api-Finder中使用的通用功能 (Contains common functionality used in Api-Finder)
 """
 
+import os
 import re
-import yaml
-import requests
+import json
+import time
+import hashlib
+import contextlib
+import threading
 from datetime import datetime, timedelta
 from urllib.parse import urlparse
 from .config import DEFAULT_CONFIG
+from .html_document import ParsedDocument
+
+# 规则文件路径 (Rules file path)
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rules.yaml')
+
+
+def cache_dir():
+    """用户缓存目录：$XDG_CACHE_HOME/apifinder，未设置时为 ~/.cache/apifinder"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "apifinder")
+
+
+def _write_atomic(path, write):
+    """先写入临时文件再替换，中途退出（例如后台更新检查被进程退出打断）不会留下半个文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 
 def load_rules():
-    """从 rules.yaml 加载规则"""
-    import os
-    rules_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rules.yaml')
-    with open(rules_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    """
+    加载规则：优先读取缓存目录中的 rules.json，rules.yaml 的大小或修改时间变化时重新解析YAML并刷新缓存。
+    解析YAML（含导入yaml模块）约占冷启动的20ms，读取JSON缓存不到1ms
+    """
+    stat = os.stat(RULES_PATH)
+    key = [RULES_PATH, stat.st_size, stat.st_mtime_ns]
+    cache_path = os.path.join(cache_dir(), "rules.json")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return cached["rules"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    import yaml
+    with open(RULES_PATH, 'r', encoding='utf-8') as f:
+        rules = yaml.safe_load(f)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        _write_atomic(cache_path, lambda f: json.dump({"key": key, "rules": rules}, f, ensure_ascii=False, default=str))
+    except OSError:
+        # 缓存目录不可写时每次都解析YAML (Unwritable cache dir: parse the YAML every time)
+        pass
+    return rules
+
+class CompiledRules:
+    """
+    预编译规则集 (Precompiled rule set)
+    在规则加载时构建一次，UpdateManager写入新规则后重建
+
+    Attributes:
+        url_pattern (re.Pattern): 编译后的URL提取正则
+        ignored_domains (frozenset): 忽略的域名集合
+        filter_extensions (tuple): 需要过滤的文件扩展名
+        fingerprint (str): 规则内容的指纹，增量扫描索引据此判断旧的提取结果是否仍然有效
+    """
+
+    def __init__(self, rules, filter_extensions):
+        self.url_pattern = re.compile(rules.get('url_extractor_pattern', ''), re.VERBOSE)
+        self.ignored_domains = frozenset(d.lower() for d in rules.get('ignored_domains', []) or [])
+        self.filter_extensions = tuple(ext.lower() for ext in filter_extensions)
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [self.url_pattern.pattern, sorted(self.ignored_domains), self.filter_extensions]
+        ).encode('utf-8')).hexdigest()[:16]
+        # 扩展名出现在路径末尾，或紧跟查询串/锚点
+        self._extension_re = re.compile(
+            "(?:" + "|".join(re.escape(ext) for ext in self.filter_extensions) + r")(?:[?#]|$)",
+            re.IGNORECASE
+        ) if self.filter_extensions else None
+
+    def has_filtered_extension(self, url):
+        """URL是否以需要过滤的扩展名结尾"""
+        return self._extension_re is not None and self._extension_re.search(url) is not None
+
+    def is_ignored_domain(self, url):
+        """URL的主机名或其上级域名是否在忽略列表中"""
+        if not self.ignored_domains or "//" not in url:
+            return False
+        host = urlparse(url if "://" in url else "http:" + url[url.index("//"):]).hostname
+        if not host:
+            return False
+        parts = host.split(".")
+        return any(".".join(parts[i:]) in self.ignored_domains for i in range(len(parts) - 1))
+
 
 RULES = load_rules()
+COMPILED_RULES = CompiledRules(RULES, DEFAULT_CONFIG["filter_extensions"])
+
+
+def reload_rules():
+    """
+    重新加载规则文件并重建预编译规则集 (Reload rules and rebuild compiled rule set)
+    """
+    global COMPILED_RULES
+    new_rules = load_rules()
+    # 先编译再替换，正在提取的线程始终拿到完整的规则集
+    COMPILED_RULES = CompiledRules(new_rules, DEFAULT_CONFIG["filter_extensions"])
+    RULES.clear()
+    RULES.update(new_rules)
+    return COMPILED_RULES
 
 class URLProcessor:
     """URL处理工具类 (URL processing utility class)"""
@@ -60,6 +161,36 @@ class URLProcessor:
             result = base_url
         return result
 
+    @staticmethod
+    def resolve_endpoint(candidate, base_url):
+        """
+        把提取到的候选端点解析为要探测的绝对URL，并规范化用于去重
+        带主机的候选保持原样，否则拼接到页面的 scheme://netloc 之后；
+        协议和主机转为小写，去掉 #fragment（不会发送给服务端）
+
+        Args:
+            candidate (str): 提取到的候选URL
+            base_url (str): 所在页面URL
+
+        Returns:
+            str: 规范化后的绝对URL
+        """
+        parsed = urlparse(candidate)
+        if not parsed.netloc:
+            base = urlparse(base_url)
+            parsed = urlparse(base.scheme + "://" + base.netloc + candidate)
+        return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), fragment="").geturl()
+
+# HTML属性中视为接口的文件后缀
+HTML_URL_SUFFIXES = ('.php', '.jsp', '.asp', '.aspx', '.action', '.do', '.json',
+                     '.xml', '.txt', '.html', '.htm')
+
+# data-*属性中的URL模式
+DATA_ATTRIBUTE_URL_PATTERN = re.compile(
+    r'["\']([^"\']+(?:\.php|\.jsp|\.asp|\.aspx|\.action|\.do|\.json|\.xml|/api/|/ajax/)[^"\']*)["\']'
+)
+
+
 class URLExtractor:
     """URL提取工具类 (URL extraction utility class)"""
     
@@ -69,97 +200,58 @@ class URLExtractor:
         从HTML内容中提取URL (Extract URLs from HTML content)
         
         Args:
-            html_content (str): HTML内容 (HTML content)
+            html_content (str | ParsedDocument): HTML内容或已解析的文档 (HTML content or parsed document)
             
         Returns:
             list: 提取到的URL列表 (List of extracted URLs)
         """
-        from bs4 import BeautifulSoup
-        filter_key = DEFAULT_CONFIG["filter_extensions"]
-        ignored_domains = RULES.get('ignored_domains', [])
+        rules = COMPILED_RULES
         
         urls = []
+        seen = set()
         
         try:
-            soup = BeautifulSoup(html_content, "html.parser")
-            
-            # 定义要查找的HTML属性
-            url_attributes = [
-                ('a', 'href'),
-                ('link', 'href'),
-                ('img', 'src'),
-                ('script', 'src'),
-                ('iframe', 'src'),
-                ('form', 'action'),
-                ('area', 'href'),
-                ('source', 'src'),
-                ('track', 'src'),
-                ('audio', 'src'),
-                ('video', 'src'),
-                ('embed', 'src'),
-                ('object', 'data'),
-                ('frame', 'src'),
-                ('meta', 'content'),
-                ('base', 'href'),
-            ]
+            if isinstance(html_content, ParsedDocument):
+                doc = html_content
+            else:
+                doc = ParsedDocument.parse(html_content)
             
             # 提取所有可能的URL
-            for tag_name, attr_name in url_attributes:
-                tags = soup.find_all(tag_name)
-                for tag in tags:
-                    url = tag.get(attr_name)
-                    if url and isinstance(url, str):
-                        # 清理URL
-                        url = url.strip().strip('"').strip("'")
-                        
-                        # 过滤掉无效的URL
-                        if not url or url.startswith('#') or url.startswith('javascript:') or url.startswith('mailto:') or url.startswith('tel:'):
-                            continue
-                        
-                        # 过滤掉不需要的文件扩展名
-                        if any(ext in url.lower() for ext in filter_key):
-                            continue
-                            
-                        # 过滤掉被忽略的域名
-                        if any(domain in url.lower() for domain in ignored_domains):
-                            continue
-                        
-                        # 只保留相对路径或API相关的URL
-                        if (url.startswith('/') or 
-                            url.startswith('./') or 
-                            url.startswith('../') or
-                            'api' in url.lower() or
-                            'ajax' in url.lower() or
-                            'json' in url.lower() or
-                            'xml' in url.lower() or
-                            url.endswith('.php') or
-                            url.endswith('.jsp') or
-                            url.endswith('.asp') or
-                            url.endswith('.aspx') or
-                            url.endswith('.action') or
-                            url.endswith('.do') or
-                            url.endswith('.json') or
-                            url.endswith('.xml') or
-                            url.endswith('.txt') or
-                            url.endswith('.html') or
-                            url.endswith('.htm')):
-                            
-                            if url not in urls:
-                                urls.append(url)
+            for url in doc.url_attributes:
+                # 清理URL
+                url = url.strip().strip('"').strip("'")
+                
+                # 过滤掉无效的URL
+                if not url or url.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+                    continue
+                
+                # 过滤掉不需要的文件扩展名
+                if rules.has_filtered_extension(url):
+                    continue
+                    
+                # 过滤掉被忽略的域名
+                if rules.is_ignored_domain(url):
+                    continue
+                
+                # 只保留相对路径或API相关的URL
+                lower_url = url.lower()
+                if (url.startswith(('/', './', '../')) or
+                    'api' in lower_url or
+                    'ajax' in lower_url or
+                    'json' in lower_url or
+                    'xml' in lower_url or
+                    url.endswith(HTML_URL_SUFFIXES)):
+                    
+                    if url not in seen:
+                        seen.add(url)
+                        urls.append(url)
             
             # 也查找data属性中的URL
-            all_tags = soup.find_all()
-            for tag in all_tags:
-                if tag.attrs:
-                    for attr, value in tag.attrs.items():
-                        if attr.startswith('data-') and isinstance(value, str):
-                            # 使用正则表达式查找URL模式
-                            import re
-                            url_pattern = r'["\']([^"\']+(?:\.php|\.jsp|\.asp|\.aspx|\.action|\.do|\.json|\.xml|/api/|/ajax/)[^"\']*)["\']'
-                            matches = re.findall(url_pattern, value)
-                            for match in matches:
-                                if match not in urls:
-                                    urls.append(match)
+            for value in doc.data_attributes:
+                for match in DATA_ATTRIBUTE_URL_PATTERN.findall(value):
+                    if match not in seen:
+                        seen.add(match)
+                        urls.append(match)
             
         except Exception as e:
             # 如果HTML解析失败，返回空列表
@@ -168,65 +260,738 @@ class URLExtractor:
         return urls
     
     @staticmethod
-    def extract_urls(js_content):
+    def rules_fingerprint():
+        """当前规则集的指纹，规则更新后变化 (Fingerprint of the current rule set)"""
+        return COMPILED_RULES.fingerprint
+
+    @staticmethod
+    def extract_urls(js_content, extractor=None):
         """
         从JavaScript内容中提取URL (Extract URLs from JavaScript content)
         
         Args:
             js_content (str): JavaScript内容 (JavaScript content)
+            extractor (ParallelExtractor): 进程池提取器，大脚本分块并行匹配，为None时在调用线程上提取
             
         Returns:
             list: 提取到的URL列表 (List of extracted URLs)
         """
-        filter_key = DEFAULT_CONFIG["filter_extensions"]
-        pattern_raw = RULES.get('url_extractor_pattern', '')
-        ignored_domains = RULES.get('ignored_domains', [])
-
-        pattern = re.compile(pattern_raw, re.VERBOSE)
-        result = re.finditer(pattern, str(js_content))
+        rules = COMPILED_RULES
         urls = []
-        
-        if result is None:
-            return urls
-            
-        for match in result:
-            url = match.group().strip('"').strip("'")
-            if any(sub in url for sub in filter_key):
+        js_content = str(js_content)
+
+        if extractor is not None and extractor.should_split(js_content):
+            matches = extractor.find_matches(rules.url_pattern, js_content)
+        else:
+            matches = (match.group().strip('"').strip("'") for match in rules.url_pattern.finditer(js_content))
+
+        for url in matches:
+            if rules.has_filtered_extension(url):
                 continue
-            if any(domain in url for domain in ignored_domains):
+            if rules.is_ignored_domain(url):
                 continue
             
             urls.append(url)
         
         return urls
 
+# 探测响应只保留的预览字节数，标题和 --verbose 预览都在这个范围内
+PROBE_PREVIEW_BYTES = 16 * 1024
+
+# 响应体不完整时只根据开头这么多字符判断是否为JSON
+JSON_SNIFF_CHARS = 1024
+
+# JSON对象/数组开头之后允许出现的第一个字符
+_JSON_OBJECT_START = re.compile(r'\{\s*(?:"|\})')
+_JSON_ARRAY_START = re.compile(r'\[\s*(?:[\[{"\]\-0-9]|true|false|null)')
+
+
+def is_json_response(content_type, text, complete=True):
+    """
+    判断响应是否为JSON (Check whether a response is JSON)
+
+    Args:
+        content_type (str): Content-Type响应头
+        text (str): 响应内容（可以只是开头部分）
+        complete (bool): text 是否为完整的响应体，不完整时只嗅探开头
+
+    Returns:
+        bool: 是否为JSON
+    """
+    if 'application/json' in (content_type or ''):
+        return True
+    if complete:
+        try:
+            json.loads(text)
+            return True
+        except Exception:
+            return False
+    head = text[:JSON_SNIFF_CHARS].lstrip()
+    return bool(_JSON_OBJECT_START.match(head) or _JSON_ARRAY_START.match(head))
+
+
+class BodyReader:
+    """
+    有上限的响应体读取 (Capped response body reader)
+    逐块读取时只保留前 preview 字节，累计超过 cap 字节后停止读取
+
+    Attributes:
+        preview (bytes): 响应体开头部分
+        length (int): 已读取的字节数
+        truncated (bool): 是否因超过上限而停止
+    """
+
+    def __init__(self, cap, preview=PROBE_PREVIEW_BYTES):
+        self.cap = cap
+        self.preview_limit = preview
+        self._parts = []
+        self._kept = 0
+        self.length = 0
+        self.truncated = False
+
+    def feed(self, chunk):
+        """
+        读入一块数据
+
+        Returns:
+            bool: 是否继续读取
+        """
+        self.length += len(chunk)
+        if self._kept < self.preview_limit:
+            part = chunk[:self.preview_limit - self._kept]
+            self._parts.append(part)
+            self._kept += len(part)
+        if self.cap and self.length >= self.cap:
+            self.truncated = True
+            return False
+        return True
+
+    @property
+    def preview(self):
+        return b"".join(self._parts)
+
+    @property
+    def complete(self):
+        """预览是否就是完整的响应体"""
+        return not self.truncated and self.length <= self.preview_limit
+
+
+# 探测策略 (Probe strategies)
+# full: 直接发送 --methods 中的全部方法
+# head: 先发HEAD，2xx即认为端点存活，405/501时再发送 --methods
+# options: 先发OPTIONS，按 Allow 只发送允许的方法，没有 Allow 时发送 --methods
+PROBE_STRATEGIES = ("full", "head", "options")
+
+# 廉价探测返回这些状态码时说明方法不受支持，需要升级为完整探测
+ESCALATE_STATUSES = (405, 501)
+
+
+class InvalidMethodsError(ValueError):
+    """探测方法列表不合法 (Invalid probe method list)，命令行据此指出是 --methods 的问题"""
+
+
+def parse_methods(value):
+    """
+    解析逗号分隔的HTTP方法列表，保持顺序并去重
+
+    Raises:
+        InvalidMethodsError: 列表为空或包含非法的方法名
+    """
+    methods = []
+    for method in (value or "").split(","):
+        method = method.strip().upper()
+        if not method:
+            continue
+        if not method.isalpha():
+            raise InvalidMethodsError(f"invalid HTTP method: {method}")
+        if method not in methods:
+            methods.append(method)
+    if not methods:
+        raise InvalidMethodsError("no HTTP method given")
+    return methods
+
+
+def parse_allow(value):
+    """解析 Allow 响应头，返回大写方法名集合，没有该响应头时为None"""
+    if value is None:
+        return None
+    return {method.strip().upper() for method in value.split(",") if method.strip()}
+
+
+def escalation_methods(strategy, result, methods):
+    """
+    根据HEAD/OPTIONS探测结果决定还要发送哪些方法
+
+    Args:
+        strategy (str): 探测策略，head 或 options
+        result (dict): 廉价探测在 ResultStore 中的结果
+        methods (list): 用户选择的方法
+
+    Returns:
+        list: 需要继续发送的方法，为空时廉价探测的结果就是最终结果
+    """
+    if strategy == "head":
+        if result.get("success"):
+            return []
+        return list(methods) if result.get("status") in ESCALATE_STATUSES else []
+
+    # OPTIONS经常不被支持，失败时退回完整探测
+    allow = parse_allow(result.get("allow")) if result.get("success") else None
+    if allow is None:
+        return list(methods)
+    return [method for method in methods if method in allow]
+
+
+# 创建线程安全的结果存储结构 (Create thread-safe result storage structure)
+class ResultStore:
+    """
+    单个端点的探测结果，按方法保存
+
+    Attributes:
+        results (dict): 方法 -> 结果，按探测顺序排列
+        primary (str): 主方法，它的结果决定端点是否存活
+        escalated (dict): 升级为完整探测前廉价探测 (HEAD/OPTIONS) 的结果，只用于事件和统计
+    """
+
+    def __init__(self, methods=("GET", "POST")):
+        self.results = {method: {} for method in methods}
+        self.primary = methods[0]
+        self.escalated = {}
+        self.lock = threading.Lock()
+
+    def escalate(self, methods):
+        """廉价探测的结果移到 escalated，改为等待 methods 的结果"""
+        with self.lock:
+            self.escalated = self.results
+            self.results = {method: {} for method in methods}
+            self.primary = methods[0]
+
+    def update(self, method, success, response_text, error=None, is_json=False, length=None, status=None, allow=None,
+               elapsed=None):
+        with self.lock:
+            self.results[method] = {
+                "success": success,
+                "response": response_text,
+                "error": error,
+                "is_json": is_json,
+                "length": len(response_text) if length is None and response_text else length,
+                "status": status,
+                "allow": allow,
+                "elapsed": elapsed
+            }
+
+
+class EndpointIndex:
+    """
+    单个目标的端点索引 (Per-target endpoint index)
+    每个规范化后的端点只探测一次，并记录所有引用它的来源
+    """
+
+    def __init__(self, table=None):
+        """
+        Args:
+            table (SourceTable): 来源驻留表，记录来源时驻留，为None时不驻留
+        """
+        self._sources = {}
+        self._table = table
+        self._lock = threading.Lock()
+
+    def add(self, url, source):
+        """
+        记录一个来源
+
+        Returns:
+            bool: 该端点是否第一次出现（需要探测）
+        """
+        if self._table is not None:
+            source = self._table.intern(source)
+        with self._lock:
+            sources = self._sources.get(url)
+            if sources is None:
+                self._sources[url] = [source]
+                return True
+            if source not in sources:
+                sources.append(source)
+            return False
+
+    def sources(self, url):
+        """引用该端点的全部来源的快照，未出现过的端点为空列表"""
+        with self._lock:
+            return list(self._sources.get(url, ()))
+
+    def urls(self):
+        """已发现的全部端点，按发现顺序"""
+        with self._lock:
+            return list(self._sources)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sources)
+
+
+class HostLimiter:
+    """
+    按主机限制并发数 (Per-host concurrency limiter)
+    每个主机一个信号量，用法: with limiter.get(host): ...
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+
+def parse_retry_after(value, max_wait=300):
+    """
+    解析 Retry-After 响应头，支持秒数和HTTP日期两种格式
+
+    Returns:
+        float: 需要等待的秒数，无法解析时为None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(0.0, seconds), max_wait)
+
+
+class _HostBucket:
+    """单个主机的令牌桶状态"""
+
+    __slots__ = ("rate", "tokens", "updated", "blocked_until", "baseline", "last_decrease")
+
+    def __init__(self, rate, now):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = now
+        self.blocked_until = 0.0
+        self.baseline = None
+        self.last_decrease = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    按主机的自适应令牌桶限速器 (Per-host adaptive token bucket)
+
+    每个主机以 rate 个请求/秒发放令牌，调用方先 reserve 再发请求，
+    请求结束后用 observe 反馈状态码和耗时：
+        - 429/503：速率减半，有 Retry-After 时在该时间之前暂停该主机
+        - 超时/连接错误或耗时超过基线的4倍：速率降为0.8倍
+        - 每个主机每秒最多降速一次，同一波并发请求不会被重复惩罚
+        - 其他响应且耗时正常：速率逐步恢复，最高不超过 max_rate
+
+    reserve 只计算等待时间不睡眠，线程引擎和异步引擎都可以使用。
+    """
+
+    # 不限速的主机被限流后，速率恢复到该值即取消限速
+    UNLIMITED_RECOVERY_RATE = 50.0
+
+    def __init__(self, max_rate, min_rate=0.5, burst=None):
+        """
+        Args:
+            max_rate (float): 每个主机每秒最多请求数，为None或<=0时不限速（仍遵守 Retry-After）
+            min_rate (float): 降速的下限
+            burst (float): 令牌桶容量，默认为0.25秒的令牌数
+        """
+        self.max_rate = max_rate if max_rate and max_rate > 0 else None
+        self.min_rate = min_rate if self.max_rate is None else min(min_rate, self.max_rate)
+        self.burst = burst or max(1.0, (self.max_rate or 0) / 4)
+        self.throttle_events = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host, now):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.max_rate, now)
+        return bucket
+
+    def reserve(self, host):
+        """
+        预订一个令牌 (Reserve a token)
+
+        Returns:
+            float: 发送请求前需要等待的秒数
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(host, now)
+            wait = max(0.0, bucket.blocked_until - now)
+            if bucket.rate is None:
+                return wait
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= 1.0
+            if bucket.tokens < 0:
+                wait = max(wait, -bucket.tokens / bucket.rate)
+            return wait
+
+    def acquire(self, host):
+        """阻塞直到可以向该主机发送请求"""
+        wait = self.reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, host, status=None, latency=None, retry_after=None):
+        """
+        反馈一次请求结果 (Feed back a request outcome)
+
+        Args:
+            host (str): 主机
+            status (int): HTTP状态码，请求异常时为None
+            latency (float): 请求耗时（秒）
+            retry_after (str): Retry-After 响应头
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(host, now)
+            if status in (429, 503):
+                self.throttle_events += 1
+                wait = parse_retry_after(retry_after)
+                if wait:
+                    bucket.blocked_until = max(bucket.blocked_until, now + wait)
+                self._decrease(bucket, now, 0.5, throttled=True)
+                return
+            if status is None:
+                self._decrease(bucket, now, 0.8)
+                return
+            if latency is None:
+                return
+            if bucket.baseline is None:
+                bucket.baseline = latency
+            else:
+                # 基线跟随较快的响应，慢响应只缓慢抬高基线
+                alpha = 0.2 if latency < bucket.baseline else 0.02
+                bucket.baseline += alpha * (latency - bucket.baseline)
+            if latency > bucket.baseline * 4 and latency > 0.5:
+                self._decrease(bucket, now, 0.8)
+            elif bucket.rate is not None:
+                if self.max_rate is None:
+                    # 原本不限速的主机恢复到足够快后取消限速
+                    bucket.rate *= 1.1
+                    if bucket.rate >= self.UNLIMITED_RECOVERY_RATE:
+                        bucket.rate = None
+                elif bucket.rate < self.max_rate:
+                    bucket.rate = min(self.max_rate, bucket.rate + self.max_rate * 0.05)
+
+    def _decrease(self, bucket, now, factor, throttled=False):
+        # 同一波并发请求的多个慢响应/限流只算一次拥塞
+        if now - bucket.last_decrease < 1.0:
+            return
+        bucket.last_decrease = now
+        if bucket.rate is None:
+            # 不限速的主机被限流后从较低速率开始恢复
+            if throttled:
+                bucket.rate = self.min_rate * 4
+                bucket.tokens = min(bucket.tokens, 1.0)
+            return
+        bucket.rate = max(self.min_rate, bucket.rate * factor)
+
+    def rate_for(self, host):
+        """当前主机的速率，未限速时为None"""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            return bucket.rate if bucket else self.max_rate
+
+
+class RequestBudget:
+    """
+    全局请求预算 (Global request budget)
+    限制所有目标同时在途的请求总数，并按正在扫描的目标数平分，避免某个大站点占满全部并发而让其他目标饿死；
+    份额随目标的开始和结束重新计算，已结束目标用不到的预算会分给仍在扫描的目标
+    """
+
+    def __init__(self, total):
+        """
+        Args:
+            total (int): 所有目标同时在途请求的上限
+        """
+        self.total = max(1, total)
+        self.in_flight = 0
+        self.active = 0
+        self._cond = threading.Condition()
+
+    @property
+    def share(self):
+        """每个正在扫描的目标当前最多同时在途的请求数"""
+        return max(1, self.total // max(1, self.active))
+
+    def slot(self):
+        """为一个目标创建请求配额，目标扫描结束后必须调用配额的 close"""
+        with self._cond:
+            self.active += 1
+        return RequestSlot(self)
+
+    def _acquire(self, slot, blocking):
+        with self._cond:
+            while self.in_flight >= self.total or slot.in_flight >= self.share:
+                if not blocking:
+                    return False
+                self._cond.wait()
+            self.in_flight += 1
+            slot.in_flight += 1
+            return True
+
+    def _release(self, slot):
+        with self._cond:
+            self.in_flight -= 1
+            slot.in_flight -= 1
+            self._cond.notify_all()
+
+    def _close(self, slot):
+        with self._cond:
+            if not slot.closed:
+                slot.closed = True
+                self.active -= 1
+                # 份额变大，唤醒等待的目标 (Shares grew, wake up waiting targets)
+                self._cond.notify_all()
+
+
+class RequestSlot:
+    """
+    单个目标的请求配额，同时受目标份额和全局预算限制
+    用法: with slot: 发送请求
+    """
+
+    def __init__(self, budget):
+        self._budget = budget
+        self.in_flight = 0
+        self.closed = False
+
+    def acquire(self, blocking=True):
+        """
+        占用一个配额
+
+        Args:
+            blocking (bool): 为False时不等待，配额不足立即返回（异步引擎在事件循环中轮询）
+
+        Returns:
+            bool: 是否占用成功
+        """
+        return self._budget._acquire(self, blocking)
+
+    def release(self):
+        self._budget._release(self)
+
+    def close(self):
+        """目标扫描结束，把份额还给其他目标"""
+        self._budget._close(self)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class ScanContext:
+    """
+    单个目标的扫描上下文 (Per-target scan context)
+    批量扫描时每个目标拥有独立的输出/统计和请求配额
+
+    Attributes:
+        output (OutputManager): 该目标的输出管理器
+        request_slot (RequestSlot): 请求配额，为None时不限制
+        lock (threading.Lock): 保护该目标统计信息的锁
+        target (str): 目标URL，作为检查点记录的键
+        checkpoint (Checkpoint): 扫描检查点，为None时不记录
+        endpoints (EndpointIndex): 该目标已发现的端点，跨页面去重
+    """
+
+    def __init__(self, output, request_slot=None, target=None, checkpoint=None):
+        self.output = output
+        self.request_slot = request_slot
+        self.lock = threading.Lock()
+        self.target = target
+        self.checkpoint = checkpoint
+        self.endpoints = EndpointIndex(output.source_table)
+
+    def slot(self):
+        """获取请求配额的上下文管理器"""
+        return self.request_slot if self.request_slot is not None else contextlib.nullcontext()
+
+
+# 深度扫描时优先扫描的接口特征
+DEEP_SCAN_API_HINTS = ('api', 'ajax', 'graphql', 'json', 'rest', 'service', '.do', '.action')
+
+
+# 深度扫描
+class DeepScanManager:
+    def __init__(self, base_url, max_depth=2):
+        self.base_url = base_url
+        self.base_domain = urlparse(base_url).netloc.lower()
+        self.max_depth = max_depth
+        self.scanned_urls = set()  # 已扫描的URL集合
+        self.lock = threading.Lock()
+    
+    def is_same_domain(self, url):
+        try:
+            parsed_url = urlparse(url)
+            return parsed_url.netloc == self.base_domain
+        except:
+            return False
+    
+    def add_scanned_url(self, url):
+        with self.lock:
+            self.scanned_urls.add(url)
+    
+    def is_already_scanned(self, url):
+        with self.lock:
+            return url in self.scanned_urls
+    
+    def get_filtered_urls(self, urls):
+        filtered_urls = []
+        for url in urls:
+            if self.is_same_domain(url) and not self.is_already_scanned(url):
+                filtered_urls.append(url)
+        return filtered_urls
+
+    def try_claim(self, url):
+        """原子地检查并标记URL为已扫描，返回是否由本次调用标记"""
+        with self.lock:
+            if url in self.scanned_urls:
+                return False
+            self.scanned_urls.add(url)
+            return True
+
+    @staticmethod
+    def page_priority(url, refs, script_refs):
+        """
+        页面优先级：像接口的URL最先，其次是被脚本引用多的页面（通常是SPA路由）
+
+        Args:
+            url (str): 页面URL
+            refs (int): 本层被引用的次数
+            script_refs (int): 其中来自脚本的引用次数
+        """
+        lower_url = url.lower()
+        score = 0
+        if any(hint in lower_url for hint in DEEP_SCAN_API_HINTS):
+            score += 10
+        if lower_url.split('?')[0].endswith(('.html', '.htm', '.php', '.jsp', '.asp', '.aspx')):
+            score += 2
+        return score + min(script_refs, 5) + min(refs, 5) * 0.1
+
+    def select_frontier(self, page_results, budget):
+        """
+        从本层所有页面的提取结果中选出下一层要扫描的页面
+
+        Args:
+            page_results (list): 每个页面的 (页面URL, {来源: [URL列表]})，相对链接按所在页面解析
+            budget (int): 下一层最多扫描的页面数
+
+        Returns:
+            tuple: (选中的URL列表, 候选总数)
+        """
+        refs = {}
+        for page_url, allurls in page_results:
+            for source, urls in allurls.items():
+                for url in urls:
+                    url = URLProcessor.resolve_endpoint(url, page_url)
+                    counts = refs.setdefault(url, [0, 0])
+                    counts[0] += 1
+                    if source != "HTML_attributes":
+                        counts[1] += 1
+
+        candidates = self.get_filtered_urls(refs)
+        candidates.sort(key=lambda u: self.page_priority(u, *refs[u]), reverse=True)
+
+        selected = []
+        for url in candidates:
+            if len(selected) >= budget:
+                break
+            if self.try_claim(url):
+                selected.append(url)
+        return selected, len(candidates)
+
+
 class UpdateManager:
     """更新管理工具类"""
 
+    # 后台检查没有完成（失败或进程先退出）时，至少间隔这么久再尝试，避免频繁启动时每次都发起网络请求
+    RETRY_INTERVAL = timedelta(hours=1)
+
     @staticmethod
     def get_current_timestamp():
         """获取当前时间的 YYYYMMDDHHMMSS 格式时间戳"""
         return datetime.now().strftime('%Y%m%d%H%M%S')
 
     @staticmethod
-    def check_for_updates(force_update=False):
+    def _interval_elapsed():
+        """距离规则文件记录的上次检查是否已超过更新间隔"""
+        last_check_str = str(RULES.get('last_check_timestamp', '20000101000000'))
+        last_check_time = datetime.strptime(last_check_str, '%Y%m%d%H%M%S')
+        return datetime.now() - last_check_time >= timedelta(days=DEFAULT_CONFIG['update_interval_days'])
+
+    @staticmethod
+    def check_in_background(console=None):
+        """
+        到期时在后台守护线程中检查更新，不阻塞扫描；新规则只写入规则文件，不替换正在使用的规则集，
+        从下一次运行开始生效（否则同一次扫描的脚本会用不同的规则提取，增量扫描索引的规则指纹也会中途变化）。
+        每次尝试都记录在缓存目录的 update_attempt 文件中，RETRY_INTERVAL 内不再重复尝试
+
+        Args:
+            console (Console): 输出更新信息的Rich console
+
+        Returns:
+            threading.Thread: 检查线程，未到期时为None
+        """
+        if not UpdateManager._interval_elapsed():
+            return None
+        stamp_path = os.path.join(cache_dir(), "update_attempt")
+        try:
+            if time.time() - os.path.getmtime(stamp_path) < UpdateManager.RETRY_INTERVAL.total_seconds():
+                return None
+        except OSError:
+            pass
+        try:
+            os.makedirs(os.path.dirname(stamp_path), exist_ok=True)
+            with open(stamp_path, 'w', encoding='utf-8') as f:
+                f.write(UpdateManager.get_current_timestamp())
+        except OSError:
+            pass
+
+        thread = threading.Thread(target=UpdateManager.check_for_updates, kwargs={"console": console, "reload": False},
+                                  name="apifinder-update", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def check_for_updates(force_update=False, console=None, reload=True):
         """
         检查并执行规则文件更新, 会合并用户自定义的列表规则。
         
         Args:
             force_update (bool): 是否强制更新
+            console (Console): 输出更新信息的Rich console，默认新建
+            reload (bool): 写入后是否立即重新加载规则；后台检查时为False，扫描中途不换规则
         """
-        local_rules = RULES
-        last_check_str = str(local_rules.get('last_check_timestamp', '20000101000000'))
-        last_check_time = datetime.strptime(last_check_str, '%Y%m%d%H%M%S')
-        update_interval = timedelta(days=DEFAULT_CONFIG['update_interval_days'])
-
-        if not force_update and (datetime.now() - last_check_time < update_interval):
+        if not force_update and not UpdateManager._interval_elapsed():
             return
 
+        import requests
+        import yaml
         from rich.console import Console
         from rich.panel import Panel
-        console = Console()
+        console = console or Console()
+        local_rules = dict(RULES)
         
         try:
             remote_url = DEFAULT_CONFIG['remote_rules_url']
@@ -260,10 +1025,9 @@ class UpdateManager:
                 # 更新最后检查时间戳
                 merged_rules['last_check_timestamp'] = UpdateManager.get_current_timestamp()
 
-                import os
-                rules_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rules.yaml')
-                with open(rules_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(merged_rules, f, allow_unicode=True, sort_keys=False)
+                _write_atomic(RULES_PATH, lambda f: yaml.dump(merged_rules, f, allow_unicode=True, sort_keys=False))
+                if reload:
+                    reload_rules()
                 
                 console.print("✅ [bold green]规则文件更新并合并成功。[/bold green]")
                 rules_updated = True
@@ -274,10 +1038,7 @@ class UpdateManager:
             # 如果规则没有更新，仅更新检查时间戳
             if not rules_updated:
                 local_rules['last_check_timestamp'] = UpdateManager.get_current_timestamp()
-                import os
-                rules_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'rules.yaml')
-                with open(rules_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(local_rules, f, allow_unicode=True, sort_keys=False)
+                _write_atomic(RULES_PATH, lambda f: yaml.dump(local_rules, f, allow_unicode=True, sort_keys=False))
 
         except requests.RequestException as e:
             console.print(f"❌ [bold red]检查更新失败:[/bold red] {e}")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+URL提取吞吐量基准 (URL extraction throughput benchmark)
+对比旧实现（每次调用 re.compile 并逐个扫描列表）与预编译规则集的每MB提取速度
+
+用法: python benchmarks/bench_extract.py [--size-mb 4] [--repeat 5]
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apifinder.config import DEFAULT_CONFIG
+from apifinder.utils import RULES, URLExtractor
+
+
+def legacy_extract_urls(js_content):
+    """旧版 URLExtractor.extract_urls，用于对比"""
+    filter_key = DEFAULT_CONFIG["filter_extensions"]
+    pattern_raw = RULES.get('url_extractor_pattern', '')
+    ignored_domains = RULES.get('ignored_domains', [])
+
+    pattern = re.compile(pattern_raw, re.VERBOSE)
+    urls = []
+    for match in re.finditer(pattern, str(js_content)):
+        url = match.group().strip('"').strip("'")
+        if any(sub in url for sub in filter_key):
+            continue
+        if any(domain in url for domain in ignored_domains):
+            continue
+        urls.append(url)
+    return urls
+
+
+def make_bundle(size_bytes, seed=0):
+    """生成指定大小的合成webpack脚本，包含接口路径、静态资源和第三方域名"""
+    rnd = random.Random(seed)
+    words = ["user", "order", "item", "auth", "login", "list", "detail", "config", "upload", "search"]
+    chunks = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        kind = i % 6
+        if kind == 0:
+            s = f'e.get("/api/v{rnd.randint(1, 3)}/{rnd.choice(words)}/{rnd.choice(words)}")'
+        elif kind == 1:
+            s = f'n.p+"static/img/{rnd.choice(words)}.{rnd.choice(["png", "svg", "webp"])}"'
+        elif kind == 2:
+            s = f'location.href="https://www.{rnd.choice(["google.com", "github.com", "example.com"])}/{rnd.choice(words)}"'
+        elif kind == 3:
+            s = f'require("./{rnd.choice(words)}.js")'
+        else:
+            s = "function(t,e,n){var r=n(%d),o=n.n(r);return o.a.create({timeout:%d})}" % (i, rnd.randint(1, 9999))
+        chunks.append(s)
+        total += len(s) + 1
+        i += 1
+    return ";".join(chunks)
+
+
+def bench(func, content, repeat):
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = len(func(content))
+        best = min(best, time.perf_counter() - start)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL extraction throughput benchmark")
+    parser.add_argument("--size-mb", type=float, default=4, help="synthetic bundle size in MB")
+    parser.add_argument("--scripts", type=int, default=200, help="number of small scripts for the per-call test")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size_mb = args.size_mb
+    bundle = make_bundle(int(size_mb * 1024 * 1024))
+    small = [make_bundle(4096, seed=i) for i in range(args.scripts)]
+    small_mb = sum(len(s) for s in small) / (1024 * 1024)
+
+    print(f"{'case':<28}{'impl':<10}{'seconds':>10}{'MB/s':>10}{'urls':>8}")
+    for name, content, mb in (
+        (f"one bundle ({size_mb:g} MB)", [bundle], size_mb),
+        (f"{args.scripts} x 4 KB scripts", small, small_mb),
+    ):
+        for impl, func in (("legacy", legacy_extract_urls), ("compiled", URLExtractor.extract_urls)):
+            elapsed, found = bench(lambda items: sum((func(c) for c in items), []), content, args.repeat)
+            print(f"{name:<28}{impl:<10}{elapsed:>10.3f}{mb / elapsed:>10.2f}{found:>8}")
+
+
+if __name__ == "__main__":
+    main()
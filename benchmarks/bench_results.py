@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结果记录内存基准 (Result record memory benchmark)
+对比旧的结果字典（完整来源URL + ISO时间字符串）与 ScanResult 的每条内存占用，
+两种实现都与扫描器一样保存该端点全部来源列表的副本
+
+用法: python benchmarks/bench_results.py [--results 200000] [--sources 50] [--refs 3]
+"""
+
+import os
+import sys
+import argparse
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apifinder.scan_result import ScanResult, ResultColumns, SourceTable
+
+
+def make_inputs(count, source_count, refs):
+    # 来源URL从响应中解析得到，每条结果各自持有一份字符串；
+    # 第 i 个端点被 1 + i % refs 个脚本引用，和 EndpointIndex.sources 一样每条结果拿到列表的新副本
+    sources = [f"https://cdn.example.com/static/js/chunk-vendors.{i:08x}.js" for i in range(source_count)]
+    return [
+        (f"https://example.com/api/v1/resource/{i}", sources[i % source_count],
+         tuple(sources[(i + j) % source_count] for j in range(1 + i % refs)))
+        for i in range(count)
+    ]
+
+
+def legacy_result(url, source, sources):
+    return {"url": url, "source": "".join(source), "sources": list(sources), "timestamp": datetime.now().isoformat()}
+
+
+def measure(factory, inputs):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [factory(url, source, list(sources)) for url, source, sources in inputs]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return results, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result record memory benchmark")
+    parser.add_argument("--results", type=int, default=200000)
+    parser.add_argument("--sources", type=int, default=50)
+    parser.add_argument("--refs", type=int, default=3, help="每个端点最多被多少个脚本引用")
+    args = parser.parse_args()
+
+    # URL字符串两种实现共用，不计入
+    inputs = make_inputs(args.results, args.sources, max(1, args.refs))
+
+    print(f"{'impl':<12}{'total MB':>10}{'bytes/result':>14}")
+    table = SourceTable()
+    for name, factory in (("dict", legacy_result),
+                          ("ScanResult", lambda url, source, sources: ScanResult(url, "".join(source), sources=sources, table=table))):
+        results, used = measure(factory, inputs)
+        print(f"{name:<12}{used / 1048576:>10.1f}{used / len(results):>14.0f}")
+        del results
+
+    results = [ScanResult(url, source, sources=list(sources), table=table) for url, source, sources in inputs]
+    tracemalloc.start()
+    columns = ResultColumns(results)
+    indices = columns.sorted_indices(columns.unique_indices())
+    used = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"columnar export of {len(indices)} results: peak {used / 1048576:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
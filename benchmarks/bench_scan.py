@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描基准 (Scan benchmark)
+启动本地模拟站点（见 mock_server.py），对 URLExtractor.extract_urls、URLExtractor.extract_urls_from_html
+和完整的 find_by_url 扫描分别测量吞吐量、延迟分位数和峰值内存。
+结果可以保存为JSON，之后用 --compare 与基线对比，超过阈值的退化以非零退出码报告。
+
+用法: python benchmarks/bench_scan.py [--repeat 5] [--engine thread] [--save base.json] [--compare base.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rich.console import Console
+from apifinder.scanner import Scanner, ScanConfig
+from apifinder.html_document import ParsedDocument
+from apifinder.utils import URLExtractor
+from apifinder.parallel_extract import ParallelExtractor
+from mock_server import MockServer, add_site_arguments, site_config_from_args
+
+# 指标方向：True 表示越大越好 (Metric direction, True means higher is better)
+METRICS = {
+    "throughput": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "peak_mb": False,
+}
+
+# 绝对变化小于这些值时不算退化，避免很小的数值被相对比例放大
+MIN_DELTA = {
+    "p50_ms": 1.0,
+    "p95_ms": 1.0,
+    "peak_mb": 0.5,
+}
+
+
+def percentile(samples, q):
+    """最近秩法分位数 (Nearest-rank percentile)"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def peak_memory(func):
+    """单独运行一次并用 tracemalloc 记录峰值内存（MB），计时运行不受追踪开销影响"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1048576
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(samples, units, unit_name, peak_mb, **extra):
+    total = sum(samples)
+    result = {
+        "runs": len(samples),
+        "throughput": units / total if total else 0.0,
+        "throughput_unit": unit_name,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "peak_mb": peak_mb,
+    }
+    result.update(extra)
+    return result
+
+
+def bench_extract_urls(site, repeat, extractor=None):
+    """每个脚本调用一次 extract_urls，吞吐量为 MB/s；传入 extractor 时大脚本由进程池并行提取"""
+    bundles = [bundle.decode() for bundle in site.bundles]
+    URLExtractor.extract_urls(bundles[0], extractor)  # 预热，同时启动进程池 (warm-up, also starts the pool)
+    samples = []
+    found = 0
+    for _ in range(repeat):
+        for content in bundles:
+            started = time.perf_counter()
+            found = len(URLExtractor.extract_urls(content, extractor))
+            samples.append(time.perf_counter() - started)
+    megabytes = sum(len(content) for content in bundles) * repeat / 1048576
+    peak = peak_memory(lambda: [URLExtractor.extract_urls(content, extractor) for content in bundles])
+    return summarize(samples, megabytes, "MB/s", peak, urls_per_call=found)
+
+
+def bench_extract_html(site, repeat, links, html_parser="bs4"):
+    """解析并提取一个包含大量链接、表单和脚本标签的页面，吞吐量为 pages/s"""
+    html = site.page("bench", [f"/static/js/c{i}.js" for i in range(links // 10)],
+                     [f"/section/{i}/index.html" for i in range(links)]).decode()
+    URLExtractor.extract_urls_from_html(ParsedDocument.parse(html, backend=html_parser))  # 预热 (warm-up)
+    samples = []
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = len(URLExtractor.extract_urls_from_html(ParsedDocument.parse(html, backend=html_parser)))
+        samples.append(time.perf_counter() - started)
+    peak = peak_memory(lambda: URLExtractor.extract_urls_from_html(ParsedDocument.parse(html, backend=html_parser)))
+    return summarize(samples, repeat, "pages/s", peak, page_kb=len(html) / 1024, urls_per_call=found)
+
+
+def bench_scan(server, repeat, config):
+    """完整扫描模拟站点，吞吐量为每秒完成的请求数"""
+    url = server.url + "/start"
+    # 所有重复共用一个扫描器和它的连接池，每次 scan 使用新的上下文，终端输出丢弃
+    scanner = Scanner(config, console=Console(file=io.StringIO()))
+
+    def run_once():
+        return scanner.scan(url)
+
+    samples = []
+    requests = bytes_sent = endpoints = 0
+    for _ in range(repeat):
+        server.site.reset_counters()
+        started = time.perf_counter()
+        report = run_once()
+        samples.append(time.perf_counter() - started)
+        requests += server.site.requests
+        bytes_sent = server.site.bytes_sent
+        endpoints = report.stats["api_endpoints"]
+    peak = peak_memory(run_once)
+    scanner.close()
+    return summarize(samples, requests, "req/s", peak, requests_per_scan=requests // repeat,
+                     endpoints=endpoints, mb_served=bytes_sent / 1048576)
+
+
+def print_report(results):
+    print(f"{'case':<24}{'throughput':>18}{'p50 ms':>10}{'p95 ms':>10}{'peak MB':>10}  details")
+    for name, result in results["cases"].items():
+        details = ", ".join(f"{key}={value:.1f}" if isinstance(value, float) else f"{key}={value}"
+                            for key, value in result.items()
+                            if key not in METRICS and key not in ("runs", "throughput_unit"))
+        throughput = f"{result['throughput']:.1f} {result['throughput_unit']}"
+        print(f"{name:<24}{throughput:>18}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['peak_mb']:>10.1f}  {details}")
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线对比，返回退化列表
+
+    Returns:
+        list: (case, metric, baseline, current, change) 元组
+    """
+    regressions = []
+    print(f"\n{'case':<24}{'metric':<12}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, result in results["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold and abs(new - old) >= MIN_DELTA.get(metric, 0) else ""
+            print(f"{name:<24}{metric:<12}{old:>12.2f}{new:>12.2f}{change:>+10.1%}{flag}")
+            if flag:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan benchmark against a local mock site")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--engine", choices=["thread", "async"], default="thread")
+    parser.add_argument("--threads", type=int, default=10, help="probe threads (-T) / async concurrency")
+    parser.add_argument("--depth", type=int, default=1, help="deep scan depth (-D)")
+    parser.add_argument("--extract-workers", type=int, default=1,
+                        help="process-pool workers for extract_urls and the scan (default 1: inline)")
+    parser.add_argument("--extract-min-size", type=int, default=256, help="minimum bundle size in KB for parallel extraction")
+    parser.add_argument("--html-links", type=int, default=2000, help="links in the extract_urls_from_html page")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON written by --save")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown before flagging (default 0.2)")
+    add_site_arguments(parser)
+    args = parser.parse_args()
+
+    config = site_config_from_args(args)
+    with MockServer(config) as server:
+        # 不缓存、不限速，每次重复都真正请求模拟站点
+        scan_config = ScanConfig(silent=True, engine=args.engine, threads=args.threads, concurrency=args.threads,
+                                 depth=args.depth, delay=0, cache_size=0, extract_workers=args.extract_workers,
+                                 extract_min_size=args.extract_min_size)
+        extractor = ParallelExtractor(args.extract_workers, args.extract_min_size * 1024)
+        results = {
+            "site": config.to_dict(),
+            "engine": args.engine,
+            "extract_workers": args.extract_workers,
+            "cases": {
+                "extract_urls": bench_extract_urls(server.site, args.repeat, extractor),
+                "extract_urls_from_html": bench_extract_html(server.site, args.repeat, args.html_links),
+                ("find_by_url" if args.engine == "thread" else "async_scan"): bench_scan(server, args.repeat, scan_config),
+            }
+        }
+        extractor.close()
+
+    print_report(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nsaved to {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("site") != results["site"]:
+            print("\nwarning: baseline was recorded with different site parameters")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试用的本地模拟目标站点 (Local mock target for benchmarks)
+生成合成的SPA页面和webpack脚本，脚本大小和端点密度可配置，
+端点中按比例混入重定向、慢响应和失败响应；所有内容由种子决定，每次运行完全相同
+
+用法: python benchmarks/mock_server.py [--port 8000] [--bundles 4] [--bundle-kb 64] [--density 1]
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ["user", "order", "item", "auth", "login", "list", "detail", "config", "upload", "search"]
+
+
+class SiteConfig:
+    """
+    模拟站点参数
+
+    Attributes:
+        bundles (int): 首页引用的webpack脚本数
+        bundle_kb (int): 每个脚本的大小（KB）
+        density (float): 每KB脚本中的接口路径数
+        pages (int): 首页链接的子页面数，用于深度扫描
+        slow_every (int): 每隔多少个端点有一个慢响应，0表示没有
+        slow_ms (int): 慢响应的延迟（毫秒）
+        fail_every (int): 每隔多少个端点有一个500响应，0表示没有
+        redirect_every (int): 每隔多少个端点有一个302重定向，0表示没有
+        seed (int): 随机种子
+    """
+
+    def __init__(self, bundles=4, bundle_kb=64, density=1.0, pages=3, slow_every=10, slow_ms=100,
+                 fail_every=7, redirect_every=5, seed=0):
+        self.bundles = bundles
+        self.bundle_kb = bundle_kb
+        self.density = density
+        self.pages = pages
+        self.slow_every = slow_every
+        self.slow_ms = slow_ms
+        self.fail_every = fail_every
+        self.redirect_every = redirect_every
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def make_bundle(size_bytes, density, seed):
+    """
+    生成合成webpack脚本：接口路径按 density 混在模块代码、静态资源和第三方域名之间
+
+    Returns:
+        str: 脚本内容
+    """
+    rnd = random.Random(seed)
+    # 每个接口路径之间的填充字节数
+    gap = max(1, int(1024 / density)) if density > 0 else size_bytes
+    chunks = []
+    total = 0
+    next_endpoint = 0
+    i = 0
+    while total < size_bytes:
+        if total >= next_endpoint:
+            s = f'e.get("/api/v{rnd.randint(1, 3)}/{rnd.choice(WORDS)}/{rnd.randint(0, 499)}")'
+            next_endpoint = total + gap
+        elif i % 3 == 0:
+            s = f'n.p+"static/img/{rnd.choice(WORDS)}.{rnd.choice(["png", "svg", "webp"])}"'
+        elif i % 3 == 1:
+            s = f'location.href="https://www.{rnd.choice(["google.com", "github.com"])}/{rnd.choice(WORDS)}"'
+        else:
+            s = "function(t,e,n){var r=n(%d),o=n.n(r);return o.a.create({timeout:%d})}" % (i, rnd.randint(1, 9999))
+        chunks.append(s)
+        total += len(s) + 1
+        i += 1
+    return ";".join(chunks)
+
+
+class MockSite:
+    """
+    模拟站点内容，首页 / 和 /start（302到 /）、子页面 /page/N.html、脚本 /static/js/chunk.N.js 和 /api/ 下的端点
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.bundles = [
+            make_bundle(config.bundle_kb * 1024, config.density, config.seed * 1000 + i).encode()
+            for i in range(config.bundles)
+        ]
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def page(self, title, scripts, links):
+        tags = "".join(f'<script src="{src}"></script>' for src in scripts)
+        anchors = "".join(f'<a href="{href}">{href}</a>' for href in links)
+        return (f"<html><head><title>{title}</title>{tags}</head><body>{anchors}"
+                f"<form action=\"/api/form/submit\"></form><div data-url=\"/api/data.json\"></div>"
+                f"<script>fetch(\"/api/inline/{title}\")</script></body></html>").encode()
+
+    def index(self):
+        scripts = [f"/static/js/chunk.{i}.js" for i in range(self.config.bundles)]
+        links = [f"/page/{i}.html" for i in range(self.config.pages)]
+        return self.page("index", scripts, links)
+
+    def sub_page(self, n):
+        # 子页面复用第一个脚本，并引用一个自己的小脚本
+        return self.page(f"page{n}", ["/static/js/chunk.0.js", f"/static/js/page.{n}.js"], ["/"])
+
+    def endpoint_kind(self, path):
+        """按路径哈希稳定地决定端点表现：redirect / slow / fail / ok"""
+        key = sum(path.encode()) + len(path)
+        c = self.config
+        if c.redirect_every and key % c.redirect_every == 0 and not path.startswith("/api/final/"):
+            return "redirect"
+        if c.slow_every and key % c.slow_every == 1:
+            return "slow"
+        if c.fail_every and key % c.fail_every == 2:
+            return "fail"
+        return "ok"
+
+    def count(self, nbytes):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += nbytes
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    site = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+        self.site.count(len(body))
+
+    def do_GET(self):
+        site = self.site
+        path = self.path.split("?")[0]
+        if path == "/start":
+            return self._send(302, headers={"Location": "/"})
+        if path in ("/", "/index.html"):
+            return self._send(200, site.index())
+        if path.startswith("/page/") and path.endswith(".html"):
+            return self._send(200, site.sub_page(path[len("/page/"):-len(".html")]))
+        if path.startswith("/static/js/chunk."):
+            try:
+                body = site.bundles[int(path.split(".")[1])]
+            except (ValueError, IndexError):
+                return self._send(404, b"not found")
+            return self._send(200, body, "application/javascript")
+        if path.startswith("/static/js/page."):
+            return self._send(200, f'var p="/api/page/{path.split(".")[1]}";'.encode(), "application/javascript")
+        if path.startswith("/api/"):
+            kind = site.endpoint_kind(path)
+            if kind == "redirect":
+                return self._send(302, headers={"Location": "/api/final" + path[len("/api"):]})
+            if kind == "slow":
+                time.sleep(site.config.slow_ms / 1000)
+            if kind == "fail":
+                return self._send(500, b'{"error": "internal"}', "application/json")
+            return self._send(200, json.dumps({"path": path, "method": self.command}).encode(), "application/json")
+        return self._send(404, b"not found")
+
+    do_POST = do_GET
+    do_HEAD = do_GET
+
+    def do_OPTIONS(self):
+        self._send(204, headers={"Allow": "GET, POST, HEAD, OPTIONS"})
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """扫描器截断响应体或关闭空闲连接时对端会重置连接，这类错误不打印堆栈"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockServer:
+    """
+    在后台线程运行的模拟站点
+
+    Usage:
+        with MockServer(SiteConfig(bundles=2)) as server:
+            scan(server.url + "/start")
+    """
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.site = MockSite(config or SiteConfig())
+        handler = type("BoundMockHandler", (MockHandler,), {"site": self.site})
+        self.httpd = QuietHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_site_arguments(parser):
+    """模拟站点的命令行参数，独立运行和基准测试共用"""
+    defaults = SiteConfig()
+    parser.add_argument("--bundles", type=int, default=defaults.bundles, help="webpack bundles on the index page")
+    parser.add_argument("--bundle-kb", type=int, default=defaults.bundle_kb, help="size of each bundle in KB")
+    parser.add_argument("--density", type=float, default=defaults.density, help="API paths per KB of bundle")
+    parser.add_argument("--pages", type=int, default=defaults.pages, help="sub pages linked from the index")
+    parser.add_argument("--slow-every", type=int, default=defaults.slow_every, help="one slow endpoint every N, 0 disables")
+    parser.add_argument("--slow-ms", type=int, default=defaults.slow_ms, help="delay of slow endpoints in ms")
+    parser.add_argument("--fail-every", type=int, default=defaults.fail_every, help="one 500 endpoint every N, 0 disables")
+    parser.add_argument("--redirect-every", type=int, default=defaults.redirect_every, help="one 302 endpoint every N, 0 disables")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def site_config_from_args(args):
+    return SiteConfig(args.bundles, args.bundle_kb, args.density, args.pages, args.slow_every, args.slow_ms,
+                      args.fail_every, args.redirect_every, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock target site for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_site_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer(site_config_from_args(args), args.host, args.port)
+    print(f"Serving mock site on {server.url} (scan {server.url}/start)", file=sys.stderr)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+测试共用的夹具 (Shared fixtures)
+端到端测试使用 benchmarks/mock_server.py 中的模拟站点
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_server import MockServer, SiteConfig  # noqa: E402
+
+
+@pytest.fixture
+def mock_site():
+    """小型模拟站点：一个脚本、两个子页面，没有慢响应"""
+    with MockServer(SiteConfig(bundles=1, bundle_kb=4, pages=2, slow_every=0)) as server:
+        yield server
+
+
+@pytest.fixture
+def make_scanner():
+    """创建不输出到终端的 Scanner，测试结束时关闭"""
+    from rich.console import Console
+    from apifinder.scanner import Scanner, ScanConfig
+
+    scanners = []
+
+    def factory(**options):
+        options.setdefault("delay", 0)
+        options.setdefault("depth", 0)
+        scanner = Scanner(ScanConfig(**options), console=Console(quiet=True))
+        scanners.append(scanner)
+        return scanner
+
+    yield factory
+    for scanner in scanners:
+        scanner.close()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""异步引擎的测试"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from apifinder.async_engine import AsyncScanEngine  # noqa: E402
+from apifinder.utils import RequestBudget  # noqa: E402
+
+
+def make_engine(request_slot=None):
+    return AsyncScanEngine(None, None, dict, dict, request_slot=request_slot)
+
+
+def peak_in_flight(engines, requests=20):
+    in_flight = [0]
+    peak = [0]
+
+    async def request(engine):
+        async with engine.slot():
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            in_flight[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(request(engines[i % len(engines)]) for i in range(requests)))
+
+    asyncio.run(main())
+    return peak[0]
+
+
+def test_slot_enforces_request_budget():
+    budget = RequestBudget(total=4)
+    slots = [budget.slot(), budget.slot()]
+    engines = [make_engine(slot) for slot in slots]
+    assert peak_in_flight(engines) == 4
+    assert peak_in_flight(engines[:1]) == 2
+
+    # 另一个目标结束后，剩下的目标可以用满整个预算
+    slots[1].close()
+    assert peak_in_flight(engines[:1]) == 4
+
+
+def test_slot_without_budget_is_unbounded():
+    engine = make_engine()
+
+    async def main():
+        async with engine.slot():
+            return True
+
+    assert asyncio.run(main())
+
+
+def test_async_engine_matches_thread_engine(mock_site, make_scanner):
+    reports = {}
+    for engine in ("thread", "async"):
+        scanner = make_scanner(engine=engine, depth=1)
+        reports[engine] = scanner.scan(mock_site.url + "/")
+
+    thread, async_ = reports["thread"], reports["async"]
+    assert thread.endpoints
+    assert sorted(async_.endpoints) == sorted(thread.endpoints)
+    for key in ("total_urls", "api_endpoints", "successful_requests", "failed_requests", "json_responses"):
+        assert async_.stats[key] == thread.stats[key], key
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""扫描检查点的测试"""
+
+import json
+
+from apifinder.checkpoint import Checkpoint
+
+
+def write_journal(path, records, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+
+def test_truncated_last_line_is_skipped_and_new_records_start_on_a_new_line(tmp_path):
+    path = tmp_path / "scan.ckpt"
+    write_journal(path, [
+        {"type": "probe", "target": "t", "url": "http://t/api/a", "source": "s.js", "ok": True, "ts": 1},
+        {"type": "page", "target": "t", "url": "http://t/", "urls": {"s.js": ["/api/a"]}},
+    ], tail='{"type": "probe", "target": "t", "url": "http://t/api/b", "so')
+
+    checkpoint = Checkpoint(str(path), resume=True)
+    assert checkpoint.is_probed("t", "http://t/api/a")
+    assert not checkpoint.is_probed("t", "http://t/api/b")
+    assert checkpoint.get_page("t", "http://t/") == {"s.js": ["/api/a"]}
+    checkpoint.record_target("t")
+    checkpoint.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1]) == {"type": "target", "target": "t"}
+    assert Checkpoint(str(path), resume=True).is_target_done("t")
+
+
+def test_restored_results_only_include_successful_probes(tmp_path):
+    path = tmp_path / "scan.ckpt"
+    write_journal(path, [
+        {"type": "probe", "target": "t", "url": "http://t/api/a", "source": "s.js", "ok": True, "ts": 1},
+        {"type": "probe", "target": "t", "url": "http://t/api/b", "source": "s.js", "ok": False, "ts": 1},
+        {"type": "probe", "target": "other", "url": "http://o/api/c", "source": "s.js", "ok": True, "ts": 1},
+    ])
+
+    results = Checkpoint(str(path), resume=True).restored_results("t")
+
+    assert [(r["url"], r["source"]) for r in results] == [("http://t/api/a", "s.js")]
+
+
+def test_without_resume_the_journal_is_rewritten(tmp_path):
+    path = tmp_path / "scan.ckpt"
+    write_journal(path, [{"type": "target", "target": "t"}])
+
+    checkpoint = Checkpoint(str(path))
+    checkpoint.close()
+
+    assert not checkpoint.is_target_done("t")
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def test_resumed_scan_skips_finished_target(mock_site, make_scanner, tmp_path):
+    path = str(tmp_path / "scan.ckpt")
+    scanner = make_scanner(checkpoint=path)
+    first = scanner.scan(mock_site.url + "/")
+    scanner.close()
+    requests_before = mock_site.site.requests
+
+    resumed = make_scanner(checkpoint=path, resume=True).scan(mock_site.url + "/")
+
+    assert first.endpoints
+    assert mock_site.site.requests == requests_before
+    assert sorted(resumed.endpoints) == sorted(first.endpoints)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""懒加载分块解析的测试"""
+
+from apifinder.chunk_resolver import ChunkExpression, find_chunk_urls
+
+
+def test_webpack5_runtime_with_public_path():
+    runtime = ('!function(){var r={};r.u=function(e){return"static/js/"+e+"."+{12:"a1b2",345:"c3d4"}[e]+".chunk.js"},'
+               'r.miniCssF=e=>"static/css/"+e+".css",r.p="/"}();')
+
+    assert find_chunk_urls({"https://t/static/js/runtime.js": runtime}) == [
+        "https://t/static/js/12.a1b2.chunk.js",
+        "https://t/static/js/345.c3d4.chunk.js",
+    ]
+
+
+def test_minified_arrow_runtime_with_fallback_and_auto_public_path():
+    runtime = 'n.u=e=>(({7:"about"})[e]||e)+"."+{7:"aa11",9:"bb22"}[e]+".js";'
+
+    assert find_chunk_urls({"https://t/app/js/runtime.js": runtime}) == [
+        "https://t/app/js/about.aa11.js",
+        "https://t/app/js/9.bb22.js",
+    ]
+
+
+def test_webpack4_jsonp_script_src_uses_loaded_chunk_ids():
+    runtime = 'function a(e){return c.p+"js/"+({}[e]||e)+".js"}c.p="/static/";'
+    main = 'c.e(3).then(c.bind(null,17));c.e("user").then(x)'
+
+    assert find_chunk_urls({"https://t/static/js/runtime.js": runtime, "https://t/static/js/main.js": main}) == [
+        "https://t/static/js/3.js",
+        "https://t/static/js/user.js",
+    ]
+
+
+def test_vite_imports_resolve_relative_to_the_importing_module():
+    entry = 'const r=[{path:"/about",component:()=>import("./About-4f2a.js")}];import{a}from"../shared/util-1.js";'
+
+    assert find_chunk_urls({"https://t/assets/index-1.js": entry}) == [
+        "https://t/assets/About-4f2a.js",
+        "https://t/shared/util-1.js",
+    ]
+
+
+def test_known_scripts_are_skipped_and_limit_applies():
+    entry = "".join(f'import("./c{i}.js");' for i in range(10))
+    scripts = {"https://t/a/index.js": entry, "https://t/a/c0.js": ""}
+
+    assert find_chunk_urls(scripts, limit=3) == ["https://t/a/c1.js", "https://t/a/c2.js", "https://t/a/c3.js"]
+
+
+def test_unrecognised_expressions_are_ignored():
+    assert ChunkExpression.parse('"js/"+getName(e)+".js"', "e") is None
+    assert find_chunk_urls({"https://t/r.js": 'r.u=e=>"js/"+getName(e)+".js";'}) == []
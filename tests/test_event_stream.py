@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""JSONL事件流的测试"""
+
+import io
+import json
+
+from apifinder.event_stream import EventStream
+
+
+class BrokenPipe(io.BytesIO):
+    def write(self, data):
+        raise BrokenPipeError
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().decode("utf-8").splitlines()]
+
+
+def test_events_are_buffered_until_flush_and_omit_none_fields():
+    out = io.BytesIO()
+    events = EventStream(out, flush_interval=0)
+    events.emit("probe", url="http://t/api/é", status=200, error=None)
+    assert out.getvalue() == b""
+
+    events.close()
+    [record] = lines(out)
+    assert record["event"] == "probe"
+    assert record["url"] == "http://t/api/é"
+    assert "error" not in record
+    assert events.events == 1
+
+
+def test_buffer_is_written_when_full():
+    out = io.BytesIO()
+    events = EventStream(out, buffer_size=100, flush_interval=0)
+    events.emit("endpoint", url="http://t/api/1")
+    assert out.getvalue() == b""
+    events.emit("endpoint", url="http://t/api/2")
+    assert len(lines(out)) == 2
+
+
+def test_target_view_adds_target_field():
+    out = io.BytesIO()
+    events = EventStream(out, flush_interval=0)
+    events.for_target("http://a/").emit("page", url="http://a/x")
+    events.for_target("http://b/").for_target("http://c/").emit("target")
+    events.close()
+
+    assert [(record["event"], record["target"]) for record in lines(out)] == [("page", "http://a/"), ("target", "http://c/")]
+
+
+def test_broken_pipe_closes_the_stream_quietly():
+    events = EventStream(BrokenPipe(), buffer_size=1, flush_interval=0)
+    events.emit("result", url="http://t/a")
+    events.emit("result", url="http://t/b")
+    events.close()
+
+    assert events.closed
+    assert events.events == 1
+
+
+def test_background_flusher_writes_pending_events():
+    out = io.BytesIO()
+    events = EventStream(out, flush_interval=0.01)
+    events.emit("stats", requests=3)
+    events._stop.wait(0.2)
+
+    assert lines(out)[0]["requests"] == 3
+    events.close()
+
+
+def test_scan_emits_the_documented_event_types(mock_site):
+    from rich.console import Console
+    from apifinder.Output_Manager import OutputManager
+    from apifinder.scanner import Scanner, ScanConfig
+
+    out = io.BytesIO()
+    output = OutputManager(True, console=Console(quiet=True), events=EventStream(out, flush_interval=0))
+    with Scanner(ScanConfig(jsonl=True, delay=0, depth=0), output=output) as scanner:
+        report = scanner.scan(mock_site.url + "/")
+
+    records = lines(out)
+    kinds = {record["event"] for record in records}
+    assert {"target", "page", "script", "endpoint", "probe", "result", "stats"} <= kinds
+    assert all(record["target"] == mock_site.url + "/" for record in records if record["event"] != "stats")
+    assert sorted(r["url"] for r in records if r["event"] == "result") == sorted(report.endpoints)
+    assert records[-1]["event"] == "stats"
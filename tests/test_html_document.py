@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""HTML解析后端的测试"""
+
+import pytest
+
+import apifinder.html_document as html_document
+from apifinder.html_document import ParsedDocument, extract_title
+
+PAGE = """<!DOCTYPE html>
+<html><head>
+<title>Admin &amp; API</title>
+<link rel="preload" href="/static/app.css">
+<meta name="config" content="/api/config">
+<script src="/static/js/app.js"></script>
+<script>fetch("/api/inline?a=1&amp;b=2")</script>
+<script type="module" src="/static/js/module.js" />
+</head><body>
+<a href="/page/1.html">one</a>
+<img src="/img/logo.png" data-src="/img/lazy.png">
+<form action="/api/form/submit"><input data-endpoint="/api/form/check" data-count="3"></form>
+<div data-url="/api/data.json"><iframe src="/embed"></iframe></div>
+<script>var t = "<title>not a title</title>";</script>
+</body></html>"""
+
+
+def parse_both(html):
+    pytest.importorskip("bs4")
+    return ParsedDocument.parse(html, backend="bs4"), ParsedDocument.parse(html, backend="stream")
+
+
+def test_backends_agree_on_scripts_attributes_and_title():
+    bs4_doc, stream_doc = parse_both(PAGE)
+
+    for name in ParsedDocument.__slots__:
+        assert getattr(stream_doc, name) == getattr(bs4_doc, name), name
+
+    assert stream_doc.title == "Admin & API"
+    assert stream_doc.scripts[0] == ("/static/js/app.js", "")
+    # 脚本内容是原始文本，不解码字符引用
+    assert stream_doc.scripts[1] == (None, 'fetch("/api/inline?a=1&amp;b=2")')
+    assert "/static/js/module.js" in [src for src, _ in stream_doc.scripts]
+    assert stream_doc.url_attributes == ["/static/app.css", "/api/config", "/static/js/app.js", "/static/js/module.js",
+                                         "/page/1.html", "/img/logo.png", "/api/form/submit", "/embed"]
+    assert stream_doc.data_attributes == ["/img/lazy.png", "/api/form/check", "3", "/api/data.json"]
+
+
+def test_backends_agree_without_title_or_scripts():
+    bs4_doc, stream_doc = parse_both("<p><a href='/x'>x</a></p>")
+    for name in ParsedDocument.__slots__:
+        assert getattr(stream_doc, name) == getattr(bs4_doc, name), name
+    assert stream_doc.title is None
+    assert stream_doc.scripts == []
+
+
+def test_extract_title_stops_at_closing_title(monkeypatch):
+    seen = []
+    start = html_document._StreamingParser.handle_starttag
+
+    def handle_starttag(self, tag, attrs):
+        seen.append(tag)
+        return start(self, tag, attrs)
+
+    monkeypatch.setattr(html_document._StreamingParser, "handle_starttag", handle_starttag)
+
+    assert extract_title("<html><head><title> Hello </title></head><body><div><p>x</p></div></body></html>") == " Hello "
+    assert seen == ["html", "head", "title"]
+
+
+def test_extract_title_without_title():
+    assert extract_title("<html><body><p>no title</p></body></html>") is None
+    assert extract_title("") is None
+    assert extract_title('{"title": "json"}') is None
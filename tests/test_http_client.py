@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""共享HTTP客户端的测试"""
+
+from apifinder.http_client import HttpClient
+
+
+def test_connections_are_reused(mock_site):
+    client = HttpClient(pool_size=2)
+    try:
+        for _ in range(5):
+            response = client.get(mock_site.url + "/", timeout=5)
+            response.content
+        stats = client.get_stats()
+    finally:
+        client.close()
+
+    assert stats["pool_requests"] == 5
+    assert stats["pool_misses"] == 1
+    assert stats["pool_hits"] == 4
+
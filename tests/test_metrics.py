@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""分片计数器的测试"""
+
+import threading
+
+import pytest
+from rich.console import Console
+
+import apifinder.metrics as metrics
+from apifinder.metrics import Metrics, status_class
+from apifinder.Output_Manager import OutputManager
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_shards_from_many_threads_are_summed():
+    counter = Metrics()
+
+    def work():
+        for _ in range(1000):
+            counter.incr("requests")
+        counter.incr("bytes", 10)
+
+    run_threads(work, 8)
+    counter.incr("requests")
+
+    assert counter.snapshot() == {"requests": 8001, "bytes": 80}
+    assert counter.value("requests") == 8001
+    assert counter.value("missing") == 0
+
+
+def test_shards_of_finished_threads_are_compacted(monkeypatch):
+    monkeypatch.setattr(metrics, "COMPACT_THRESHOLD", 4)
+    counter = Metrics()
+
+    for _ in range(10):
+        run_threads(lambda: counter.incr("probes"), 1)
+
+    assert len(counter._shards) <= 4
+    assert counter.value("probes") == 10
+
+
+def test_snapshot_is_a_copy():
+    counter = Metrics()
+    counter.incr("requests")
+    counter.snapshot()["requests"] = 100
+    assert counter.value("requests") == 1
+
+
+def test_status_class():
+    assert status_class(200) == "2xx"
+    assert status_class(404) == "4xx"
+    assert status_class(599) == "5xx"
+    assert status_class(600) == "other"
+    assert status_class(None) == "other"
+
+
+def test_record_response_and_error():
+    counter = Metrics()
+    counter.record_response(200, 512)
+    counter.record_response(404)
+    counter.record_error("timeout")
+
+    assert counter.snapshot() == {
+        "requests": 3,
+        "bytes": 512,
+        "status_2xx": 1,
+        "status_4xx": 1,
+        "errors_timeout": 1,
+    }
+
+
+def test_output_manager_stats_snapshot_and_merge():
+    total = OutputManager(True, console=Console(quiet=True))
+    target = OutputManager(True, console=Console(quiet=True))
+
+    target.count("api_found", 2)
+    target.set_stats({"pool_misses": 1})
+    snapshot = target.stats
+    snapshot["api_found"] = 100
+    assert target.stats["api_found"] == 2
+    assert target.stats["pool_misses"] == 1
+
+    total.count("api_found")
+    total.merge_from(target)
+    assert total.stats["api_found"] == 3
+    assert "pool_misses" not in total.stats
+
+
+@pytest.mark.parametrize("engine", ["thread", "async"])
+def test_page_and_script_fetches_are_counted(make_scanner, engine):
+    if engine == "async":
+        pytest.importorskip("aiohttp")
+    from mock_server import MockServer, SiteConfig
+
+    # 没有重定向，服务端收到的每个请求对应扫描器的一次请求
+    config = SiteConfig(bundles=2, bundle_kb=4, pages=0, slow_every=0, redirect_every=0)
+    with MockServer(config) as server:
+        report = make_scanner(engine=engine, methods="GET").scan(server.url + "/")
+        sent = server.site.requests
+        fetched = len(server.site.index()) + sum(len(bundle) for bundle in server.site.bundles)
+
+    stats = report.stats
+    probes = stats["successful_requests"] + stats["failed_requests"]
+    # 首页和两个脚本之外还有探测请求
+    assert stats["requests"] == sent
+    assert stats["requests"] >= probes + 3
+    # 失败探测的响应体不读取，不计入字节数
+    assert stats["bytes"] >= fetched
+    assert stats["status_2xx"] >= 3
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""多进程正则提取的测试"""
+
+import apifinder.parallel_extract as parallel_extract
+from apifinder.parallel_extract import ParallelExtractor, _find_matches, split_on_literals
+from apifinder.utils import COMPILED_RULES
+
+from mock_server import make_bundle
+
+
+def test_chunked_matches_equal_whole_text_matches():
+    pattern = COMPILED_RULES.url_pattern
+    text = make_bundle(256 * 1024, density=4, seed=3)
+    spans = split_on_literals(text, pattern, 16 * 1024)
+
+    assert len(spans) > 4
+    assert spans[0][0] == 0 and spans[-1][1] == len(text)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(spans, spans[1:]))
+    chunked = [match for start, end in spans for match in _find_matches(pattern.pattern, pattern.flags, text[start:end])]
+    assert chunked == _find_matches(pattern.pattern, pattern.flags, text)
+
+
+def test_process_pool_results_match_single_thread(monkeypatch):
+    monkeypatch.setattr(parallel_extract, "MIN_CHUNK_SIZE", 16 * 1024)
+    pattern = COMPILED_RULES.url_pattern
+    text = make_bundle(128 * 1024, density=4, seed=5)
+    extractor = ParallelExtractor(workers=2, min_size=64 * 1024)
+    try:
+        assert extractor.should_split(text)
+        matches = extractor.find_matches(pattern, text)
+    finally:
+        extractor.close()
+
+    assert matches == _find_matches(pattern.pattern, pattern.flags, text)
+    assert extractor.parallel_runs == 1
+
+
+def test_small_scripts_stay_on_the_calling_thread():
+    assert not ParallelExtractor(workers=4, min_size=1024).should_split("x" * 100)
+    assert not ParallelExtractor(workers=1, min_size=0).should_split("x" * 100)
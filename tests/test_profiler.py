@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""性能分析器的测试"""
+
+import json
+
+from rich.console import Console
+
+import apifinder.profiler as profiler
+from apifinder.profiler import LATENCY_BUCKETS, LatencyHistogram, Profiler
+
+
+def test_stages_accumulate():
+    prof = Profiler(enabled=True)
+    prof.add_stage("fetch", 0.5)
+    prof.add_stage("fetch", 1.5)
+    with prof.stage("parse"):
+        pass
+
+    stages = prof.to_dict()["stages"]
+    assert stages["fetch"] == {"count": 2, "total": 2.0, "avg": 1.0, "max": 1.5}
+    assert stages["parse"]["count"] == 1
+
+
+def test_regex_timing_counts_as_extract_stage():
+    prof = Profiler(enabled=True)
+    with prof.regex("app.js", 2048):
+        pass
+
+    data = prof.to_dict()
+    assert data["stages"]["extract"]["count"] == 1
+    assert data["regex"][0]["source"] == "app.js"
+    assert data["regex"][0]["bytes"] == 2048
+
+
+def test_histogram_bucket_placement():
+    histogram = LatencyHistogram()
+    histogram.add(0.01)      # 恰好等于上界时落在该桶
+    histogram.add(0.0100001)
+    histogram.add(LATENCY_BUCKETS[-1] + 5)
+
+    assert histogram.buckets[0] == 1
+    assert histogram.buckets[1] == 1
+    assert histogram.buckets[-1] == 1
+    assert sum(histogram.buckets) == 3
+    assert histogram.to_dict()["buckets"][f">{LATENCY_BUCKETS[-1]}"] == 1
+
+
+def test_percentile_boundaries():
+    assert LatencyHistogram().percentile(0.5) == 0.0
+
+    histogram = LatencyHistogram()
+    for _ in range(9):
+        histogram.add(0.005)
+    histogram.add(3.0)
+    assert histogram.percentile(0.5) == 0.01
+    assert histogram.percentile(0.9) == 0.01
+    assert histogram.percentile(0.95) == 5.0
+    assert histogram.percentile(1.0) == 5.0
+
+    # 落在溢出桶时返回实际最大值
+    histogram.add(42.0)
+    assert histogram.percentile(1.0) == 42.0
+
+
+def test_disabled_profiler_records_nothing():
+    prof = Profiler()
+    assert prof.stage("fetch") is profiler._NULL_CONTEXT
+    assert prof.regex("app.js", 10) is profiler._NULL_CONTEXT
+    prof.add_stage("fetch", 1.0)
+    prof.record_request("h", 200, 0.1)
+    prof.record_bytes("h", 100)
+
+    data = prof.to_dict()
+    assert data["stages"] == {} and data["latency"] == [] and data["bytes"] == {}
+
+
+def test_report_writes_profile_json(tmp_path):
+    path = tmp_path / "profile.json"
+    prof = Profiler(enabled=True, json_path=str(path))
+    prof.add_stage("fetch", 0.2)
+    prof.record_request("b.example", 200, 0.02)
+    prof.record_request("a.example", "error", 0.3)
+    prof.record_bytes("a.example", 1024)
+    with prof.regex("app.js", 10):
+        pass
+
+    prof.report(Console(quiet=True))
+    data = json.loads(path.read_text(encoding="utf-8"))
+
+    assert set(data) == {"wall_time", "stages", "latency", "bytes", "regex"}
+    assert set(data["stages"]) == {"fetch", "extract"}
+    assert [(row["host"], row["status"]) for row in data["latency"]] == [("a.example", "error"), ("b.example", "200")]
+    assert {"count", "total", "avg", "max", "p50", "p95", "buckets"} <= set(data["latency"][0])
+    assert data["bytes"] == {"a.example": 1024}
+    assert data["regex"][0]["source"] == "app.js"
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""按主机自适应限速器的测试"""
+
+import pytest
+
+import apifinder.utils as utils
+from apifinder.utils import AdaptiveRateLimiter, parse_retry_after
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_tokens_are_spaced_by_rate(clock):
+    limiter = AdaptiveRateLimiter(max_rate=10, burst=1)
+    assert limiter.reserve("a") == 0
+    assert limiter.reserve("a") == pytest.approx(0.1)
+    assert limiter.reserve("a") == pytest.approx(0.2)
+    # 其他主机有自己的令牌桶
+    assert limiter.reserve("b") == 0
+
+
+def test_throttle_halves_rate_once_per_second_and_honours_retry_after(clock):
+    limiter = AdaptiveRateLimiter(max_rate=10)
+    limiter.observe("a", 429, 0.1, retry_after="3")
+    limiter.observe("a", 429, 0.1)
+    assert limiter.rate_for("a") == 5
+    assert limiter.throttle_events == 2
+    assert limiter.reserve("a") == pytest.approx(3)
+
+    clock[0] += 1.5
+    limiter.observe("a", 503, 0.1)
+    assert limiter.rate_for("a") == 2.5
+
+
+def test_rate_recovers_after_normal_responses(clock):
+    limiter = AdaptiveRateLimiter(max_rate=10)
+    limiter.observe("a", None)
+    assert limiter.rate_for("a") == 8
+    for _ in range(10):
+        limiter.observe("a", 200, 0.05)
+    assert limiter.rate_for("a") == 10
+
+
+def test_unlimited_host_is_limited_only_after_throttling(clock):
+    limiter = AdaptiveRateLimiter(max_rate=None)
+    assert limiter.reserve("a") == 0
+    limiter.observe("a", None)
+    assert limiter.rate_for("a") is None
+
+    clock[0] += 2
+    limiter.observe("a", 429, 0.1)
+    assert limiter.rate_for("a") == limiter.min_rate * 4
+    for _ in range(100):
+        limiter.observe("a", 200, 0.05)
+    assert limiter.rate_for("a") is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2") == 2
+    assert parse_retry_after("999999") == 300
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""响应缓存的测试"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from apifinder.response_cache import CachedResponse, ResponseCache
+
+
+def entry(chars):
+    # 每个条目占用 chars + 64 字节
+    return CachedResponse("x" * chars)
+
+
+def test_lru_evicts_least_recently_used_within_byte_cap():
+    cache = ResponseCache(max_bytes=3 * 100)
+    for name in "abc":
+        cache.put("page", "GET", name, entry(36))
+    cache.get("page", "GET", "a")
+    cache.put("page", "GET", "d", entry(36))
+
+    assert cache.get("page", "GET", "b") is None
+    assert [cache.get("page", "GET", name) is not None for name in "acd"] == [True, True, True]
+    assert cache.bytes == 300
+
+
+def test_oversized_entry_is_not_cached():
+    cache = ResponseCache(max_bytes=100)
+    cache.put("page", "GET", "big", entry(1000))
+    assert cache.get("page", "GET", "big") is None
+    assert cache.bytes == 0
+
+
+def test_kinds_are_separate_and_clear_by_kind():
+    cache = ResponseCache()
+    cache.put("page", "GET", "u", entry(1))
+    cache.put("probe", "GET", "u", entry(2))
+    cache.clear("probe")
+
+    assert cache.get("probe", "GET", "u") is None
+    assert cache.get("page", "GET", "u").text == "x"
+    assert cache.bytes == entry(1).size
+
+
+def test_disk_cache_validators_and_revalidation(tmp_path):
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    cache.store_disk("http://t/app.js", "code", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    cache.store_disk("http://t/no-validators.js", "code", {})
+    cache.store_disk("http://t/empty.js", "", {"ETag": '"v1"'})
+
+    assert cache.validators("http://t/app.js") == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    assert cache.revalidated("http://t/app.js") == "code"
+    assert cache.get_stats()["cache_revalidated"] == 1
+    assert cache.validators("http://t/no-validators.js") == {}
+    assert cache.validators("http://t/empty.js") == {}
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """带 ETag 的脚本，请求带 If-None-Match 时总是返回304"""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match"):
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        body = b'fetch("/api/etag")'
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    ETagHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_304_without_cached_body_refetches_unconditionally(etag_server, make_scanner, tmp_path, monkeypatch):
+    scanner = make_scanner(cache_dir=str(tmp_path))
+    url = etag_server + "/app.js"
+    scanner.response_cache.store_disk(url, "old", {"ETag": '"v1"'})
+    # 条件请求头已经生成，之后磁盘记录丢失
+    monkeypatch.setattr(scanner.response_cache, "revalidated", lambda u: None)
+
+    content = scanner.extract_html(url)
+
+    assert content == 'fetch("/api/etag")'
+    assert ETagHandler.requests == ['"v1"', None]
+
+
+def test_rescan_with_the_same_scanner_probes_again(mock_site, make_scanner):
+    scanner = make_scanner()
+    scanner.scan(mock_site.url + "/")
+    first = mock_site.site.requests
+    report = scanner.scan(mock_site.url + "/")
+
+    # 内存缓存在每次扫描开始时清空，探测请求必须重新发送
+    assert mock_site.site.requests - first >= len(report.results)
+
+
+def test_rescan_with_the_same_scanner_sees_changed_pages(mock_site, make_scanner, monkeypatch):
+    scanner = make_scanner()
+    first = scanner.scan(mock_site.url + "/")
+    assert not any("changed" in url for url in first.endpoints)
+
+    site = mock_site.site
+    monkeypatch.setattr(site, "index", lambda: site.page("index", ["/static/js/chunk.0.js"], []).replace(
+        b"/api/inline/index", b"/api/inline/changed"))
+    site.bundles[0] = b'fetch("/api/script/changed");' + site.bundles[0]
+    second = scanner.scan(mock_site.url + "/")
+
+    assert any(url.endswith("/api/inline/changed") for url in second.endpoints)
+    assert any(url.endswith("/api/script/changed") for url in second.endpoints)
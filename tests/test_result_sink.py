@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""流式结果输出的测试"""
+
+import csv
+import json
+
+from rich.console import Console
+
+from apifinder.FileOutputManager import FileOutputManager
+from apifinder.Output_Manager import OutputManager
+from apifinder.result_sink import CsvSink, HtmlSink, JsonlSink
+
+
+def make_renderer():
+    return FileOutputManager(OutputManager(True, console=Console(quiet=True)))
+
+
+def result(url, source="app.js"):
+    return {"url": url, "source": source, "timestamp": "2026-01-01T00:00:00"}
+
+
+def test_jsonl_sink_drops_duplicate_urls(tmp_path):
+    sink = JsonlSink(str(tmp_path / "out.jsonl"), make_renderer())
+    assert sink.write(result("http://t/api/a"))
+    assert not sink.write(result("http://t/api/a", source="other.js"))
+    assert sink.write(result("http://t/api/b"))
+    sink.close()
+
+    lines = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [line["url"] for line in lines] == ["http://t/api/a", "http://t/api/b"]
+    assert lines[0]["source"] == "app.js"
+    assert (sink.written, sink.duplicates) == (2, 1)
+
+
+def test_csv_sink_writes_header_once(tmp_path):
+    sink = CsvSink(str(tmp_path / "out.csv"), make_renderer())
+    sink.write(result("http://t/api/a"))
+    sink.write(result("http://t/api/a"))
+    sink.close()
+
+    with open(tmp_path / "out.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "URL"
+    assert [row[0] for row in rows[1:]] == ["http://t/api/a"]
+
+
+def test_html_sink_renders_report_and_removes_spill_file(tmp_path):
+    sink = HtmlSink(str(tmp_path / "out.html"), make_renderer())
+    sink.write(result("http://t/api/a"))
+    sink.write(result("http://t/api/a"))
+    sink.close("http://t/")
+
+    html = (tmp_path / "out.html").read_text(encoding="utf-8")
+    assert html.count("http://t/api/a") >= 1
+    assert html.rstrip().endswith("</html>")
+    assert not (tmp_path / "out.ndjson").exists()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""增量扫描索引的测试"""
+
+import io
+import json
+
+import pytest
+
+import apifinder.scan_index as scan_index
+from apifinder.event_stream import EventStream
+from apifinder.scan_index import ScanIndex
+
+
+def test_first_scan_reports_everything_as_new(tmp_path):
+    index = ScanIndex(str(tmp_path / "index.json"))
+    index.record_probe("t", "http://t/api/a", "app.js", True)
+
+    diff = index.finish_target("t", ["http://t/api/a"])
+
+    assert diff.first_scan
+    assert diff.new == ["http://t/api/a"]
+    assert not diff.removed and not diff.changed
+
+
+def test_rescan_reports_new_removed_and_changed_endpoints(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = ScanIndex(path)
+    for url, ok in (("http://t/a", True), ("http://t/b", True), ("http://t/c", True)):
+        index.record_probe("t", url, "app.js", ok)
+    index.finish_target("t", ["http://t/a", "http://t/b", "http://t/c"])
+    index.save()
+
+    index = ScanIndex(path)
+    index.record_probe("t", "http://t/b", "app.js", False)
+    index.record_probe("t", "http://t/d", "app.js", True)
+    # a 沿用了上次的结果，没有重新探测，不算变化
+    assert index.cached_probe("t", "http://t/a")["ok"]
+    diff = index.finish_target("t", ["http://t/a", "http://t/b", "http://t/d"])
+
+    assert not diff.first_scan
+    assert diff.new == ["http://t/d"]
+    assert diff.removed == ["http://t/c"]
+    assert diff.changed == [("http://t/b", True, False)]
+    assert diff.to_dict()["changed"] == [{"url": "http://t/b", "was_ok": True, "ok": False}]
+
+
+def test_unprobed_endpoint_is_kept_as_stale(tmp_path):
+    index = ScanIndex(str(tmp_path / "index.json"))
+    index.finish_target("t", ["http://t/a"])
+
+    assert index.cached_probe("t", "http://t/a") is None
+    assert not index.finish_target("t", ["http://t/a"])
+
+
+def test_cached_probe_expires(tmp_path, monkeypatch):
+    index = ScanIndex(str(tmp_path / "index.json"), max_age=60)
+    index.record_probe("t", "http://t/a", "app.js", True)
+    index.finish_target("t", ["http://t/a"])
+    assert index.cached_probe("t", "http://t/a") is not None
+
+    now = scan_index.time.time()
+    monkeypatch.setattr(scan_index.time, "time", lambda: now + 120)
+    assert index.cached_probe("t", "http://t/a") is None
+    assert ScanIndex(str(tmp_path / "other.json"), max_age=0).cached_probe("t", "http://t/a") is None
+
+
+def test_script_results_depend_on_content_and_rules(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = ScanIndex(path)
+    index.store_script("http://t/app.js", "code", "rules-1", ["/api/a"])
+    index.save()
+
+    index = ScanIndex(path)
+    assert index.script_urls("http://t/app.js", "code", "rules-1") == ["/api/a"]
+    assert index.script_urls("http://t/app.js", "code v2", "rules-1") is None
+    assert index.script_urls("http://t/app.js", "code", "rules-2") is None
+    assert index.get_stats() == {"scripts_unchanged": 1, "probes_reused": 0}
+
+
+def test_scripts_unseen_past_ttl_are_pruned(tmp_path, monkeypatch):
+    path = tmp_path / "index.json"
+    index = ScanIndex(str(path))
+    index.store_script("http://t/old.js", "code", "r", [])
+    monkeypatch.setattr(scan_index, "SCRIPT_TTL", -1)
+    index.save()
+
+    assert json.loads(path.read_text(encoding="utf-8"))["scripts"] == {}
+
+
+def test_rescan_with_index_reuses_scripts_and_probes(mock_site, make_scanner, tmp_path):
+    path = str(tmp_path / "index.json")
+    scanner = make_scanner(index=path)
+    first = scanner.scan(mock_site.url + "/")
+    scanner.close()
+    requests_first = mock_site.site.requests
+
+    scanner = make_scanner(index=path)
+    second = scanner.scan(mock_site.url + "/")
+    stats = scanner.index.get_stats()
+
+    assert second.changes is not None and not second.changes
+    assert sorted(second.endpoints) == sorted(first.endpoints)
+    assert stats["scripts_unchanged"] >= 1
+    assert stats["probes_reused"] >= len(first.endpoints)
+    # 第二次只重新抓取页面和脚本，不再探测端点
+    assert mock_site.site.requests - requests_first < requests_first / 2
+
+
+@pytest.mark.parametrize("engine", ["thread", "async"])
+def test_reused_probes_are_emitted_and_checkpointed(mock_site, make_scanner, tmp_path, engine):
+    if engine == "async":
+        pytest.importorskip("aiohttp")
+    path = str(tmp_path / "index.json")
+    checkpoint = str(tmp_path / "scan.ckpt")
+    scanner = make_scanner(index=path, engine=engine)
+    first = scanner.scan(mock_site.url + "/")
+    scanner.close()
+
+    out = io.BytesIO()
+    scanner = make_scanner(index=path, engine=engine, checkpoint=checkpoint)
+    scanner.output.events = EventStream(out, flush_interval=0)
+    scanner.scan(mock_site.url + "/")
+    scanner.close()
+
+    events = [json.loads(line) for line in out.getvalue().decode("utf-8").splitlines()]
+    reused = {event["url"] for event in events if event["event"] == "probe" and event.get("reused")}
+    assert set(first.endpoints) <= reused
+
+    # 模拟中断：去掉目标完成的记录后恢复，沿用的端点不会丢失
+    with open(checkpoint, encoding="utf-8") as f:
+        records = [line for line in f if json.loads(line)["type"] != "target"]
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        f.writelines(records)
+    resumed = make_scanner(engine=engine, checkpoint=checkpoint, resume=True).scan(mock_site.url + "/")
+
+    assert sorted(resumed.endpoints) == sorted(first.endpoints)
+    # 端点都已记录在检查点中，恢复时不再探测
+    assert resumed.stats["successful_requests"] + resumed.stats["failed_requests"] == 0
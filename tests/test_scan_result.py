@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""紧凑结果记录的测试"""
+
+from rich.console import Console
+
+from apifinder.Output_Manager import OutputManager
+from apifinder.scan_result import ResultColumns, ScanResult, SourceTable
+from apifinder.utils import EndpointIndex
+
+
+def test_results_share_one_interned_source_string():
+    table = SourceTable()
+    first = ScanResult("http://t/api/a", "".join(["http://t/", "app.js"]), table=table)
+    second = ScanResult("http://t/api/b", "".join(["http://t/", "app.js"]), table=table)
+
+    assert first.source is second.source
+    assert len(table) == 1
+
+
+def test_sources_are_interned_and_copied():
+    table = SourceTable()
+    index = EndpointIndex(table)
+    index.add("http://t/api/a", "".join(["a", ".js"]))
+    index.add("http://t/api/a", "".join(["b", ".js"]))
+    result = ScanResult("http://t/api/a", "a.js", sources=index.sources("http://t/api/a"), table=table)
+
+    index.add("http://t/api/a", "c.js")
+    assert result.sources == ["a.js", "b.js"]
+    assert result.sources[0] is result.source
+    assert result.to_dict()["sources"] == ["a.js", "b.js"]
+
+
+def test_each_output_manager_owns_its_source_table():
+    outputs = [OutputManager(True, console=Console(quiet=True)) for _ in range(2)]
+    for output in outputs:
+        output.print_url("http://t/api/a", "app.js")
+
+    assert outputs[0].source_table is not outputs[1].source_table
+    assert [len(output.source_table) for output in outputs] == [1, 1]
+
+
+def test_result_columns_dedupe_and_sort():
+    results = [ScanResult("http://t/b", "x.js", epoch=1), ScanResult("http://t/a", "y.js", epoch=2),
+               {"url": "http://t/b", "source": "z.js", "timestamp": "2026-01-01T00:00:00"}]
+    columns = ResultColumns(results)
+    rows = list(columns.view(columns.sorted_indices(columns.unique_indices())))
+
+    assert [(row["url"], row["source"]) for row in rows] == [("http://t/a", "y.js"), ("http://t/b", "x.js")]
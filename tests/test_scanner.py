@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""线程引擎 Scanner 的测试"""
+
+import threading
+import time
+
+import pytest
+
+from apifinder.utils import InvalidMethodsError
+
+
+def test_fetch_scripts_keeps_document_order_and_skips_failures(make_scanner, monkeypatch):
+    scanner = make_scanner()
+    delays = {"http://a.test/1.js": 0.03, "http://a.test/2.js": 0.0, "http://b.test/3.js": 0.01}
+
+    def fake_extract_html(url, ctx=None):
+        time.sleep(delays.get(url, 0))
+        return None if url.endswith("missing.js") else "// " + url
+
+    monkeypatch.setattr(scanner, "extract_html", fake_extract_html)
+    scripts = scanner.fetch_scripts(list(delays) + ["http://a.test/missing.js"])
+
+    assert list(scripts) == list(delays)
+    assert scripts["http://b.test/3.js"] == "// http://b.test/3.js"
+
+
+def test_fetch_scripts_limits_concurrency_per_host(make_scanner, monkeypatch):
+    scanner = make_scanner(script_concurrency=2)
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def fake_extract_html(url, ctx=None):
+        host = url.split("/")[2]
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return "x"
+
+    monkeypatch.setattr(scanner, "extract_html", fake_extract_html)
+    scanner.fetch_scripts([f"http://{host}.test/{i}.js" for host in ("a", "b") for i in range(6)])
+
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+def test_silent_probing_uses_configured_threads(mock_site, make_scanner, monkeypatch):
+    scanner = make_scanner(threads=3, silent=True)
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def fake_do_request(url, ctx=None):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return None
+
+    monkeypatch.setattr(scanner, "do_request", fake_do_request)
+    scanner.scan(mock_site.url + "/")
+
+    assert peak[0] == 3
+
+
+def test_invalid_methods_raise_a_dedicated_error(make_scanner):
+    with pytest.raises(InvalidMethodsError):
+        make_scanner(methods="GET,PO ST")
+
+
+def test_reused_scanner_does_not_accumulate_results(mock_site, make_scanner):
+    scanner = make_scanner()
+    first = scanner.scan(mock_site.url + "/")
+    assert first.results
+    size = len(scanner.output.results)
+
+    second = scanner.scan(mock_site.url + "/")
+    assert len(scanner.output.results) == size
+    assert sorted(second.endpoints) == sorted(first.endpoints)
+    assert second.stats["api_endpoints"] == first.stats["api_endpoints"]
+
+
+def test_merge_results_collects_into_the_scanner_output(mock_site):
+    from rich.console import Console
+    from apifinder.scanner import Scanner, ScanConfig
+
+    with Scanner(ScanConfig(delay=0, depth=0), console=Console(quiet=True), merge_results=True) as scanner:
+        report = scanner.scan(mock_site.url + "/")
+        assert len(scanner.output.results) == len(report.results)
+        assert scanner.output.stats["api_endpoints"] == report.stats["api_endpoints"]
+
+
+def test_probe_holds_request_slot_until_body_is_read(make_scanner, monkeypatch):
+    from rich.console import Console
+    from apifinder.Output_Manager import OutputManager
+    from apifinder.utils import ResultStore, ScanContext
+
+    class Slot:
+        held = False
+
+        def __enter__(self):
+            Slot.held = True
+
+        def __exit__(self, *exc):
+            Slot.held = False
+
+    held_while = []
+
+    class Response:
+        status_code = 200
+        ok = True
+        url = "http://t/api/a"
+        encoding = "utf-8"
+        headers = {"Content-Type": "application/json"}
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size):
+            held_while.append(("read", Slot.held))
+            yield b'{"ok": true}'
+
+        def close(self):
+            held_while.append(("close", Slot.held))
+
+    scanner = make_scanner()
+    monkeypatch.setattr(scanner.http_client, "request", lambda *args, **kwargs: Response())
+    ctx = ScanContext(OutputManager(True, console=Console(quiet=True)), Slot())
+    store = ResultStore(("GET",))
+    scanner.make_request("GET", "http://t/api/a", None, 5, store, ctx=ctx)
+
+    assert held_while and all(held for _, held in held_while)
+    assert ("close", True) in held_while
+    assert not Slot.held
+
+
+def test_scan_many_with_a_small_request_budget(mock_site, make_scanner):
+    scanner = make_scanner(request_budget=2, batch_threads=3)
+    urls = [mock_site.url + "/", mock_site.url + "/page/0.html", mock_site.url + "/page/1.html"]
+    reports = scanner.scan_many(urls)
+
+    assert [report.url for report in reports] == urls
+    assert all(report.endpoints for report in reports)
+
+
+@pytest.mark.parametrize("strategy, per_endpoint", [("full", 2), ("head", 1), ("options", 3)])
+def test_probe_strategy_request_counts(make_scanner, strategy, per_endpoint):
+    from mock_server import MockServer, SiteConfig
+
+    # 没有失败和重定向的端点：首页和脚本各一个请求，其余都是探测
+    config = SiteConfig(bundles=1, bundle_kb=4, pages=0, slow_every=0, fail_every=0, redirect_every=0)
+    with MockServer(config) as server:
+        report = make_scanner(probe_strategy=strategy).scan(server.url + "/")
+        endpoints = len(report.endpoints)
+
+        assert endpoints
+        assert server.site.requests == 2 + per_endpoint * endpoints
+    # 升级前的OPTIONS请求也计入统计
+    assert report.stats["successful_requests"] == per_endpoint * endpoints
+
+
+def test_head_escalates_on_405(make_scanner, monkeypatch):
+    scanner = make_scanner(probe_strategy="head")
+    sent = []
+
+    def make_request(method, url, cookies, timeout, store, redirect_count=0, ctx=None):
+        sent.append(method)
+        if method == "HEAD":
+            store.update(method, False, None, "Method Not Allowed", status=405)
+        else:
+            store.update(method, True, "{}", is_json=True, status=200)
+
+    monkeypatch.setattr(scanner, "make_request", make_request)
+    assert scanner.do_request("http://t/api/a") == "{}"
+    assert sorted(sent) == ["GET", "HEAD", "POST"]
+    assert scanner.output.stats["failed_requests"] == 1
+    assert scanner.output.stats["successful_requests"] == 2
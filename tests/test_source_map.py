@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""source map 流式解析的测试"""
+
+import base64
+import json
+
+from apifinder.source_map import (data_url_chunks, decode_chunks, extract_source_map, find_source_map_url,
+                                  iter_sources)
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_find_source_map_url():
+    assert find_source_map_url("https://t/js/app.js", "x();\n//# sourceMappingURL=app.js.map") == "https://t/js/app.js.map"
+    assert find_source_map_url("https://t/js/app.js", "x();/*# sourceMappingURL=/maps/app.map */") == "https://t/maps/app.map"
+    assert find_source_map_url("https://t/js/app.js", "//# sourceMappingURL=data:application/json;base64,e30=") \
+        == "data:application/json;base64,e30="
+    assert find_source_map_url("https://t/js/app.js", "x();") is None
+
+
+def test_iter_sources_matches_json_across_tiny_chunks():
+    source_map = {
+        "version": 3,
+        "file": "app.js",
+        "mappings": "AAAA;" * 50,
+        "names": ["a", "b"],
+        "sourceRoot": "webpack://",
+        "sources": ["src/api.js", "node_modules/lib/index.js", "src/é.js"],
+        "sourcesContent": ['fetch("/api/user")\n// "quoted" \\ path', 'fetch("/api/lib")', 'get("/api/été")'],
+    }
+    text = json.dumps(source_map, ensure_ascii=True)
+
+    for size in (1, 7, 4096):
+        assert list(iter_sources(chunked(text, size))) == [
+            ("webpack://src/api.js", source_map["sourcesContent"][0]),
+            ("webpack://src/é.js", source_map["sourcesContent"][2]),
+        ]
+
+
+def test_sources_content_before_sources_and_oversized_sources():
+    text = json.dumps({"sourcesContent": ["a" * 50, "small"], "sources": ["big.js", "small.js"]})
+
+    assert list(iter_sources(chunked(text, 8), max_source=10)) == [("small.js", "small")]
+
+
+def test_inline_data_url_and_multibyte_chunks():
+    payload = json.dumps({"sources": ["a.js"], "sourcesContent": ['post("/api/ünï")']}, ensure_ascii=False).encode()
+    url = "data:application/json;base64," + base64.b64encode(payload).decode()
+
+    chunks = decode_chunks(data_url_chunks(url, chunk_size=3))
+    found = extract_source_map(chunks, lambda name, content: [content[6:-2]])
+
+    assert found == {"a.js": ["/api/ünï"]}
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""规则更新的测试"""
+
+import shutil
+
+import pytest
+import requests
+import yaml
+
+import apifinder.utils as utils
+from apifinder.utils import UpdateManager
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def remote_rules(monkeypatch, tmp_path):
+    """规则文件和缓存目录指向临时目录，远程规则比本地新"""
+    rules_path = tmp_path / "rules.yaml"
+    shutil.copy(utils.RULES_PATH, rules_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(utils, "RULES_PATH", str(rules_path))
+    monkeypatch.setattr(utils, "RULES", dict(utils.RULES))
+    monkeypatch.setattr(utils, "COMPILED_RULES", utils.COMPILED_RULES)
+    remote = dict(utils.RULES, version_timestamp="99999999999999", ignored_domains=["remote.example"])
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: FakeResponse(yaml.dump(remote)))
+    return rules_path
+
+
+def test_background_update_writes_rules_without_swapping_them(remote_rules):
+    compiled = utils.COMPILED_RULES
+    UpdateManager.check_for_updates(force_update=True, console=None, reload=False)
+
+    assert utils.COMPILED_RULES is compiled
+    assert "remote.example" in yaml.safe_load(remote_rules.read_text(encoding="utf-8"))["ignored_domains"]
+
+
+def test_synchronous_update_reloads_rules(remote_rules):
+    compiled = utils.COMPILED_RULES
+    UpdateManager.check_for_updates(force_update=True, console=None)
+
+    assert utils.COMPILED_RULES is not compiled
+    assert utils.COMPILED_RULES.is_ignored_domain("https://remote.example/x")
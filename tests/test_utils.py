@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""utils 模块的测试：规则匹配、端点索引和深度扫描"""
+
+import threading
+
+from apifinder.utils import (BodyReader, CompiledRules, DeepScanManager, EndpointIndex, RequestBudget, ResultStore,
+                             URLExtractor, escalation_methods, is_json_response, parse_allow)
+
+
+def make_rules(ignored=("google.com",), extensions=(".png", ".css")):
+    return CompiledRules({"url_extractor_pattern": r"[\"'](/[^\"']+|https?://[^\"']+)[\"']", "ignored_domains": list(ignored)},
+                         extensions)
+
+
+def test_filtered_extension_at_end_or_before_query():
+    rules = make_rules()
+    assert rules.has_filtered_extension("/static/logo.png")
+    assert rules.has_filtered_extension("/static/LOGO.PNG?v=2")
+    assert rules.has_filtered_extension("/theme.css#top")
+    assert not rules.has_filtered_extension("/api/png/list")
+    assert not rules.has_filtered_extension("/static/logo.png.php")
+
+
+def test_ignored_domain_matches_host_and_parent_domains():
+    rules = make_rules()
+    assert rules.is_ignored_domain("https://google.com/search")
+    assert rules.is_ignored_domain("https://maps.google.com/x")
+    assert rules.is_ignored_domain("//fonts.google.com/css")
+    assert not rules.is_ignored_domain("https://notgoogle.com/x")
+    assert not rules.is_ignored_domain("https://google.com.evil.net/x")
+    assert not rules.is_ignored_domain("/api/google.com")
+
+
+def test_fingerprint_follows_rule_content():
+    assert make_rules().fingerprint == make_rules().fingerprint
+    assert make_rules().fingerprint != make_rules(ignored=("github.com",)).fingerprint
+
+
+def test_extract_urls_applies_filters(monkeypatch):
+    import apifinder.utils as utils
+    monkeypatch.setattr(utils, "COMPILED_RULES", make_rules())
+    content = 'a("/api/user");b("/img/a.png");c("https://www.google.com/x");d("https://api.example.com/v1")'
+
+    assert URLExtractor.extract_urls(content) == ["/api/user", "https://api.example.com/v1"]
+
+
+def test_frontier_resolves_relative_links():
+    manager = DeepScanManager("http://example.com/", max_depth=2)
+    manager.try_claim("http://example.com/")
+    page_results = [("http://example.com/", {"HTML_attributes": ["/page/0.html", "https://other.com/x.html"]})]
+
+    frontier, found = manager.select_frontier(page_results, budget=10)
+
+    assert frontier == ["http://example.com/page/0.html"]
+    assert found == 1
+
+
+def test_frontier_skips_claimed_pages():
+    manager = DeepScanManager("http://example.com/", max_depth=2)
+    manager.try_claim("http://example.com/page/0.html")
+    page_results = [("http://example.com/a/", {"HTML_attributes": ["/page/0.html", "/page/1.html"]})]
+
+    frontier, _ = manager.select_frontier(page_results, budget=10)
+
+    assert frontier == ["http://example.com/page/1.html"]
+
+
+def test_endpoint_index_records_each_source_once():
+    index = EndpointIndex()
+    assert index.add("http://t/api/a", "app.js")
+    assert not index.add("http://t/api/a", "vendor.js")
+    assert not index.add("http://t/api/a", "app.js")
+
+    assert index.sources("http://t/api/a") == ["app.js", "vendor.js"]
+    assert index.urls() == ["http://t/api/a"]
+
+
+def test_endpoint_index_lookup_does_not_add_or_expose_state():
+    index = EndpointIndex()
+    index.add("http://t/api/a", "app.js")
+
+    assert index.sources("http://t/api/missing") == []
+    assert len(index) == 1
+    index.sources("http://t/api/a").append("tampered.js")
+    assert index.sources("http://t/api/a") == ["app.js"]
+
+
+def test_body_reader_stops_at_cap_and_keeps_preview():
+    reader = BodyReader(cap=10, preview=4)
+    assert reader.feed(b"abc")
+    assert not reader.feed(b"defghijk")
+
+    assert reader.preview == b"abcd"
+    assert reader.length == 11
+    assert reader.truncated
+    assert not reader.complete
+
+
+def test_body_reader_without_cap_reads_everything():
+    reader = BodyReader(cap=0, preview=64)
+    for _ in range(10):
+        assert reader.feed(b"x" * 5)
+
+    assert reader.length == 50
+    assert reader.complete
+
+
+def test_json_sniffing_on_partial_bodies():
+    assert is_json_response("application/json; charset=utf-8", "")
+    assert is_json_response("text/plain", '{"a": 1}')
+    assert not is_json_response("text/plain", '{"a": ')
+    assert is_json_response("text/plain", '{"a": ', complete=False)
+    assert is_json_response("text/plain", '  [{"id": 1}, ', complete=False)
+    assert not is_json_response("text/html", "<html>", complete=False)
+
+
+def test_request_budget_splits_among_active_targets():
+    budget = RequestBudget(4)
+    a, b = budget.slot(), budget.slot()
+    assert budget.share == 2
+
+    assert a.acquire(blocking=False) and a.acquire(blocking=False)
+    assert not a.acquire(blocking=False)
+    assert b.acquire(blocking=False)
+
+    b.release()
+    b.close()
+    b.close()
+    assert budget.share == 4
+    assert a.acquire(blocking=False) and a.acquire(blocking=False)
+    assert not a.acquire(blocking=False)
+    assert budget.in_flight == 4
+
+
+def test_request_budget_wakes_waiters_when_a_target_finishes():
+    budget = RequestBudget(2)
+    a, b = budget.slot(), budget.slot()
+    a.acquire()
+    acquired = threading.Event()
+
+    def wait_for_second():
+        a.acquire()
+        acquired.set()
+
+    waiter = threading.Thread(target=wait_for_second)
+    waiter.start()
+    assert not acquired.wait(0.05)
+    b.close()
+    assert acquired.wait(1)
+    waiter.join()
+
+
+METHODS = ["GET", "POST"]
+
+
+def test_parse_allow():
+    assert parse_allow(None) is None
+    assert parse_allow("get, Post ,,HEAD") == {"GET", "POST", "HEAD"}
+    assert parse_allow("") == set()
+
+
+def test_head_strategy_escalation():
+    assert escalation_methods("head", {"success": True, "status": 200}, METHODS) == []
+    assert escalation_methods("head", {"success": False, "status": 405}, METHODS) == METHODS
+    assert escalation_methods("head", {"success": False, "status": 501}, METHODS) == METHODS
+    # 其他失败（404、连接错误）说明端点本身不可用，不再升级
+    assert escalation_methods("head", {"success": False, "status": 404}, METHODS) == []
+    assert escalation_methods("head", {"success": False, "status": None}, METHODS) == []
+
+
+def test_options_strategy_escalation():
+    assert escalation_methods("options", {"success": True, "allow": "GET, OPTIONS"}, METHODS) == ["GET"]
+    assert escalation_methods("options", {"success": True, "allow": "PUT"}, METHODS) == []
+    assert escalation_methods("options", {"success": True, "allow": None}, METHODS) == METHODS
+    assert escalation_methods("options", {"success": False, "status": 405, "allow": "GET"}, METHODS) == METHODS
+
+
+def test_result_store_keeps_escalated_results():
+    store = ResultStore(["HEAD"])
+    store.update("HEAD", False, None, "405", status=405)
+    store.escalate(METHODS)
+
+    assert list(store.results) == METHODS
+    assert store.primary == "GET"
+    assert store.escalated["HEAD"]["status"] == 405